@@ -0,0 +1,90 @@
+"""
+Payload size and encode/decode time: SARB binary export vs. JSON.
+
+Encodes a 128 x 128 probability grid alone, and together with the particle
+cloud, as JSON lists (what the API would otherwise send) and as SARB
+payloads (float32 or uint16 particles, raw or zlib-compressed), then
+decodes each back to numpy arrays.
+
+Usage:
+    python benchmarks/bench_binary_export.py [--particles 1e4,1e5,1e6] [--bins 128]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import binary_export
+from drift_engine import BayesianDriftEngine
+from mission_planner import MissionPlanner
+
+
+def best_of(fn, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def json_encode(H, lat_edges, lon_edges, cloud):
+    payload = {
+        "bounds": [float(lat_edges[0]), float(lat_edges[-1]), float(lon_edges[0]), float(lon_edges[-1])],
+        "density": H.tolist(),
+    }
+    if cloud is not None:
+        payload["latitudes"] = cloud.latitudes.tolist()
+        payload["longitudes"] = cloud.longitudes.tolist()
+    return json.dumps(payload).encode()
+
+
+def json_decode(payload):
+    data = json.loads(payload)
+    arrays = [np.asarray(data["density"])]
+    if "latitudes" in data:
+        arrays += [np.asarray(data["latitudes"]), np.asarray(data["longitudes"])]
+    return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--particles", default="1e4,1e5,1e6")
+    parser.add_argument("--bins", type=int, default=128)
+    args = parser.parse_args()
+
+    planner = MissionPlanner()
+    print(f"{'particles':>9} {'payload':<22} {'bytes':>12} {'shrink':>7} {'encode ms':>10} {'decode ms':>10}")
+    for n in (int(float(p)) for p in args.particles.split(",")):
+        cloud = BayesianDriftEngine(iterations=n).calculate_drift(
+            (54.30, 3.15), {"speed": 35.0, "direction": 270}, {"speed": 2.8, "direction": 45}, 4.0, rng=0)
+        H, lat_edges, lon_edges = planner.probability_grid(cloud.latitudes, cloud.longitudes, bins=args.bins)
+
+        for with_particles in (False, True):
+            source = cloud if with_particles else None
+            label = "grid+particles" if with_particles else "grid"
+            encode_s, reference = best_of(lambda: json_encode(H, lat_edges, lon_edges, source))
+            decode_s, _ = best_of(lambda: json_decode(reference))
+            print(f"{n:>9} {'JSON ' + label:<22} {len(reference):>12,} {'1.0x':>7} {encode_s * 1e3:>10.2f} {decode_s * 1e3:>10.2f}")
+
+            variants = [("f4", False), ("f4", True), ("u2", False), ("u2", True)] if with_particles else [("f4", False), ("f4", True)]
+            for encoding, compress in variants:
+                encode_s, payload = best_of(lambda: binary_export.encode_heatmap(
+                    H, lat_edges, lon_edges,
+                    cloud.latitudes if with_particles else None,
+                    cloud.longitudes if with_particles else None,
+                    particle_encoding=encoding, compress=compress))
+                decode_s, _ = best_of(lambda: binary_export.decode_heatmap(payload))
+                name = f"SARB {label}" + (f" {encoding}" if with_particles else "") + (" zlib" if compress else "")
+                print(f"{n:>9} {name:<22} {len(payload):>12,} {len(reference) / len(payload):>6.1f}x "
+                      f"{encode_s * 1e3:>10.2f} {decode_s * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
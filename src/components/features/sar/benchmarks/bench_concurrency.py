@@ -0,0 +1,103 @@
+"""
+Concurrent-load benchmark for the SAR API: inline execution vs. process pool.
+
+Fires batches of concurrent /simulate/drift requests through an in-process
+ASGI client while probing the `/` health check, and reports drift latency,
+throughput and health-check latency for both execution modes.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--concurrency 16] [--rounds 3] [--workers N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import main
+from simulation_pool import SimulationPool
+
+DRIFT_PAYLOAD = {
+    "lkp": [54.30, 3.15],
+    "wind": {"speed": 35.0, "direction": 270},
+    "current": {"speed": 2.8, "direction": 45},
+    "hours": 4.0,
+}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def timed_drift(client: httpx.AsyncClient, latencies: list, statuses: list):
+    start = time.perf_counter()
+    response = await client.post("/simulate/drift", json=DRIFT_PAYLOAD)
+    latencies.append(time.perf_counter() - start)
+    statuses.append(response.status_code)
+
+
+async def run_mode(pool: SimulationPool, concurrency: int, rounds: int):
+    main.worker_pool = pool
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # Warm-up spawns workers outside the timed window
+        await asyncio.gather(*(client.post("/simulate/drift", json=DRIFT_PAYLOAD) for _ in range(max(pool.max_workers, 1))))
+
+        latencies, statuses, health = [], [], []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop, health))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(timed_drift(client, latencies, statuses) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+    pool.shutdown()
+
+    ok = statuses.count(200)
+    return {
+        "drift_p50_ms": statistics.median(latencies) * 1e3,
+        "drift_p95_ms": percentile(latencies, 95) * 1e3,
+        "throughput_rps": ok / elapsed,
+        "rejected": len(statuses) - ok,
+        "health_p50_ms": statistics.median(health) * 1e3 if health else float("nan"),
+        "health_p99_ms": percentile(health, 99) * 1e3 if health else float("nan"),
+        "health_samples": len(health),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    modes = {
+        "inline (before)": SimulationPool(max_workers=0),
+        "process pool (after)": SimulationPool(max_workers=args.workers, max_queue=args.concurrency),
+    }
+    print(f"{'mode':<22} {'drift p50':>10} {'drift p95':>10} {'req/s':>8} {'503s':>5} {'health p50':>11} {'health p99':>11}")
+    for name, pool in modes.items():
+        r = asyncio.run(run_mode(pool, args.concurrency, args.rounds))
+        print(f"{name:<22} {r['drift_p50_ms']:>8.1f}ms {r['drift_p95_ms']:>8.1f}ms {r['throughput_rps']:>8.1f} "
+              f"{r['rejected']:>5} {r['health_p50_ms']:>9.2f}ms {r['health_p99_ms']:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main_cli()
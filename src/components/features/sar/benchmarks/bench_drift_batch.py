@@ -0,0 +1,78 @@
+"""
+Batch vs. sequential drift throughput benchmark.
+
+Compares N independent calculate_drift + get_search_area_stats + plan_mission
+calls against a single calculate_drift_batch + plan_missions_batch call.
+
+Usage:
+    python benchmarks/bench_drift_batch.py [--iterations 10000] [--repeats 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import BayesianDriftEngine
+from mission_planner import MissionPlanner
+
+
+def make_requests(n: int, rng: np.random.Generator):
+    return [
+        {
+            "lkp": (float(rng.uniform(35, 60)), float(rng.uniform(-30, 15))),
+            "wind": {"speed": float(rng.uniform(5, 45)), "direction": float(rng.uniform(0, 360))},
+            "current": {"speed": float(rng.uniform(0.2, 3.0)), "direction": float(rng.uniform(0, 360))},
+            "hours": float(rng.uniform(1, 12)),
+        }
+        for _ in range(n)
+    ]
+
+
+def run_sequential(engine: BayesianDriftEngine, planner: MissionPlanner, requests):
+    for r in requests:
+        cloud = engine.calculate_drift(**r)
+        engine.get_search_area_stats(cloud)
+        planner.plan_mission(cloud)
+
+
+def run_batch(engine: BayesianDriftEngine, planner: MissionPlanner, requests):
+    lats, lons = engine.calculate_drift_batch(requests)
+    engine.get_search_area_stats_batch(lats, lons)
+    planner.plan_missions_batch(lats, lons)
+
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    engine = BayesianDriftEngine(iterations=args.iterations)
+    planner = MissionPlanner()
+    rng = np.random.default_rng(0)
+
+    print(f"{'N':>5} {'sequential (ms)':>16} {'batch (ms)':>11} {'req/s seq':>10} {'req/s batch':>12} {'speedup':>8}")
+    for n in args.sizes:
+        requests = make_requests(n, rng)
+        t_seq = best_of(lambda: run_sequential(engine, planner, requests), args.repeats)
+        t_batch = best_of(lambda: run_batch(engine, planner, requests), args.repeats)
+        print(f"{n:>5} {t_seq * 1e3:>16.2f} {t_batch * 1e3:>11.2f} {n / t_seq:>10.1f} {n / t_batch:>12.1f} {t_seq / t_batch:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Allocations and latency of calculate_drift with and without a DriftWorkspace.
+
+For the closed-form and the stepped (dt) model, runs repeated seeded
+calls the default way (fresh arrays per call) and into the thread's
+workspace, and reports:
+
+    peak     bytes newly allocated at the peak of one warm call (tracemalloc),
+             also in units of one particle-length float64 array
+    p50/p95  call latency
+
+and checks both modes give bit-identical clouds.
+
+Usage:
+    python benchmarks/bench_drift_workspace.py [--sizes 1e4,1e5,1e6] [--repeats 50]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import BayesianDriftEngine
+
+LKP = (54.30, 3.15)
+WIND = {"speed": 35.0, "direction": 270}
+CURRENT = {"speed": 2.8, "direction": 45}
+HOURS = 4.0
+MODELS = {
+    "closed-form": {},
+    "closed-form+spread": {"lkp_uncertainty_nm": 1.5,
+                           "leeway": {"slope": 0.03, "offset": 0.1, "slope_sd": 0.005, "offset_sd": 0.02}},
+    "stepped dt=0.5": {"dt": 0.5},
+}
+
+
+def peak_bytes(fn) -> int:
+    fn()  # Warm: the workspace sizes its buffers on first use
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def latencies(fn, repeats: int) -> np.ndarray:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1e3
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e4,1e5,1e6")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'particles':>9} {'model':<19} {'mode':<9} {'peak':>12} {'arrays':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for n in (int(float(s)) for s in args.sizes.split(",") if s):
+        engine = BayesianDriftEngine(iterations=n)
+        workspace = engine.workspace()
+        for model, kwargs in MODELS.items():
+            reference = engine.calculate_drift(LKP, WIND, CURRENT, HOURS, rng=1, **kwargs)
+            reused = engine.calculate_drift(LKP, WIND, CURRENT, HOURS, rng=1, workspace=workspace, **kwargs)
+            identical = (np.array_equal(reference.latitudes, reused.latitudes)
+                         and np.array_equal(reference.longitudes, reused.longitudes))
+            for mode, extra in (("allocate", {}), ("workspace", {"workspace": workspace})):
+                call = lambda: engine.calculate_drift(LKP, WIND, CURRENT, HOURS, rng=1, **kwargs, **extra)
+                peak = peak_bytes(call)
+                timings = latencies(call, args.repeats)
+                print(f"{n:>9} {model:<19} {mode:<9} {peak:>12,} {peak / (8 * n):>6.1f} "
+                      f"{np.percentile(timings, 50):>8.3f} {np.percentile(timings, 95):>8.3f}")
+            if not identical:
+                print(f"  WARNING: {model} differs between modes")
+        print(f"  workspace holds {workspace.nbytes:,} bytes")
+        workspace.clear()
+
+
+if __name__ == "__main__":
+    main_cli()
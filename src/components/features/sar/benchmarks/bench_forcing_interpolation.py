@@ -0,0 +1,73 @@
+"""
+Interpolation throughput of memory-mapped gridded forcing.
+
+Writes a synthetic (time, lat, lon) wind field to a temporary directory,
+opens it memory-mapped and times GriddedField.sample over clouds of
+increasing size, reporting particles x steps per second. A full gridded
+drift run (wind + current fields) is timed as well.
+
+Usage:
+    python benchmarks/bench_forcing_interpolation.py [--grid 48 721 1441] [--particles 1e4 1e5 1e6]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import BayesianDriftEngine
+from forcing_fields import ForcingFields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid", type=int, nargs=3, default=[24, 361, 721], metavar=("NT", "NLAT", "NLON"))
+    parser.add_argument("--particles", type=float, nargs="+", default=[1e4, 1e5, 1e6])
+    parser.add_argument("--steps", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for component in ("wind", "current"):
+            field_dir = root / component
+            field_dir.mkdir()
+            (field_dir / "grid.json").write_text(
+                '{"lat0": 30.0, "dlat": 0.25, "lon0": -20.0, "dlon": 0.25, "t0": 0.0, "dt": 1.0}'
+            )
+            for name in ("u", "v"):
+                out = np.lib.format.open_memmap(field_dir / f"{name}.npy", mode="w+",
+                                                dtype=np.float32, shape=tuple(args.grid))
+                for k in range(args.grid[0]):
+                    out[k] = rng.normal(0, 10, args.grid[1:]).astype(np.float32)
+                out.flush()
+                del out
+        forcing = ForcingFields.load(root)
+        size_mib = 4 * np.prod(args.grid) * 4 / 2**20
+        print(f"grid {tuple(args.grid)} float32, {size_mib:.0f} MiB on disk (memory-mapped)")
+
+        print(f"{'particles':>10} {'sample (ms/step)':>17} {'particle-steps/s':>17} {'drift run (s)':>14}")
+        for size in args.particles:
+            n = int(size)
+            lats = rng.normal(45.0, 0.5, n)
+            lons = rng.normal(-5.0, 0.5, n)
+            start = time.perf_counter()
+            for step in range(args.steps):
+                forcing.wind.sample(lats, lons, 0.5 * step)
+            per_step = (time.perf_counter() - start) / args.steps
+
+            engine = BayesianDriftEngine(iterations=n)
+            start = time.perf_counter()
+            engine.calculate_drift((45.0, -5.0), {"speed": 20, "direction": 200}, {"speed": 1, "direction": 90},
+                                   hours=args.steps * 0.5, dt=0.5, rng=0, forcing=forcing)
+            run = time.perf_counter() - start
+            print(f"{n:>10} {per_step * 1e3:>17.2f} {n / per_step:>17.3e} {run:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latency and coverage of the highest-density-region contours.
+
+For each ScenarioLibrary scenario and grid resolution, a seeded cloud of
+`--particles` is reduced to HDR polygons (hdr_contours) and the table
+reports:
+
+    density   ms to bin the cloud (hdr_density)
+    contours  ms for thresholds, marching squares, hole assignment and
+              simplification of all levels (hdr_regions)
+    vertices  vertices per level after simplification
+    covered   share of an independent cloud (different seed) falling
+              inside each level's polygons, which should sit within a few
+              tenths of a percent of the level (smoothing, the half cell
+              shaved off at the boundary and simplification all move it)
+
+Usage:
+    python benchmarks/bench_hdr_contours.py [--particles 1e6] [--resolutions 64,128,256,512]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import BayesianDriftEngine
+from hdr_contours import DEFAULT_LEVELS, containing_ring, hdr_density, hdr_regions
+from scenario_library import ScenarioLibrary
+
+REPEATS = 5
+COVERAGE_PARTICLES = 50_000
+
+
+def covered(region, latitudes: np.ndarray, longitudes: np.ndarray) -> float:
+    """Share of the points inside the region (even-odd over all its rings)."""
+    points = np.column_stack([latitudes, longitudes])
+    inside = np.zeros(points.shape[0], dtype=bool)
+    for polygon in region.polygons:
+        for ring in polygon:
+            inside ^= containing_ring([ring[:, ::-1]], points) == 0
+    return float(inside.mean())
+
+
+def run(args):
+    engine = BayesianDriftEngine()
+    scenarios = [ScenarioLibrary.north_sea_grounding(),
+                 ScenarioLibrary.mediterranean_multi_lkp(),
+                 ScenarioLibrary.atlantic_deep_water()]
+    levels = DEFAULT_LEVELS
+    for scenario in scenarios:
+        params = scenario.drift_params()
+        cloud = engine.calculate_drift(**params, rng=1, n_particles=args.particles)
+        latitudes, longitudes = cloud.latitudes.copy(), cloud.longitudes.copy()
+        check = engine.calculate_drift(**params, rng=2, n_particles=COVERAGE_PARTICLES)
+
+        print(f"{scenario.scenario_id}: {args.particles:,} particles, levels {list(levels)}")
+        print(f"  {'cells':>5} {'density':>8} {'contours':>9} {'vertices':>16} {'covered':>22}")
+        for resolution in args.resolutions:
+            binning, tracing = [], []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                density = hdr_density(latitudes, longitudes, resolution=resolution)
+                middle = time.perf_counter()
+                regions = hdr_regions(density, levels)
+                tracing.append(time.perf_counter() - middle)
+                binning.append(middle - start)
+            vertices = "/".join(str(sum(len(ring) for polygon in r.polygons for ring in polygon)) for r in regions)
+            shares = "/".join(f"{covered(r, check.latitudes, check.longitudes):.3f}" for r in regions)
+            print(f"  {resolution:>5} {np.median(binning) * 1e3:8.1f} {np.median(tracing) * 1e3:9.1f} "
+                  f"{vertices:>16} {shares:>22}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--particles", type=lambda s: int(float(s)), default=10**6)
+    parser.add_argument("--resolutions", type=lambda s: [int(x) for x in s.split(",")], default=[64, 128, 256, 512])
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main_cli()
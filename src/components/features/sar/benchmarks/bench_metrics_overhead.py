@@ -0,0 +1,104 @@
+"""
+Overhead of the per-stage timing instrumentation on /simulate/drift.
+
+Drives inline /simulate/drift requests through an in-process ASGI client
+with metrics enabled and disabled, alternating the two modes round by
+round so machine drift affects both equally, and reports the median
+request latency of each and the relative overhead. Also times the
+instrumentation primitives on their own (one timed stage, one histogram
+observation) to show the fixed per-request cost.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py [--particles 10000] [--requests 200] [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import metrics
+from metrics import StageTimer, stage
+
+DRIFT_PAYLOAD = {
+    "lkp": [54.30, 3.15],
+    "wind": {"speed": 35.0, "direction": 270},
+    "current": {"speed": 2.8, "direction": 45},
+    "hours": 4.0,
+}
+
+
+async def timed_requests(client: httpx.AsyncClient, count: int) -> list:
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.post("/simulate/drift", json=DRIFT_PAYLOAD)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return latencies
+
+
+async def run(args):
+    import main
+    transport = httpx.ASGITransport(app=main.app)
+    samples = {True: [], False: []}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await timed_requests(client, 20)  # Warm-up
+        for _ in range(args.rounds):
+            for enabled in (True, False):
+                metrics.ENABLED = enabled
+                samples[enabled].extend(await timed_requests(client, args.requests // args.rounds))
+    metrics.ENABLED = True
+    return samples
+
+
+def primitive_costs(n: int = 200000):
+    timer = StageTimer()
+    start = time.perf_counter()
+    for _ in range(n):
+        with stage(timer, "x"):
+            pass
+    stage_cost = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    for i in range(n):
+        metrics.stage_seconds.observe(0.001, "bench")
+    observe_cost = (time.perf_counter() - start) / n
+    return stage_cost, observe_cost
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--particles", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per mode")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    # Inline execution so the timings measure this process only
+    os.environ["SAR_POOL_WORKERS"] = "0"
+    os.environ["SAR_ITERATIONS"] = str(args.particles)
+    samples = asyncio.run(run(args))
+
+    on = statistics.median(samples[True])
+    off = statistics.median(samples[False])
+    print(f"particles={args.particles} requests/mode={len(samples[True])}")
+    print(f"  metrics off: p50 {off * 1e3:.3f} ms")
+    print(f"  metrics on:  p50 {on * 1e3:.3f} ms")
+    print(f"  overhead:    {(on - off) * 1e6:+.1f} us ({(on / off - 1) * 100:+.2f}%)")
+
+    stage_cost, observe_cost = primitive_costs()
+    # Per request: 8 timed stages, ~11 histogram observations
+    fixed = 8 * stage_cost + 11 * observe_cost
+    print(f"  primitives:  stage {stage_cost * 1e9:.0f} ns, observe {observe_cost * 1e9:.0f} ns "
+          f"-> ~{fixed * 1e6:.1f} us/request ({fixed / off * 100:.2f}% of p50)")
+
+
+if __name__ == "__main__":
+    main_cli()
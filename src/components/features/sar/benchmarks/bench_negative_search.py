@@ -0,0 +1,68 @@
+"""
+Latency of negative-search particle-filter updates on a live cloud.
+
+Simulates a 1e6-particle cloud, then applies a sequence of unsuccessful
+searches (the top critical-path cells and creeping-line asset tracks)
+with NegativeSearchUpdater, reporting the per-update latency, the POS
+removed and whether resampling was triggered.
+
+Usage:
+    python benchmarks/bench_negative_search.py [--particles 1e6] [--updates 20]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import BayesianDriftEngine
+from mission_planner import MissionPlanner
+from negative_search import NegativeSearchUpdater, SearchEffort, SearchedCell, SearchTrack
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--particles", type=float, default=1e6)
+    parser.add_argument("--updates", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = BayesianDriftEngine(iterations=int(args.particles))
+    planner = MissionPlanner()
+    cloud = engine.calculate_drift((54.30, 3.15), {"speed": 35.0, "direction": 270},
+                                   {"speed": 2.8, "direction": 45}, hours=4.0, rng=0)
+    updater = NegativeSearchUpdater(planner, rng=0)
+
+    timings = []
+    print(f"{'update':>6} {'kind':<6} {'ms':>8} {'POS':>7} {'searched':>9} {'ESS/n':>6} {'resampled':>9}")
+    for k in range(args.updates):
+        # Search the current top cells of the 20 x 20 critical-path grid
+        path = planner.generate_critical_path(cloud.latitudes, cloud.longitudes, cloud.weights)
+        cell_lat = float(np.ptp(cloud.latitudes)) / 20
+        cell_lon = float(np.ptp(cloud.longitudes)) / 20
+        if k % 2 == 0:
+            cells = [SearchedCell(c.center_lat - cell_lat / 2, c.center_lat + cell_lat / 2,
+                                  c.center_lon - cell_lon / 2, c.center_lon + cell_lon / 2) for c in path[:4]]
+            effort = SearchEffort('uav', cells=cells)
+            kind = "cells"
+        else:
+            # Creeping-line legs across the top cell, 0.2 nm sweep width
+            target = path[0]
+            legs = [(target.center_lat + d, target.center_lon + (cell_lon if i % 2 else -cell_lon))
+                    for i, d in enumerate(np.linspace(-cell_lat, cell_lat, 6))]
+            effort = SearchEffort('helicopter', tracks=[SearchTrack(legs, sweep_width_nm=0.2)])
+            kind = "track"
+        start = time.perf_counter()
+        result = updater.apply(cloud, effort)
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        print(f"{k:>6} {kind:<6} {elapsed * 1e3:>8.2f} {result.pos:>7.3f} {result.particles_searched:>9} "
+              f"{result.effective_sample_size / cloud.n_particles:>6.2f} {str(result.resampled):>9}")
+    print(f"median update latency: {np.median(timings) * 1e3:.2f} ms at {cloud.n_particles:,} particles")
+
+
+if __name__ == "__main__":
+    main()
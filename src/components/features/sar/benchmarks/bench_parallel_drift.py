@@ -0,0 +1,83 @@
+"""
+Scaling of BayesianDriftEngine.calculate_drift_parallel with worker count.
+
+Runs the same seeded simulation with 1, 2, 4, ... threads up to the CPU
+count (or --workers), checks that every run is bit-for-bit identical to the
+single-worker one (particles and merged moments), and reports wall time,
+speedup and parallel efficiency. The plain single-stream calculate_drift
+is timed for reference, as is the moments-only mode that never holds the
+full cloud.
+
+Usage:
+    python benchmarks/bench_parallel_drift.py [--particles 1e7] [--workers 1,2,4,8] [--repeats 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import DEFAULT_PARALLEL_CHUNK, BayesianDriftEngine
+
+LKP = (54.30, 3.15)
+WIND = {"speed": 35.0, "direction": 270}
+CURRENT = {"speed": 2.8, "direction": 45}
+HOURS = 4.0
+SEED = 20240601
+
+
+def best_of(fn, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main_cli():
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(1 << k) for k in range(cpus.bit_length()) if 1 << k <= cpus)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--particles", type=float, default=1e7)
+    parser.add_argument("--workers", default=default_workers)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_PARALLEL_CHUNK)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    n = int(args.particles)
+    engine = BayesianDriftEngine(iterations=n)
+    print(f"{n:,} particles, chunks of {args.chunk_size:,}, {cpus} CPUs")
+
+    serial_s, _ = best_of(lambda: engine.calculate_drift(LKP, WIND, CURRENT, HOURS, rng=SEED), args.repeats)
+    print(f"  calculate_drift (single stream): {serial_s * 1e3:9.1f} ms")
+
+    print(f"  {'workers':>7} {'ms':>9} {'speedup':>8} {'efficiency':>10} {'identical':>9}")
+    reference = None
+    base_s = None
+    for workers in (int(w) for w in args.workers.split(",") if w):
+        elapsed, (cloud, moments) = best_of(lambda: engine.calculate_drift_parallel(
+            LKP, WIND, CURRENT, HOURS, seed=SEED, workers=workers, chunk_size=args.chunk_size), args.repeats)
+        if reference is None:
+            reference, base_s = (cloud, moments), elapsed
+        identical = (np.array_equal(cloud.latitudes, reference[0].latitudes)
+                     and np.array_equal(cloud.longitudes, reference[0].longitudes)
+                     and moments == reference[1])
+        speedup = base_s / elapsed
+        print(f"  {workers:>7} {elapsed * 1e3:>9.1f} {speedup:>7.2f}x {speedup / workers:>9.0%} {str(identical):>9}")
+        del cloud
+
+    workers = int(args.workers.split(",")[-1])
+    elapsed, (_, moments) = best_of(lambda: engine.calculate_drift_parallel(
+        LKP, WIND, CURRENT, HOURS, seed=SEED, workers=workers, chunk_size=args.chunk_size,
+        keep_particles=False), args.repeats)
+    print(f"  moments only ({workers} workers): {elapsed * 1e3:.1f} ms, identical={moments == reference[1]}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,106 @@
+"""
+Memory/latency benchmark: legacy DataFrame hand-off vs. ParticleCloud.
+
+The legacy pipeline reproduces the original engine (np.full LKP arrays, a
+pandas DataFrame with a constant weight column, pandas mean/std, `.values`
+unpacking into the planner). The new pipeline runs calculate_drift ->
+get_search_area_stats -> plan_mission on a ParticleCloud, in float64 and float32.
+
+Peak memory is measured with tracemalloc (numpy reports its buffers to it).
+
+Usage:
+    python benchmarks/bench_particle_cloud.py [--sizes 1e4 1e5 1e6 1e7] [--repeats 3]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import BayesianDriftEngine
+from mission_planner import MissionPlanner
+
+SCENARIO = {
+    "lkp": (54.30, 3.15),
+    "wind": {"speed": 35.0, "direction": 270},
+    "current": {"speed": 2.8, "direction": 45},
+    "hours": 4.0,
+}
+
+
+def legacy_pipeline(n: int, planner: MissionPlanner, rng: np.random.Generator):
+    lkp, wind, current, hours = SCENARIO["lkp"], SCENARIO["wind"], SCENARIO["current"], SCENARIO["hours"]
+    lats = np.full(n, lkp[0])
+    lons = np.full(n, lkp[1])
+    wind_speeds = rng.normal(wind['speed'], wind['speed'] * 0.1, n)
+    curr_speeds = rng.normal(current['speed'], current['speed'] * 0.1, n)
+    leeway_speed = (wind_speeds * 0.03) + 0.02
+    wind_rad = np.radians(wind['direction'])
+    curr_rad = np.radians(current['direction'])
+    dn = (np.cos(wind_rad) * leeway_speed + np.cos(curr_rad) * curr_speeds) * hours
+    de = (np.sin(wind_rad) * leeway_speed + np.sin(curr_rad) * curr_speeds) * hours
+    df = pd.DataFrame({
+        'latitude': lats + (dn / 60.0),
+        'longitude': lons + (de / (60.0 * np.cos(np.radians(lats)))),
+        'weight': 1 / n
+    })
+    _ = {
+        "mean_lat": df['latitude'].mean(),
+        "mean_lon": df['longitude'].mean(),
+        "std_dev_nm": df['latitude'].std() * 60,
+    }
+    lat_v, lon_v, w_v = df['latitude'].values, df['longitude'].values, df['weight'].values
+    planner.analyze_distribution_geometry(lat_v, lon_v, w_v)
+    planner.generate_critical_path(lat_v, lon_v, w_v)
+
+
+def cloud_pipeline(engine: BayesianDriftEngine, planner: MissionPlanner, rng: np.random.Generator):
+    cloud = engine.calculate_drift(**SCENARIO, rng=rng)
+    engine.get_search_area_stats(cloud)
+    planner.plan_mission(cloud)
+
+
+def measure(fn, repeats: int):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e4, 1e5, 1e6, 1e7])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    planner = MissionPlanner()
+    rng = np.random.default_rng(0)
+    print(f"{'particles':>10} {'pipeline':<18} {'latency (ms)':>13} {'peak MiB':>9} {'mem vs legacy':>14}")
+    for size in args.sizes:
+        n = int(size)
+        rows = {
+            "legacy DataFrame": lambda: legacy_pipeline(n, planner, rng),
+            "cloud float64": lambda: cloud_pipeline(BayesianDriftEngine(n), planner, rng),
+            "cloud float32": lambda: cloud_pipeline(BayesianDriftEngine(n, dtype=np.float32), planner, rng),
+        }
+        legacy_peak = None
+        for name, fn in rows.items():
+            latency, peak = measure(fn, args.repeats)
+            legacy_peak = legacy_peak or peak
+            print(f"{n:>10} {name:<18} {latency * 1e3:>13.2f} {peak / 2**20:>9.1f} {peak / legacy_peak:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
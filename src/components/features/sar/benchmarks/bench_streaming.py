@@ -0,0 +1,88 @@
+"""
+Time-to-first-result of /simulate/drift/stream vs. the blocking endpoint.
+
+Calls the ASGI app directly and timestamps every body chunk as the
+application sends it (in-process HTTP clients buffer streamed bodies, which
+would hide the progression). Simulation runs on the process pool, as in
+production, so the event loop stays free to flush events.
+
+Usage:
+    python benchmarks/bench_streaming.py [--particles 4e6] [--workers 1]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+PAYLOAD = {
+    "lkp": [54.30, 3.15],
+    "wind": {"speed": 35.0, "direction": 270},
+    "current": {"speed": 2.8, "direction": 45},
+    "hours": 4.0,
+}
+
+
+async def call(app, path: str, payload: dict):
+    """Runs one POST through the ASGI app; returns [(seconds, body chunk)]."""
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"content-type", b"application/json"), (b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    chunks = []
+    sent = False
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)  # Client stays connected
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append((time.perf_counter() - start, message["body"]))
+
+    await app(scope, receive, send)
+    return chunks
+
+
+async def run(particles: int):
+    import main
+    # Warm-up: spawn the workers outside the timed calls
+    await call(main.app, "/simulate/drift", PAYLOAD)
+
+    print(f"/simulate/drift/stream ({particles:,} particles)")
+    for elapsed, chunk in await call(main.app, "/simulate/drift/stream", PAYLOAD):
+        for line in chunk.decode().splitlines():
+            event = json.loads(line)
+            radius = event.get("reliability", {}).get("confidence_radius_nm", float("nan"))
+            print(f"  {elapsed * 1e3:9.1f} ms  {event['event']:<8} particles={event.get('particles', 0):>9,} radius={radius:.4f} nm")
+
+    chunks = await call(main.app, "/simulate/drift", PAYLOAD)
+    print(f"/simulate/drift (blocking): first byte at {chunks[0][0] * 1e3:.1f} ms")
+    main.worker_pool.shutdown()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--particles", type=float, default=4e6)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    os.environ["SAR_ITERATIONS"] = str(int(args.particles))
+    os.environ["SAR_POOL_WORKERS"] = str(args.workers)
+    asyncio.run(run(int(args.particles)))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,107 @@
+"""
+Peak memory and throughput of the streaming (out-of-core) statistics.
+
+For each particle count the same seeded run is summarised two ways:
+
+    stream     streaming_stats.summarize_drift: chunks folded one at a time
+               into moments, density grid and top-cell tracker, then
+               MissionPlanner.plan_from_density
+    in-memory  calculate_drift_parallel holding the whole cloud, then
+               plan_mission (skipped above --max-in-memory)
+
+Peak traced memory (tracemalloc, which sees numpy buffers) stays flat for
+the streaming path while the in-memory one grows with the cloud. Where
+both run, the table checks that the streamed moments are bit-for-bit the
+in-memory ones and how many of the streamed critical-path cells lie
+within one cell of a reference cell (the streamed grid is placed from the
+first chunk, so cell edges differ slightly), and reports the top-cell
+tracker's error bound.
+
+Usage:
+    python benchmarks/bench_streaming_stats.py [--counts 1e6,1e7,1e8] [--max-in-memory 1e7]
+"""
+
+import argparse
+import math
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from drift_engine import DEFAULT_PARALLEL_CHUNK, BayesianDriftEngine, DriftMoments
+from mission_planner import MissionPlanner
+from streaming_stats import summarize_drift
+
+PARAMS = {
+    "lkp": (54.30, 3.15),
+    "wind": {"speed": 35.0, "direction": 270},
+    "current": {"speed": 2.8, "direction": 45},
+    "hours": 4.0,
+    "leeway": {"slope": 0.03, "offset": 0.1, "slope_sd": 0.005, "offset_sd": 0.02}
+}
+SEED = 7
+
+
+def measure(fn):
+    """(result, seconds, peak traced MB) of fn()."""
+    tracemalloc.reset_peak()
+    start_mb = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    return result, elapsed, (tracemalloc.get_traced_memory()[1] - start_mb) / 1e6
+
+
+def matched_cells(path, reference) -> int:
+    """Cells of `path` within one cell edge of some cell of `reference`."""
+    def near(a, b) -> bool:
+        d_lat = (a.center_lat - b.center_lat) * 60.0
+        d_lon = (a.center_lon - b.center_lon) * 60.0 * math.cos(math.radians(a.center_lat))
+        return math.hypot(d_lat, d_lon) <= max(a.size_nm, b.size_nm)
+    return sum(any(near(cell, other) for other in reference) for cell in path)
+
+
+def run(args):
+    engine = BayesianDriftEngine()
+    planner = MissionPlanner(grid_mode='nm')
+    tracemalloc.start()
+    # Warm the thread's drift workspace so the first row does not carry its allocation
+    next(engine.iter_drift_chunks(**PARAMS, seed=SEED, n_particles=args.chunk, chunk_size=args.chunk))
+
+    print(f"{'particles':>12} {'mode':<10} {'s':>8} {'Mpart/s':>8} {'peak MB':>9} {'moments':>8} {'path':>5} {'hot err':>9}")
+    for n in args.counts:
+        def stream():
+            summary = summarize_drift(engine, planner, PARAMS, SEED, n, chunk_size=args.chunk)
+            return summary, planner.plan_from_density(summary.moments_tuple(), summary.density.density())
+
+        (summary, plan), elapsed, peak = measure(stream)
+        print(f"{n:>12,} {'stream':<10} {elapsed:8.2f} {n / elapsed / 1e6:8.2f} {peak:9.1f} {'':>8} {'':>5} "
+              f"{summary.top_cells.error_bound:9.2e}")
+
+        if n > args.max_in_memory:
+            continue
+
+        def in_memory():
+            cloud, moments = engine.calculate_drift_parallel(**PARAMS, seed=SEED, n_particles=n,
+                                                             chunk_size=args.chunk, workers=1)
+            return moments, planner.plan_mission(cloud)
+
+        (moments, reference), elapsed, peak = measure(in_memory)
+        same = all(getattr(moments, name) == getattr(summary.moments, name) for name in DriftMoments.__dataclass_fields__)
+        shared = matched_cells(plan.critical_path, reference.critical_path)
+        print(f"{n:>12,} {'in-memory':<10} {elapsed:8.2f} {n / elapsed / 1e6:8.2f} {peak:9.1f} "
+              f"{'same' if same else 'DIFF':>8} {shared:>2}/{len(plan.critical_path):<2} {'':>9}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=lambda s: [int(float(x)) for x in s.split(",")], default=[10**6, 10**7, 10**8])
+    parser.add_argument("--max-in-memory", type=lambda s: int(float(s)), default=10**7)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_PARALLEL_CHUNK)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,332 @@
+"""
+Regression benchmark suite for the drift engine, mission planner and API.
+
+Sweeps particle counts through calculate_drift and the planner stages,
+runs the three ScenarioLibrary scenarios end to end, and drives the
+/simulate/* endpoints with concurrent requests through an in-process ASGI
+client (no network) backed by a real SimulationPool of --workers
+processes, as in production (0 runs inline, which only measures how the
+event loop queues). Every case runs in a fresh process so its peak RSS
+is its own.
+
+Reports p50/p95/p99 latency, throughput and peak RSS per case, writes the
+results as JSON and, given a baseline file, flags every case whose p50
+latency is slower by more than --threshold and more than --min-delta-ms
+(timer jitter on sub-millisecond cases) with exit status 1. The JSON
+records the library versions and case parameters only, no machine
+details or paths. Regenerate the baseline with --update-baseline --runs 3
+(each case keeps its median pass) on the machine that runs the
+comparison, and whenever a change is meant to move the numbers.
+
+Usage:
+    python benchmarks/bench_suite.py [--groups engine,planner,scenarios,http]
+        [--sizes 1e3,1e4,1e5,1e6,1e7] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--threshold 0.25]
+        [--workers 2] [--runs 3] [--update-baseline] [--quick]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_SIZES = "1e3,1e4,1e5,1e6,1e7"
+GROUPS = ("engine", "planner", "scenarios", "http")
+DEFAULT_MIN_DELTA_MS = 0.1  # Smaller p50 differences are jitter, whatever their ratio
+DEFAULT_HTTP_WORKERS = 2  # Fixed, not os.cpu_count(), so the cases are the same on every machine
+# Arguments that locate files rather than describe the run; left out of the report
+LOCAL_ARGS = ("output", "baseline", "update_baseline")
+
+LKP = (54.30, 3.15)
+WIND = {"speed": 35.0, "direction": 270}
+CURRENT = {"speed": 2.8, "direction": 45}
+HOURS = 4.0
+DRIFT_PAYLOAD = {"lkp": list(LKP), "wind": WIND, "current": CURRENT, "hours": HOURS}
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles (ms) and throughput for a list of call durations (s)."""
+    timings = np.asarray(samples)
+    return {
+        "samples": int(timings.size),
+        "p50_ms": float(np.percentile(timings, 50) * 1e3),
+        "p95_ms": float(np.percentile(timings, 95) * 1e3),
+        "p99_ms": float(np.percentile(timings, 99) * 1e3),
+        "throughput_per_s": float(timings.size / timings.sum()),
+    }
+
+
+def time_calls(fn: Callable[[int], object], repeats: int, budget_s: float) -> List[float]:
+    """Times fn(i) up to `repeats` times, stopping early (after 3 calls) once budget_s is spent."""
+    fn(repeats)  # Warm-up (imports, allocator, caches) on a seed the timed calls don't use
+    samples = []
+    started = time.perf_counter()
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+        if len(samples) >= 3 and time.perf_counter() - started > budget_s:
+            break
+    return samples
+
+
+# --- Cases (each runs in its own process) ---
+
+def case_engine(n: int, repeats: int, budget_s: float) -> Dict:
+    from drift_engine import BayesianDriftEngine
+    engine = BayesianDriftEngine(iterations=n)
+    samples = time_calls(lambda i: engine.calculate_drift(LKP, WIND, CURRENT, HOURS, rng=i), repeats, budget_s)
+    result = summarize(samples)
+    result["particles_per_s"] = result["throughput_per_s"] * n
+    return result
+
+
+def case_planner(stage: str, n: int, repeats: int, budget_s: float) -> Dict:
+    from drift_engine import BayesianDriftEngine
+    from mission_planner import MissionPlanner
+    cloud = BayesianDriftEngine(iterations=n).calculate_drift(LKP, WIND, CURRENT, HOURS, rng=0)
+    planner = MissionPlanner()
+    nm_planner = MissionPlanner(grid_mode='nm')
+    quadtree_planner = MissionPlanner(grid_mode='quadtree')
+    calls = {
+        "analyze_distribution_geometry": lambda i: planner.analyze_distribution_geometry(cloud.latitudes, cloud.longitudes),
+        "generate_critical_path": lambda i: planner.generate_critical_path(cloud.latitudes, cloud.longitudes),
+        "generate_critical_path_nm": lambda i: nm_planner.generate_critical_path(cloud.latitudes, cloud.longitudes),
+        "generate_critical_path_quadtree":
+            lambda i: quadtree_planner.generate_critical_path(cloud.latitudes, cloud.longitudes),
+        "plan_mission": lambda i: planner.plan_mission(cloud),
+    }
+    result = summarize(time_calls(calls[stage], repeats, budget_s))
+    result["particles_per_s"] = result["throughput_per_s"] * n
+    return result
+
+
+def case_scenario(scenario_id: str, n: int, repeats: int, budget_s: float) -> Dict:
+    from drift_engine import BayesianDriftEngine
+    from mission_planner import MissionPlanner
+    from scenario_library import ScenarioLibrary
+    scenario = {s.scenario_id: s for s in ScenarioLibrary.get_all_scenarios()}[scenario_id]
+    engine = BayesianDriftEngine(iterations=n)
+    planner = MissionPlanner()
+    params = scenario.drift_params()
+
+    def run(i):
+        cloud = engine.calculate_drift(**params, rng=i)
+        engine.get_search_area_stats(cloud)
+        planner.plan_mission(cloud)
+
+    return summarize(time_calls(run, repeats, budget_s))
+
+
+def case_http(endpoint: str, concurrency: int, rounds: int, workers: int) -> Dict:
+    import httpx
+    import main
+    from simulation_pool import SimulationPool
+
+    # Per-request seeds: neither the result cache nor coalescing of identical requests answers
+    payloads = {
+        "/simulate/drift": lambda i: {**DRIFT_PAYLOAD, "seed": i + 1},
+        "/simulate/drift/batch": lambda i: {"requests": [DRIFT_PAYLOAD] * 8, "seed": i + 1},
+        "/simulate/drift/trajectory": lambda i: {**DRIFT_PAYLOAD, "dt": 1.0, "seed": i + 1},
+        "/simulate/scenario": lambda i: {"scenario_id": ("north_sea", "mediterranean", "atlantic")[i % 3], "seed": i + 1},
+    }
+    payload = payloads[endpoint]
+
+    async def drive():
+        main.worker_pool = SimulationPool(max_workers=workers, max_queue=concurrency,
+                                          iterations=main.drift_engine.iterations)
+        transport = httpx.ASGITransport(app=main.app)
+        latencies, statuses = [], []
+
+        async def one(client, i):
+            start = time.perf_counter()
+            response = await client.post(endpoint, json=payload(i))
+            latencies.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            # One untimed round spawns the pool workers and warms every one of them up
+            warmup = rounds * concurrency
+            await asyncio.gather(*(client.post(endpoint, json=payload(warmup + k)) for k in range(concurrency)))
+            started = time.perf_counter()
+            for r in range(rounds):
+                await asyncio.gather(*(one(client, r * concurrency + k) for k in range(concurrency)))
+            elapsed = time.perf_counter() - started
+        main.worker_pool.shutdown()
+        return latencies, statuses, elapsed
+
+    latencies, statuses, elapsed = asyncio.run(drive())
+    result = summarize(latencies)
+    ok = statuses.count(200)
+    result["throughput_per_s"] = ok / elapsed  # Requests/s under load, not 1 / latency
+    result["errors"] = len(statuses) - ok
+    return result
+
+
+CASES = {
+    "engine": case_engine,
+    "planner": case_planner,
+    "scenario": case_scenario,
+    "http": case_http,
+}
+
+
+def _child(conn, kind: str, args: tuple) -> None:
+    try:
+        result = CASES[kind](*args)
+        # Linux reports ru_maxrss in KiB
+        result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+        conn.send(("ok", result))
+    except Exception as e:  # Reported, not raised: one failing case must not abort the suite
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_isolated(kind: str, *args) -> Dict:
+    """Runs one case in a fresh spawned process and returns its metrics."""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child, args=(child, kind, args))
+    process.start()
+    child.close()
+    try:
+        status, payload = parent.recv()
+    except EOFError:  # Child died without reporting (e.g. killed for memory)
+        status, payload = "error", "case process exited unexpectedly"
+    process.join()
+    if status != "ok":
+        return {"error": payload}
+    return payload
+
+
+def build_plan(args) -> List[tuple]:
+    """(case name, kind, args) for every selected case."""
+    sizes = [int(float(s)) for s in args.sizes.split(",") if s]
+    groups = [g for g in args.groups.split(",") if g]
+    plan = []
+    if "engine" in groups:
+        for n in sizes:
+            plan.append((f"engine.calculate_drift[n={n}]", "engine", (n, args.repeats, args.budget)))
+    if "planner" in groups:
+        for stage in ("analyze_distribution_geometry", "generate_critical_path", "generate_critical_path_nm",
+                      "generate_critical_path_quadtree", "plan_mission"):
+            for n in sizes:
+                plan.append((f"planner.{stage}[n={n}]", "planner", (stage, n, args.repeats, args.budget)))
+    if "scenarios" in groups:
+        for scenario_id in ("NORTH_SEA_001", "MED_TRAFFIC_002", "ATLANTIC_DEEP_003"):
+            plan.append((f"scenario.{scenario_id}[n={args.scenario_particles}]", "scenario",
+                         (scenario_id, args.scenario_particles, args.repeats, args.budget)))
+    if "http" in groups:
+        for endpoint in ("/simulate/drift", "/simulate/drift/batch", "/simulate/drift/trajectory", "/simulate/scenario"):
+            plan.append((f"http{endpoint}[c={args.concurrency},w={args.workers}]", "http",
+                         (endpoint, args.concurrency, args.rounds, args.workers)))
+    return plan
+
+
+def median_run(case_runs: List[Dict]) -> Dict:
+    """The run with the median p50 of a case (an error if any run failed)."""
+    failed = [run for run in case_runs if "error" in run]
+    if failed:
+        return failed[0]
+    return sorted(case_runs, key=lambda run: run["p50_ms"])[(len(case_runs) - 1) // 2]
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> List[str]:
+    """Prints a p50 comparison against the baseline and returns the regressed case names."""
+    regressions = []
+    print(f"\n{'case':<58} {'base p50':>10} {'p50':>10} {'ratio':>7}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None or "p50_ms" not in before or "p50_ms" not in current:
+            continue
+        ratio = current["p50_ms"] / before["p50_ms"] if before["p50_ms"] > 0 else float("inf")
+        slower = current["p50_ms"] - before["p50_ms"] > min_delta_ms
+        flag = "  REGRESSION" if ratio > 1.0 + threshold and slower else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<58} {before['p50_ms']:>8.2f}ms {current['p50_ms']:>8.2f}ms {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", default=",".join(GROUPS), help="Comma-separated subset of " + ",".join(GROUPS))
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Particle counts for engine/planner sweeps")
+    parser.add_argument("--scenario-particles", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=20, help="Max timed calls per engine/planner/scenario case")
+    parser.add_argument("--budget", type=float, default=5.0, help="Seconds per case before stopping early")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds of --concurrency HTTP requests")
+    parser.add_argument("--workers", type=int, default=DEFAULT_HTTP_WORKERS,
+                        help="HTTP pool worker processes (0 = inline on the event loop)")
+    parser.add_argument("--output", type=Path, default=BENCH_DIR / "results.json")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed p50 slowdown (0.25 = +25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Smallest p50 slowdown (ms) counted as a regression")
+    parser.add_argument("--runs", type=int, default=1,
+                        help="Passes over all cases; each case reports its median-p50 pass (use 3+ for a baseline)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--quick", action="store_true", help="Smoke run: sizes up to 1e5 only")
+    args = parser.parse_args()
+    if args.quick:
+        # Same repeats and rounds as a full run, so its cases compare with a full baseline
+        args.sizes = "1e3,1e4,1e5"
+
+    plan = build_plan(args)
+    runs = {name: [] for name, _, _ in plan}
+    print(f"{'case':<58} {'p50':>9} {'p95':>9} {'p99':>9} {'per s':>10} {'RSS MB':>7}")
+    # Whole passes rather than back-to-back repeats of a case, so a slow spell of the
+    # machine is spread over the cases instead of landing on one
+    for _ in range(max(args.runs, 1)):
+        for name, kind, case_args in plan:
+            result = run_isolated(kind, *case_args)
+            runs[name].append(result)
+            if "error" in result:
+                print(f"{name:<58} ERROR {result['error']}")
+                continue
+            print(f"{name:<58} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+                  f"{result['throughput_per_s']:>10.1f} {result['peak_rss_mb']:>7.1f}")
+    results = {name: median_run(case_runs) for name, case_runs in runs.items()}
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "args": {k: str(v) for k, v in vars(args).items() if k not in LOCAL_ARGS},
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    exit_code = 0
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline updated: {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline["results"], args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            exit_code = 1
+    if any("error" in r for r in results.values()):
+        exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,260 @@
+"""
+Compact binary export of probability grids and particle clouds.
+
+The dashboard needs the full probability surface (and sometimes the raw
+cloud), which as JSON lists is large and slow to encode. A SARB payload is
+a small JSON header followed by raw little-endian array buffers:
+
+    offset 0   b"SARB"                 magic
+           4   uint8                   format version (1)
+           5   uint8                   flags (bit 0: buffer section is zlib-compressed)
+           6   uint16 (reserved, 0)
+           8   uint32 little-endian    header length H
+          12   H bytes                 UTF-8 JSON header (space-padded so 12+H % 8 == 0)
+        12+H   buffer section          arrays in header order, each 8-byte aligned
+
+The header lists every array as {"name", "dtype", "shape", "offset",
+"nbytes", "filters"} with offsets relative to the (decompressed) buffer
+section, next to the grid bounds, density_scale and caller metadata.
+Arrays are:
+
+    density     '<u2' (rows, cols)  probability mass per cell, quantised:
+                                    mass = value * scale; rows run south to
+                                    north over [lat_min, lat_max], columns
+                                    west to east over [lon_min, lon_max]
+    latitudes   '<f4' (n,)          or '<u2' quantised over [lat_min, lat_max]
+    longitudes  '<f4' (n,)          or '<u2' quantised over [lon_min, lon_max]
+    weights     '<f4' (n,)          only for non-uniform clouds
+
+Uncompressed buffers are written straight from the arrays (a numpy view is
+only cast when its dtype or byte order differs), so encoding costs one
+join, and browsers read them with typed-array views over the response
+ArrayBuffer (Uint16Array / Float32Array at the given offsets).
+
+Compression reorders the particles by latitude (their order carries no
+information) and runs Blosc-style filters before zlib, undone in reverse
+order on decode:
+
+    delta    a[i] - a[i-1] in the array's integer type (wrapping); decode
+             with a cumulative sum in that type
+    shuffle  byte planes: all first bytes, then all second bytes, ...
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"SARB"
+VERSION = 1
+FLAG_ZLIB = 0x01
+MEDIA_TYPE = "application/vnd.sar.grid"
+
+_PREFIX = struct.Struct("<4sBBHI")
+_U16_MAX = 65535
+ZLIB_LEVEL = 1  # Higher levels gain little on shuffled planes and cost 3-10x the time
+
+
+def quantize_density(H: np.ndarray) -> Tuple[np.ndarray, float]:
+    """uint16 grid and the scale that maps it back to probability mass."""
+    peak = float(H.max()) if H.size else 0.0
+    scale = peak / _U16_MAX if peak > 0 else 1.0
+    quantized = np.rint(H / scale).astype('<u2')
+    return quantized, scale
+
+
+def quantize_positions(values: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """Positions as uint16 steps over [lo, hi] (~0.5 m for a 20 nm box)."""
+    span = hi - lo if hi > lo else 1.0
+    scaled = np.subtract(values, lo, dtype=np.float64)
+    scaled *= _U16_MAX / span
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, 0, _U16_MAX, out=scaled)
+    return scaled.astype('<u2')
+
+
+def _apply_filters(array: np.ndarray, filters: List[str]) -> np.ndarray:
+    for name in filters:
+        if name == 'delta':
+            array = np.diff(array.ravel(), prepend=array.dtype.type(0))
+        elif name == 'shuffle':
+            array = np.ascontiguousarray(array.reshape(-1).view(np.uint8).reshape(-1, array.dtype.itemsize).T)
+        else:
+            raise ValueError(f"unknown filter {name!r}")
+    return array
+
+
+def _undo_filters(raw: np.ndarray, dtype: np.dtype, shape: List[int], filters: List[str]) -> np.ndarray:
+    array = raw
+    for name in reversed(filters):
+        if name == 'shuffle':
+            array = np.ascontiguousarray(array.view(np.uint8).reshape(dtype.itemsize, -1).T).view(dtype).ravel()
+        elif name == 'delta':
+            array = np.cumsum(array, dtype=dtype)
+        else:
+            raise ValueError(f"unknown filter {name!r}")
+    return array.view(dtype).reshape(shape)
+
+
+def encode(arrays: List[Tuple[str, np.ndarray]],
+           meta: Dict[str, Any],
+           compress: bool = False,
+           filters: Optional[Dict[str, List[str]]] = None) -> bytes:
+    """
+    Packs named arrays and metadata into one SARB payload.
+    
+    `filters` maps array names to filter chains; they are only applied when
+    compressing, since they exist to make zlib's job easier.
+    """
+    filters = filters if compress and filters else {}
+    entries = []
+    buffers = []
+    offset = 0
+    for name, array in arrays:
+        # No-op for contiguous little-endian arrays
+        array = np.ascontiguousarray(array).astype(np.dtype(array.dtype).newbyteorder('<'), copy=False)
+        chain = filters.get(name, [])
+        entries.append({
+            "name": name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+            "nbytes": array.nbytes,
+            "filters": chain
+        })
+        buffers.append(memoryview(_apply_filters(array, chain)).cast('B'))
+        offset += array.nbytes
+        # Keep every array aligned for typed-array views on the client
+        if offset % 8:
+            buffers.append(bytes(8 - offset % 8))
+            offset += 8 - offset % 8
+
+    section = b"".join(buffers)
+    flags = 0
+    if compress:
+        section = zlib.compress(section, ZLIB_LEVEL)
+        flags |= FLAG_ZLIB
+    header = json.dumps({**meta, "arrays": entries}, separators=(",", ":")).encode()
+    header += b" " * (-(_PREFIX.size + len(header)) % 8)
+    return b"".join([_PREFIX.pack(MAGIC, VERSION, flags, 0, len(header)), header, section])
+
+
+def _read_prefix(payload: bytes) -> Tuple[int, Dict[str, Any], int]:
+    if len(payload) < _PREFIX.size:
+        raise ValueError("not a SARB v1 payload")
+    magic, version, flags, _, header_len = _PREFIX.unpack_from(payload, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a SARB v1 payload")
+    start = _PREFIX.size
+    if start + header_len > len(payload):
+        raise ValueError("truncated SARB header")
+    header = json.loads(bytes(payload[start:start + header_len]))
+    return flags, header, start + header_len
+
+
+def read_header(payload: bytes) -> Dict[str, Any]:
+    """The JSON header alone, without touching (or decompressing) the buffers."""
+    return _read_prefix(payload)[1]
+
+
+def decode(payload: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Inverse of encode: (header, {name: array}).
+    
+    Uncompressed arrays are views of `payload`, which may be any buffer,
+    e.g. an mmap of a SARB file (the arrays then page in on access).
+    """
+    flags, header, start = _read_prefix(payload)
+    section = memoryview(payload)[start:]
+    if flags & FLAG_ZLIB:
+        section = zlib.decompress(section)
+    arrays = {}
+    for entry in header["arrays"]:
+        dtype = np.dtype(entry["dtype"])
+        raw = np.frombuffer(section, dtype=dtype, count=int(np.prod(entry["shape"])), offset=entry["offset"])
+        arrays[entry["name"]] = _undo_filters(raw, dtype, entry["shape"], entry.get("filters", []))
+    return header, arrays
+
+
+def encode_heatmap(H: np.ndarray,
+                   lat_edges: np.ndarray,
+                   lon_edges: np.ndarray,
+                   latitudes: Optional[np.ndarray] = None,
+                   longitudes: Optional[np.ndarray] = None,
+                   weights: Optional[np.ndarray] = None,
+                   particle_encoding: str = 'f4',
+                   compress: bool = False,
+                   meta: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    SARB payload with the quantised density grid and, optionally, the particles.
+
+    Args:
+        H: Probability mass per cell (rows = latitude bins)
+        lat_edges, lon_edges: Bin edges in degrees
+        latitudes, longitudes, weights: Particle cloud to include (optional)
+        particle_encoding: 'f4' (float32) or 'u2' (uint16 over the grid bounds)
+        compress: zlib the buffer section; particles are then sorted by
+            latitude and filtered (see module docstring)
+        meta: Extra header fields (e.g. search stats)
+    """
+    if particle_encoding not in ('f4', 'u2'):
+        raise ValueError("particle_encoding must be 'f4' or 'u2'")
+    density, scale = quantize_density(H)
+    lat_min, lat_max = float(lat_edges[0]), float(lat_edges[-1])
+    lon_min, lon_max = float(lon_edges[0]), float(lon_edges[-1])
+    header = {
+        **(meta or {}),
+        "bounds": {"lat_min": lat_min, "lat_max": lat_max, "lon_min": lon_min, "lon_max": lon_max},
+        "density_scale": scale,
+    }
+    arrays = [("density", density)]
+    # The sparse grid compresses better as-is than byte-shuffled
+    filters = {}
+    if latitudes is not None:
+        header["particles"] = int(latitudes.shape[0])
+        header["particle_encoding"] = particle_encoding
+        if particle_encoding == 'u2':
+            lats = quantize_positions(latitudes, lat_min, lat_max)
+            lons = quantize_positions(longitudes, lon_min, lon_max)
+        else:
+            lats = latitudes.astype('<f4', copy=False)
+            lons = longitudes.astype('<f4', copy=False)
+        if compress:
+            # Sorted latitudes turn into tiny deltas; 16-bit keys sort by radix
+            keys = lats if particle_encoding == 'u2' else quantize_positions(latitudes, lat_min, lat_max)
+            order = np.argsort(keys, kind='stable')
+            lats, lons = lats[order], lons[order]
+            weights = None if weights is None else weights[order]
+            header["particle_order"] = "latitude"
+            filters["latitudes"] = ['delta', 'shuffle'] if particle_encoding == 'u2' else ['shuffle']
+            filters["longitudes"] = ['shuffle']
+            filters["weights"] = ['shuffle']
+        arrays.append(("latitudes", lats))
+        arrays.append(("longitudes", lons))
+        if weights is not None:
+            arrays.append(("weights", weights.astype('<f4', copy=False)))
+    return encode(arrays, header, compress, filters)
+
+
+def decode_heatmap(payload: bytes) -> Dict[str, Any]:
+    """
+    Decodes an encode_heatmap payload back to floats.
+
+    Returns the header plus 'density' (probability mass, float64) and, when
+    present, 'latitudes'/'longitudes' (degrees) and 'weights'.
+    """
+    header, arrays = decode(payload)
+    bounds = header["bounds"]
+    result = dict(header)
+    result["density"] = arrays["density"] * header["density_scale"]
+    if "latitudes" in arrays:
+        lats, lons = arrays["latitudes"], arrays["longitudes"]
+        if header.get("particle_encoding") == 'u2':
+            lats = bounds["lat_min"] + lats * ((bounds["lat_max"] - bounds["lat_min"]) / _U16_MAX)
+            lons = bounds["lon_min"] + lons * ((bounds["lon_max"] - bounds["lon_min"]) / _U16_MAX)
+        result["latitudes"], result["longitudes"] = lats, lons
+        if "weights" in arrays:
+            result["weights"] = arrays["weights"]
+    return result
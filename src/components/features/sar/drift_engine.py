@@ -1,6 +1,184 @@
+import math
+import os
+import threading
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from particle_cloud import ParticleCloud
+from forcing_fields import ForcingFields
+from samplers import DEFAULT_REPLICATES, NormalSampler, replicate_bounds
+
+# Anything np.random.default_rng accepts: None (fresh entropy), an int seed,
+# a SeedSequence, or an existing Generator (used as-is)
+RandomSource = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+# Integration step (hours) used with gridded forcing when no dt is given
+DEFAULT_FORCING_DT = 0.5
+
+# Particles per parallel chunk; fixed so results do not depend on the worker count
+DEFAULT_PARALLEL_CHUNK = 1 << 18
+
+# Unbiased weighted variances divide by W - sum(w^2) / W, which vanishes when
+# (nearly) all weight sits on one particle; below this fraction of W the plain
+# weighted variance (divide by W) is used instead
+MIN_WEIGHTED_DENOMINATOR = 1e-9
+
+_thread_workspaces = threading.local()
+
+class DriftWorkspace:
+    """
+    Reusable particle-length buffers for drift runs on one thread.
+    
+    Buffers are kept per name and dtype, grow to the largest particle count
+    requested and are handed out as views of their first n elements, so
+    repeated runs of the same size allocate nothing new. A cloud computed
+    into a workspace is a view of its buffers: it is overwritten by the
+    next run that uses the same workspace, so copy what must outlive it.
+    """
+    
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, str], np.ndarray] = {}
+    
+    def get(self, name: str, n: int, dtype=np.float64, rows: int = 1) -> np.ndarray:
+        """Uninitialised (n,) view, or (rows, n) when rows > 1."""
+        key = (name, np.dtype(dtype).str)
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.size < rows * n:
+            buffer = np.empty(rows * n, dtype=dtype)
+            self._buffers[key] = buffer
+        # A prefix of the flat buffer stays contiguous (required by out= draws)
+        return buffer[:rows * n].reshape(rows, n) if rows > 1 else buffer[:n]
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+    
+    def clear(self) -> None:
+        """Releases every buffer."""
+        self._buffers.clear()
+
+def _buffer(workspace: Optional[DriftWorkspace], name: str, n: int, dtype=np.float64, rows: int = 1) -> np.ndarray:
+    """Workspace view, or a fresh array when running without a workspace."""
+    if workspace is None:
+        return np.empty((rows, n) if rows > 1 else n, dtype=dtype)
+    return workspace.get(name, n, dtype, rows)
+
+@dataclass
+class DriftSnapshot:
+    """Compact per-step summary of the particle cloud for time-lapse rendering."""
+    step: int
+    hours: float
+    mean_lat: float
+    mean_lon: float
+    std_dev_nm: float
+    confidence_radius_95: float
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+
+@dataclass
+class AdaptiveDriftReport:
+    """How an adaptive run sized its particle cloud and how precise it is."""
+    particles_used: int
+    chunks: int
+    converged: bool
+    tolerance_nm: float
+    centroid_error_nm: float  # Monte Carlo standard error of the centroid
+    radius_error_nm: float  # Monte Carlo standard error of confidence_radius_95
+
+@dataclass
+class DriftMoments:
+    """
+    Mergeable particle count, means and squared deviations (degrees).
+    
+    Chunks are summarised where they are simulated and merged with the
+    pairwise update of Chan et al., so search statistics never need the
+    full arrays in one place. Weighted chunks carry their weight sums
+    (w_sum, w2_sum); unweighted ones count each particle as weight 1, which
+    leaves the arithmetic identical to the plain count-based update.
+    """
+    n: int
+    mean_lat: float
+    mean_lon: float
+    m2_lat: float  # Sum of squared deviations from mean_lat
+    m2_lon: float
+    m2_cross: float = 0.0  # Sum of lat x lon deviation products
+    w_sum: Optional[float] = None  # Sum of weights (defaults to n)
+    w2_sum: Optional[float] = None  # Sum of squared weights (defaults to n)
+    
+    def __post_init__(self):
+        if self.w_sum is None:
+            self.w_sum = self.n
+        if self.w2_sum is None:
+            self.w2_sum = self.n
+    
+    @classmethod
+    def from_positions(cls,
+                       latitudes: np.ndarray,
+                       longitudes: np.ndarray,
+                       weights: Optional[np.ndarray] = None) -> 'DriftMoments':
+        if weights is None:
+            mean_lat = float(latitudes.mean(dtype=np.float64))
+            mean_lon = float(longitudes.mean(dtype=np.float64))
+            d = np.subtract(latitudes, mean_lat, dtype=np.float64)
+            m2_lat = float(np.dot(d, d))
+            e = np.subtract(longitudes, mean_lon, dtype=np.float64)
+            return cls(latitudes.shape[0], mean_lat, mean_lon, m2_lat, float(np.dot(e, e)), float(np.dot(d, e)))
+        
+        w_sum = float(weights.sum(dtype=np.float64))
+        mean_lat = float(np.dot(weights, latitudes)) / w_sum
+        mean_lon = float(np.dot(weights, longitudes)) / w_sum
+        d = np.subtract(latitudes, mean_lat, dtype=np.float64)
+        e = np.subtract(longitudes, mean_lon, dtype=np.float64)
+        wd = d * weights
+        return cls(latitudes.shape[0], mean_lat, mean_lon, float(np.dot(wd, d)), float(np.dot(weights * e, e)),
+                   float(np.dot(wd, e)), w_sum, float(np.dot(weights, weights)))
+    
+    def merge(self, other: 'DriftMoments') -> 'DriftMoments':
+        w = self.w_sum + other.w_sum
+        if w == 0:
+            return self
+        factor = self.w_sum * other.w_sum / w
+        d_lat = other.mean_lat - self.mean_lat
+        d_lon = other.mean_lon - self.mean_lon
+        return DriftMoments(
+            n=self.n + other.n,
+            mean_lat=self.mean_lat + d_lat * other.w_sum / w,
+            mean_lon=self.mean_lon + d_lon * other.w_sum / w,
+            m2_lat=self.m2_lat + other.m2_lat + d_lat * d_lat * factor,
+            m2_lon=self.m2_lon + other.m2_lon + d_lon * d_lon * factor,
+            m2_cross=self.m2_cross + other.m2_cross + d_lat * d_lon * factor,
+            w_sum=w,
+            w2_sum=self.w2_sum + other.w2_sum
+        )
+    
+    def _denominator(self) -> float:
+        # Reliability-weighted unbiased normalisation (np.cov aweights); n - 1 when unweighted
+        if self.w_sum <= 0:
+            return 0.0
+        denominator = self.w_sum - self.w2_sum / self.w_sum
+        return denominator if denominator > MIN_WEIGHTED_DENOMINATOR * self.w_sum else self.w_sum
+    
+    def covariance(self) -> np.ndarray:
+        """2x2 lat/lon covariance in degrees, as MissionPlanner.distribution_moments."""
+        denominator = self._denominator()
+        if denominator <= 0:
+            return np.zeros((2, 2))
+        return np.array([[self.m2_lat, self.m2_cross],
+                         [self.m2_cross, self.m2_lon]]) / denominator
+    
+    def search_area_stats(self) -> Dict:
+        """Same fields as BayesianDriftEngine.get_search_area_stats."""
+        denominator = self._denominator()
+        std_lat = math.sqrt(self.m2_lat / denominator) if denominator > 0 else 0.0
+        return {
+            "mean_lat": self.mean_lat,
+            "mean_lon": self.mean_lon,
+            "std_dev_nm": std_lat * 60,
+            "confidence_radius_95": std_lat * 60 * 1.96
+        }
 
 class BayesianDriftEngine:
     """
@@ -8,11 +186,21 @@ class BayesianDriftEngine:
     to infer Search and Rescue (SAR) probability areas.
     """
     
-    def __init__(self, iterations: int = 10000):
+    def __init__(self, iterations: int = 10000, dtype=np.float64):
         self.iterations = iterations
+        # float32 halves particle memory; ~0.5 m positional resolution
+        self.dtype = np.dtype(dtype)
         # Standard Leeway coefficients (simplified for generic life rafts)
         self.leeway_slope = 0.03  # 3% of wind speed
         self.leeway_offset = 0.02 # knots
+    
+    @staticmethod
+    def workspace() -> DriftWorkspace:
+        """The calling thread's DriftWorkspace (created on first use)."""
+        workspace = getattr(_thread_workspaces, 'workspace', None)
+        if workspace is None:
+            workspace = _thread_workspaces.workspace = DriftWorkspace()
+        return workspace
         
     def calculate_drift(
         self, 
@@ -20,8 +208,19 @@ class BayesianDriftEngine:
         wind: Dict[str, float], 
         current: Dict[str, float], 
         hours: float,
-        uncertainty_factor: float = 0.1
-    ) -> pd.DataFrame:
+        uncertainty_factor: float = 0.1,
+        dt: Optional[float] = None,
+        rng: RandomSource = None,
+        forcing: Optional[ForcingFields] = None,
+        n_particles: Optional[int] = None,
+        lkp_uncertainty_nm: float = 0.0,
+        lkp_reports: Optional[Sequence[Dict[str, float]]] = None,
+        leeway: Optional[Dict[str, float]] = None,
+        workspace: Optional[DriftWorkspace] = None,
+        out: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        sampler: Optional[str] = None,
+        replicates: int = DEFAULT_REPLICATES
+    ) -> ParticleCloud:
         """
         Computes the stochastic drift distribution.
         
@@ -31,53 +230,813 @@ class BayesianDriftEngine:
             current: {'speed': knots, 'direction': degrees_to}
             hours: Time elapsed since abandonment
             uncertainty_factor: Environmental noise (C1 level precision)
+            dt: Optional integration step (hours). When set, particles are
+                advanced step by step instead of in one straight-line jump.
+            rng: Seed or numpy Generator; equal seeds give identical clouds
+            forcing: Optional gridded wind/current fields. Components it
+                provides replace the scalar dicts; implies stepping (dt
+                defaults to DEFAULT_FORCING_DT).
+            n_particles: Cloud size override (defaults to self.iterations)
+            lkp_uncertainty_nm: 1-sigma position error of the LKP (0 = exact)
+            lkp_reports: Several conflicting position reports, each
+                {'lat', 'lon', 'uncertainty_nm', 'weight'}; particles start
+                from their weighted Gaussian mixture instead of the LKP
+            leeway: Craft leeway {'slope', 'offset', 'slope_sd', 'offset_sd'}
+                (engine defaults when omitted); nonzero spreads give every
+                particle its own coefficients
+            workspace: Take every temporary from this DriftWorkspace (e.g.
+                self.workspace()) instead of allocating; the cloud is then
+                a view of workspace buffers unless `out` is given
+            out: (latitudes, longitudes) arrays of n elements in the
+                engine's dtype to write the cloud into
+            sampler: Variance-reduced design for the random inputs ('mc',
+                'antithetic', 'stratified', 'halton', 'sobol'; see
+                samplers). None keeps the plain Generator draws.
+            replicates: Independent sampler blocks, for sampling_error
+        
+        Returns:
+            Uniformly weighted ParticleCloud in the engine's dtype.
+        """
+        rng = np.random.default_rng(rng)
+        n = self.iterations if n_particles is None else n_particles
+        # The engine only draws standard normals (and mixture counts), which the sampler stands in for
+        draws = rng if sampler is None else NormalSampler(sampler, rng, n, replicates)
+        if forcing is not None and dt is None:
+            dt = DEFAULT_FORCING_DT
+        if dt is not None:
+            final_lats = final_lons = None
+            for _, final_lats, final_lons in self._integrate(lkp, wind, current, hours, dt, uncertainty_factor, draws, forcing, n,
+                                                             lkp_uncertainty_nm, lkp_reports, leeway, workspace):
+                pass
+            if out is not None:
+                np.copyto(out[0], final_lats, casting='same_kind')
+                np.copyto(out[1], final_lons, casting='same_kind')
+                return ParticleCloud(out[0], out[1])
+            if workspace is not None and self.dtype != final_lats.dtype:
+                lats = workspace.get('lat', n, self.dtype)
+                lons = workspace.get('lon', n, self.dtype)
+                np.copyto(lats, final_lats, casting='same_kind')
+                np.copyto(lons, final_lons, casting='same_kind')
+                return ParticleCloud(lats, lons)
+            return ParticleCloud(
+                final_lats.astype(self.dtype, copy=False),
+                final_lons.astype(self.dtype, copy=False)
+            )
+        
+        # Output buffers: caller's arrays, workspace views or fresh arrays
+        if out is not None:
+            curr_speeds, lons = out
+        else:
+            curr_speeds = _buffer(workspace, 'lat', n, self.dtype)
+            lons = _buffer(workspace, 'lon', n, self.dtype)
+        
+        # 1. Stochastic Environmental Modeling
+        # Adding Gaussian noise to wind and current to simulate Bayesian uncertainty.
+        # Samples are drawn straight into the working buffers and transformed in place.
+        leeway_speed = draws.standard_normal(dtype=self.dtype, out=_buffer(workspace, 'leeway_speed', n, self.dtype))
+        leeway_speed *= wind['speed'] * uncertainty_factor
+        leeway_speed += wind['speed']
+        draws.standard_normal(dtype=self.dtype, out=curr_speeds)
+        curr_speeds *= current['speed'] * uncertainty_factor
+        curr_speeds += current['speed']
+        
+        # 2. Leeway Calculation (The "Physical" Naval Component)
+        # Drift = Current_Vector + Leeway_Vector
+        leeway_slope, leeway_offset = self._sample_leeway(leeway, draws, n, workspace)
+        leeway_speed *= leeway_slope
+        leeway_speed += leeway_offset
+        start = self._sample_initial_positions(lkp, lkp_uncertainty_nm, lkp_reports, draws, n, workspace)
+        
+        # 3. Vector Integration (Displacement in Nautical Miles)
+        # Latitude: 1 nm = 1/60 degree
+        # Longitude: 1 nm = 1/(60 * cos(lat)) degree, constant at the LKP latitude
+        # Scalar factors stay Python floats so float32 buffers are not upcast
+        wind_rad = math.radians(wind['direction'])
+        curr_rad = math.radians(current['direction'])
+        lat_scale = hours / 60.0
+        lon_scale = hours / (60.0 * math.cos(math.radians(lkp[0])))
+        
+        # 4. Spatial Projection (curr_speeds becomes the latitude buffer)
+        np.multiply(curr_speeds, math.sin(curr_rad) * lon_scale, out=lons)
+        lons += np.multiply(leeway_speed, math.sin(wind_rad) * lon_scale,
+                            out=_buffer(workspace, 'scratch', n, self.dtype))
+        
+        lats = curr_speeds
+        lats *= math.cos(curr_rad) * lat_scale
+        leeway_speed *= math.cos(wind_rad) * lat_scale
+        lats += leeway_speed
+        if start is None:
+            lats += lkp[0]
+            lons += lkp[1]
+        else:
+            lats += start[0]
+            lons += start[1]
+        
+        return ParticleCloud(lats, lons)
+
+    def calculate_drift_adaptive(
+        self,
+        lkp: Tuple[float, float],
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        hours: float,
+        tolerance_nm: float = 0.05,
+        max_particles: Optional[int] = None,
+        chunk_size: int = 2000,
+        uncertainty_factor: float = 0.1,
+        dt: Optional[float] = None,
+        rng: RandomSource = None,
+        forcing: Optional[ForcingFields] = None,
+        lkp_uncertainty_nm: float = 0.0,
+        lkp_reports: Optional[Sequence[Dict[str, float]]] = None,
+        leeway: Optional[Dict[str, float]] = None
+    ) -> Tuple[ParticleCloud, AdaptiveDriftReport]:
+        """
+        Grows the particle cloud in chunks until the search statistics converge.
+        
+        Sampling stops once the Monte Carlo standard errors of both the
+        centroid and confidence_radius_95 are within tolerance_nm, and
+        neither moved by more than tolerance_nm with the last chunk. After
+        the first chunk the remaining budget is estimated from the observed
+        variance, so easy cases stop early and hard ones jump straight to
+        the particle count they need.
+        
+        Args:
+            tolerance_nm: Target precision in nautical miles
+            max_particles: Hard particle budget (defaults to 10 x iterations)
+            chunk_size: Size of the first (pilot) chunk and minimum chunk
+            Remaining arguments as in calculate_drift.
+        """
+        if tolerance_nm <= 0:
+            raise ValueError("tolerance_nm must be positive")
+        rng = np.random.default_rng(rng)
+        if max_particles is None:
+            max_particles = 10 * self.iterations
+        chunk_size = max(2, min(chunk_size, max_particles))
+        
+        # Running moments in nm relative to the LKP (avoids cancellation in degrees)
+        lon_nm = 60.0 * math.cos(math.radians(lkp[0]))
+        n = 0
+        sx = sy = sxx = syy = 0.0
+        lat_chunks, lon_chunks = [], []
+        previous = None
+        converged = False
+        centroid_se = radius_se = float('inf')
+        next_size = chunk_size
+        
+        while n < max_particles:
+            chunk = self.calculate_drift(
+                lkp, wind, current, hours, uncertainty_factor=uncertainty_factor,
+                dt=dt, rng=rng, forcing=forcing, n_particles=next_size,
+                lkp_uncertainty_nm=lkp_uncertainty_nm, lkp_reports=lkp_reports, leeway=leeway
+            )
+            lat_chunks.append(chunk.latitudes)
+            lon_chunks.append(chunk.longitudes)
+            x = (chunk.latitudes - lkp[0]) * 60.0
+            y = (chunk.longitudes - lkp[1]) * lon_nm
+            n += next_size
+            sx += float(x.sum())
+            sy += float(y.sum())
+            sxx += float(np.dot(x, x))
+            syy += float(np.dot(y, y))
+            
+            mean_x, mean_y = sx / n, sy / n
+            var_x = max(sxx - sx * mean_x, 0.0) / (n - 1)
+            var_y = max(syy - sy * mean_y, 0.0) / (n - 1)
+            radius = 1.96 * math.sqrt(var_x)
+            centroid_se = math.sqrt((var_x + var_y) / n)
+            radius_se = 1.96 * math.sqrt(var_x / (2.0 * (n - 1)))
+            
+            settled = previous is not None and (
+                math.hypot(mean_x - previous[0], mean_y - previous[1]) <= tolerance_nm
+                and abs(radius - previous[2]) <= tolerance_nm
+            )
+            if settled and centroid_se <= tolerance_nm and radius_se <= tolerance_nm:
+                converged = True
+                break
+            previous = (mean_x, mean_y, radius)
+            
+            # Particles needed for both standard errors to reach the tolerance
+            needed = max((var_x + var_y) / tolerance_nm ** 2,
+                         1.96 ** 2 * var_x / (2.0 * tolerance_nm ** 2))
+            next_size = int(min(max(1.1 * needed - n, chunk_size), max_particles - n))
+        
+        cloud = ParticleCloud(np.concatenate(lat_chunks), np.concatenate(lon_chunks))
+        report = AdaptiveDriftReport(
+            particles_used=n,
+            chunks=len(lat_chunks),
+            converged=converged,
+            tolerance_nm=tolerance_nm,
+            centroid_error_nm=centroid_se,
+            radius_error_nm=radius_se
+        )
+        return cloud, report
+
+    def calculate_drift_parallel(
+        self,
+        lkp: Tuple[float, float],
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        hours: float,
+        uncertainty_factor: float = 0.1,
+        dt: Optional[float] = None,
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        forcing: Optional[ForcingFields] = None,
+        n_particles: Optional[int] = None,
+        lkp_uncertainty_nm: float = 0.0,
+        lkp_reports: Optional[Sequence[Dict[str, float]]] = None,
+        leeway: Optional[Dict[str, float]] = None,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_PARALLEL_CHUNK,
+        keep_particles: bool = True
+    ) -> Tuple[Optional[ParticleCloud], DriftMoments]:
+        """
+        calculate_drift split into fixed-size chunks run on a thread pool.
+        
+        Chunk k always holds particles [k * chunk_size, (k + 1) * chunk_size)
+        and draws from child k of SeedSequence(seed).spawn(), so a seed gives
+        bit-for-bit the same cloud and moments for any worker count (but not
+        the same cloud as calculate_drift(rng=seed), which uses one stream).
+        The RNG fills and ufunc loops release the GIL, so threads scale
+        without copying particles between processes.
+        
+        Args:
+            seed: Root seed; a SeedSequence spawns fresh children per call
+            workers: Threads (defaults to the CPU count; 1 runs inline)
+            chunk_size: Particles per chunk; part of the seeded result
+            keep_particles: False returns only the merged moments and keeps
+                memory to one chunk per worker
+            Remaining arguments as in calculate_drift.
+        
+        Returns:
+            (cloud or None, moments merged in chunk order)
+        """
+        n = self.iterations if n_particles is None else n_particles
+        chunk_size = max(1, chunk_size)
+        starts, seeds = self._chunk_plan(n, chunk_size, seed)
+        
+        if keep_particles:
+            latitudes = np.empty(n, dtype=self.dtype)
+            longitudes = np.empty(n, dtype=self.dtype)
+        
+        def run_chunk(k: int) -> DriftMoments:
+            size = min(chunk_size, n - starts[k])
+            # Chunks are written straight into the output; temporaries come
+            # from the worker thread's workspace
+            out = (latitudes[starts[k]:starts[k] + size], longitudes[starts[k]:starts[k] + size]) if keep_particles else None
+            chunk = self.calculate_drift(
+                lkp, wind, current, hours, uncertainty_factor=uncertainty_factor, dt=dt,
+                rng=np.random.default_rng(seeds[k]), forcing=forcing, n_particles=size,
+                lkp_uncertainty_nm=lkp_uncertainty_nm, lkp_reports=lkp_reports, leeway=leeway,
+                workspace=self.workspace(), out=out
+            )
+            return DriftMoments.from_positions(chunk.latitudes, chunk.longitudes)
+        
+        workers = min(workers or os.cpu_count() or 1, len(starts))
+        if workers <= 1:
+            partials = [run_chunk(k) for k in range(len(starts))]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(run_chunk, range(len(starts))))
+        
+        # Fixed left-to-right merge keeps the floating-point result reproducible
+        moments = DriftMoments(0, 0.0, 0.0, 0.0, 0.0)
+        for partial in partials:
+            moments = moments.merge(partial)
+        cloud = ParticleCloud(latitudes, longitudes) if keep_particles else None
+        return cloud, moments
+    
+    @staticmethod
+    def _chunk_plan(n: int,
+                    chunk_size: int,
+                    seed: Union[None, int, np.random.SeedSequence]) -> Tuple[List[int], List[np.random.SeedSequence]]:
+        """First particle and seed of every chunk of an n-particle chunked run."""
+        starts = list(range(0, n, chunk_size))
+        seeds = (seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)).spawn(len(starts))
+        return starts, seeds
+    
+    def iter_drift_chunks(
+        self,
+        lkp: Tuple[float, float],
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        hours: float,
+        uncertainty_factor: float = 0.1,
+        dt: Optional[float] = None,
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        forcing: Optional[ForcingFields] = None,
+        n_particles: Optional[int] = None,
+        lkp_uncertainty_nm: float = 0.0,
+        lkp_reports: Optional[Sequence[Dict[str, float]]] = None,
+        leeway: Optional[Dict[str, float]] = None,
+        chunk_size: int = DEFAULT_PARALLEL_CHUNK,
+        chunks: Optional[Tuple[int, int]] = None,
+        sampler: Optional[str] = None
+    ) -> Iterator[Tuple[int, ParticleCloud]]:
+        """
+        The chunks of calculate_drift_parallel, produced one at a time.
+        
+        Chunk k is bit-for-bit chunk k of calculate_drift_parallel with the
+        same seed and chunk_size, so disjoint chunk ranges can be run by
+        different workers and their summaries merged. Each yielded cloud is
+        a view of the calling thread's workspace that the next chunk
+        overwrites: fold it into accumulators before advancing. Peak memory
+        is one chunk however many particles the run has.
+        
+        Args:
+            seed: Root seed; must be an int (not None) when chunk ranges are
+                split across calls, so every call spawns the same children
+            chunks: [first, stop) chunk indices to produce (default: all)
+            sampler: As in calculate_drift, with one design per chunk (the
+                chunks then differ from calculate_drift_parallel's)
+            Remaining arguments as in calculate_drift_parallel.
+        
+        Yields:
+            (chunk index, chunk cloud)
         """
+        n = self.iterations if n_particles is None else n_particles
+        chunk_size = max(1, chunk_size)
+        starts, seeds = self._chunk_plan(n, chunk_size, seed)
+        first, stop = chunks if chunks is not None else (0, len(starts))
+        workspace = self.workspace()
+        for k in range(max(first, 0), min(stop, len(starts))):
+            yield k, self.calculate_drift(
+                lkp, wind, current, hours, uncertainty_factor=uncertainty_factor, dt=dt,
+                rng=np.random.default_rng(seeds[k]), forcing=forcing,
+                n_particles=min(chunk_size, n - starts[k]),
+                lkp_uncertainty_nm=lkp_uncertainty_nm, lkp_reports=lkp_reports, leeway=leeway,
+                workspace=workspace, sampler=sampler
+            )
+
+    def calculate_drift_batch(
+        self,
+        requests: Sequence[Dict],
+        uncertainty_factor: float = 0.1,
+        rng: RandomSource = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the drift distribution for many incidents in one pass.
+        
+        Args:
+            requests: Sequence of dicts with the calculate_drift arguments
+                ('lkp', 'wind', 'current', 'hours', optional
+                'lkp_uncertainty_nm' and 'leeway').
+            uncertainty_factor: Environmental noise shared by every request
+            rng: Seed or numpy Generator for the whole batch draw
+        
+        Returns:
+            (latitudes, longitudes) arrays of shape (n_requests, iterations).
+        """
+        n = len(requests)
+        if n == 0:
+            raise ValueError("requests must not be empty")
+        rng = np.random.default_rng(rng)
+        
+        # Per-request parameters as column vectors broadcast against particles
+        lkp_lat = np.array([float(r['lkp'][0]) for r in requests])[:, None]
+        lkp_lon = np.array([float(r['lkp'][1]) for r in requests])[:, None]
+        wind_speed = np.array([float(r['wind']['speed']) for r in requests])[:, None]
+        wind_rad = np.radians([float(r['wind']['direction']) for r in requests])[:, None]
+        curr_speed = np.array([float(r['current']['speed']) for r in requests])[:, None]
+        curr_rad = np.radians([float(r['current']['direction']) for r in requests])[:, None]
+        hours = np.array([float(r['hours']) for r in requests])[:, None]
+        leeways = [r.get('leeway') or {} for r in requests]
+        slope = np.array([float(lw.get('slope', self.leeway_slope)) for lw in leeways])[:, None]
+        offset = np.array([float(lw.get('offset', self.leeway_offset)) for lw in leeways])[:, None]
+        slope_sd = np.array([float(lw.get('slope_sd', 0.0)) for lw in leeways])[:, None]
+        offset_sd = np.array([float(lw.get('offset_sd', 0.0)) for lw in leeways])[:, None]
+        lkp_sigma = np.array([float(r.get('lkp_uncertainty_nm') or 0.0) for r in requests])[:, None]
+        
+        # 1. Stochastic Environmental Modeling (one draw for the whole batch)
+        shape = (n, self.iterations)
+        wind_speeds = rng.standard_normal(shape)
+        wind_speeds *= wind_speed * uncertainty_factor
+        wind_speeds += wind_speed
+        curr_speeds = rng.standard_normal(shape)
+        curr_speeds *= curr_speed * uncertainty_factor
+        curr_speeds += curr_speed
         
-        # Initialize simulation arrays
-        lats = np.full(self.iterations, lkp[0])
-        lons = np.full(self.iterations, lkp[1])
+        # 2. Leeway Calculation (per-particle coefficients only if any request has a spread)
+        leeway_speed = wind_speeds
+        if slope_sd.any() or offset_sd.any():
+            draws = rng.standard_normal((2,) + shape)
+            draws[0] *= slope_sd
+            draws[0] += slope
+            draws[1] *= offset_sd
+            draws[1] += offset
+            leeway_speed *= draws[0]
+            leeway_speed += draws[1]
+        else:
+            leeway_speed *= slope
+            leeway_speed += offset
+        
+        # 3. Vector Integration (Displacement in Nautical Miles)
+        dn = np.cos(wind_rad) * leeway_speed + np.cos(curr_rad) * curr_speeds
+        de = np.sin(wind_rad) * leeway_speed
+        de += np.sin(curr_rad) * curr_speeds
+        
+        # 4. Spatial Projection
+        dn *= hours / 60.0
+        dn += lkp_lat
+        de *= hours / (60.0 * np.cos(np.radians(lkp_lat)))
+        de += lkp_lon
+        
+        # 5. LKP position error (skipped when every request has an exact LKP)
+        if lkp_sigma.any():
+            offsets = rng.standard_normal((2,) + shape)
+            offsets[0] *= lkp_sigma / 60.0
+            offsets[1] *= lkp_sigma / (60.0 * np.cos(np.radians(lkp_lat)))
+            dn += offsets[0]
+            de += offsets[1]
+        return dn, de
+
+    def advance_drift(
+        self,
+        cloud: ParticleCloud,
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        hours: float,
+        uncertainty_factor: float = 0.1,
+        dt: Optional[float] = None,
+        rng: RandomSource = None,
+        forcing: Optional[ForcingFields] = None,
+        leeway: Optional[Dict[str, float]] = None,
+        workspace: Optional[DriftWorkspace] = None
+    ) -> ParticleCloud:
+        """
+        Moves an existing cloud forward by `hours` under new forcing.
+        
+        Particles continue from their current positions instead of the LKP,
+        so weights from earlier negative searches carry over and the cost
+        grows with the new interval only. Wind, current and leeway errors
+        are drawn afresh for the interval. Without dt or forcing the
+        interval is a single step, as in calculate_drift.
+        
+        Args:
+            cloud: Cloud to advance (left unchanged; may be read-only)
+            hours: Interval to advance by
+            Others as in calculate_drift
+        
+        Returns:
+            New ParticleCloud in the engine's dtype with the input's weights.
+        """
+        if hours <= 0:
+            raise ValueError("hours must be positive")
+        rng = np.random.default_rng(rng)
+        if dt is None:
+            dt = DEFAULT_FORCING_DT if forcing is not None else hours
+        lats = lons = None
+        for _, lats, lons in self._integrate(None, wind, current, hours, dt, uncertainty_factor, rng, forcing,
+                                             cloud.n_particles, leeway=leeway, workspace=workspace,
+                                             initial=(cloud.latitudes, cloud.longitudes)):
+            pass
+        # Copies out of the integration (workspace) buffers
+        advanced = ParticleCloud(lats.astype(self.dtype), lons.astype(self.dtype))
+        if not cloud.is_uniform:
+            advanced.set_weights(cloud.weights)
+        return advanced
+
+    def simulate_trajectory(
+        self,
+        lkp: Tuple[float, float],
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        hours: float,
+        dt: float = 1.0,
+        uncertainty_factor: float = 0.1,
+        rng: RandomSource = None,
+        forcing: Optional[ForcingFields] = None,
+        lkp_uncertainty_nm: float = 0.0,
+        lkp_reports: Optional[Sequence[Dict[str, float]]] = None,
+        leeway: Optional[Dict[str, float]] = None,
+        sampler: Optional[str] = None
+    ) -> Iterator[DriftSnapshot]:
+        """
+        Streams the drift evolution as one compact snapshot per time step.
         
+        A single pass covers the whole horizon, so rendering every hour costs
+        the same as one call to calculate_drift. Only the current step's
+        particle arrays are kept alive; the caller decides which snapshots
+        to retain. `sampler` is as in calculate_drift.
+        """
+        rng = np.random.default_rng(rng)
+        draws = rng if sampler is None else NormalSampler(sampler, rng, self.iterations)
+        steps = self._integrate(lkp, wind, current, hours, dt, uncertainty_factor, draws, forcing, self.iterations,
+                                lkp_uncertainty_nm, lkp_reports, leeway)
+        for step, (t, lats, lons) in enumerate(steps, start=1):
+            std_nm = float(lats.std(ddof=1) * 60)
+            yield DriftSnapshot(
+                step=step,
+                hours=t,
+                mean_lat=float(lats.mean()),
+                mean_lon=float(lons.mean()),
+                std_dev_nm=std_nm,
+                confidence_radius_95=std_nm * 1.96,
+                lat_min=float(lats.min()),
+                lat_max=float(lats.max()),
+                lon_min=float(lons.min()),
+                lon_max=float(lons.max())
+            )
+
+    def _sample_leeway(
+        self,
+        leeway: Optional[Dict[str, float]],
+        rng: np.random.Generator,
+        n: int,
+        workspace: Optional[DriftWorkspace] = None
+    ) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]:
+        """
+        Leeway (slope, offset): scalars, or per-particle arrays when the craft
+        model has a spread. Both arrays come from a single draw.
+        """
+        leeway = leeway or {}
+        slope = float(leeway.get('slope', self.leeway_slope))
+        offset = float(leeway.get('offset', self.leeway_offset))
+        slope_sd = float(leeway.get('slope_sd', 0.0))
+        offset_sd = float(leeway.get('offset_sd', 0.0))
+        if slope_sd <= 0 and offset_sd <= 0:
+            return slope, offset
+        draws = rng.standard_normal(dtype=self.dtype, out=_buffer(workspace, 'leeway', n, self.dtype, rows=2))
+        draws[0] *= slope_sd
+        draws[0] += slope
+        draws[1] *= offset_sd
+        draws[1] += offset
+        return draws[0], draws[1]
+
+    def _sample_initial_positions(
+        self,
+        lkp: Tuple[float, float],
+        lkp_uncertainty_nm: float,
+        lkp_reports: Optional[Sequence[Dict[str, float]]],
+        rng: np.random.Generator,
+        n: int,
+        workspace: Optional[DriftWorkspace] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Per-particle starting (lat, lon), or None when every particle starts at the LKP.
+        
+        With several reports, the number of particles starting from each one
+        is a single multinomial draw over the report weights; particles are
+        exchangeable, so each report fills a contiguous block of one batched
+        Gaussian draw and no per-particle component index is materialised.
+        """
+        if lkp_reports:
+            weights = np.array([float(r.get('weight', 1.0)) for r in lkp_reports])
+            if np.any(weights < 0) or not weights.sum() > 0:
+                raise ValueError("lkp_reports weights must be non-negative with positive total")
+            # A sampler's replicate blocks each get their own allocation, so they stay exchangeable
+            blocks = getattr(rng, 'blocks', [(0, n)])
+            counts = [rng.multinomial(hi - lo, weights / weights.sum()) for lo, hi in blocks]
+            
+            offsets = rng.standard_normal(dtype=self.dtype, out=_buffer(workspace, 'start', n, self.dtype, rows=2))
+            for (start, _), block_counts in zip(blocks, counts):
+                for report, count in zip(lkp_reports, block_counts.tolist()):
+                    block = offsets[:, start:start + count]
+                    sigma = float(report.get('uncertainty_nm', 0.0))
+                    lat = float(report['lat'])
+                    block[0] *= sigma / 60.0
+                    block[0] += lat
+                    block[1] *= sigma / (60.0 * math.cos(math.radians(lat)))
+                    block[1] += float(report['lon'])
+                    start += count
+            return offsets[0], offsets[1]
+        
+        if lkp_uncertainty_nm > 0:
+            offsets = rng.standard_normal(dtype=self.dtype, out=_buffer(workspace, 'start', n, self.dtype, rows=2))
+            offsets[0] *= lkp_uncertainty_nm / 60.0
+            offsets[0] += lkp[0]
+            offsets[1] *= lkp_uncertainty_nm / (60.0 * math.cos(math.radians(lkp[0])))
+            offsets[1] += lkp[1]
+            return offsets[0], offsets[1]
+        return None
+
+    def _sample_velocities(
+        self,
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        uncertainty_factor: float,
+        rng: np.random.Generator,
+        n: int,
+        leeway: Optional[Dict[str, float]] = None,
+        workspace: Optional[DriftWorkspace] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples per-particle North/East drift velocities (knots), in place."""
         # 1. Stochastic Environmental Modeling
         # Adding Gaussian noise to wind and current to simulate Bayesian uncertainty
-        wind_speeds = np.random.normal(wind['speed'], wind['speed'] * uncertainty_factor, self.iterations)
-        curr_speeds = np.random.normal(current['speed'], current['speed'] * uncertainty_factor, self.iterations)
+        leeway_speed = rng.standard_normal(out=_buffer(workspace, 'wind_speeds', n))
+        leeway_speed *= wind['speed'] * uncertainty_factor
+        leeway_speed += wind['speed']
+        curr_speeds = rng.standard_normal(out=_buffer(workspace, 'curr_speeds', n))
+        curr_speeds *= current['speed'] * uncertainty_factor
+        curr_speeds += current['speed']
         
         # 2. Leeway Calculation (The "Physical" Naval Component)
         # Drift = Current_Vector + Leeway_Vector
-        leeway_speed = (wind_speeds * self.leeway_slope) + self.leeway_offset
+        leeway_slope, leeway_offset = self._sample_leeway(leeway, rng, n, workspace)
+        leeway_speed *= leeway_slope
+        leeway_speed += leeway_offset
         
-        # Converting directions to radians for vector math
+        # Converting directions to radians for vector math (scalars, once)
         wind_rad = np.radians(wind['direction'])
         curr_rad = np.radians(current['direction'])
         
-        # 3. Vector Integration (Displacement in Nautical Miles)
-        # Latitude: 1 nm = 1/60 degree
-        # Longitude: 1 nm = 1/(60 * cos(lat)) degree
+        # North/South and East/West velocity components
+        scratch = _buffer(workspace, 'velocity_scratch', n)
+        dn_rate = np.multiply(leeway_speed, np.cos(wind_rad), out=_buffer(workspace, 'dn_rate', n))
+        dn_rate += np.multiply(curr_speeds, np.cos(curr_rad), out=scratch)
+        de_rate = np.multiply(leeway_speed, np.sin(wind_rad), out=_buffer(workspace, 'de_rate', n))
+        de_rate += np.multiply(curr_speeds, np.sin(curr_rad), out=scratch)
+        return dn_rate, de_rate
+
+    def _field_velocity_model(
+        self,
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        uncertainty_factor: float,
+        rng: np.random.Generator,
+        forcing: ForcingFields,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        leeway: Optional[Dict[str, float]] = None
+    ) -> Callable[[float], Tuple[np.ndarray, np.ndarray]]:
+        """
+        Builds velocities(elapsed_hours) -> (north, east) knots for gridded forcing.
         
-        # North/South displacement
-        dn = (np.cos(wind_rad) * leeway_speed + np.cos(curr_rad) * curr_speeds) * hours
-        # East/West displacement
-        de = (np.sin(wind_rad) * leeway_speed + np.sin(curr_rad) * curr_speeds) * hours
+        Each particle keeps one multiplicative wind and current error for the
+        whole run (the scalar model's Gaussian speed noise); the forcing
+        itself is read from the fields at the particles' live positions.
+        Components missing from `forcing` fall back to the scalar dicts.
+        """
+        wind_noise = rng.normal(1.0, uncertainty_factor, lats.shape[0])
+        curr_noise = rng.normal(1.0, uncertainty_factor, lats.shape[0])
+        leeway_slope, leeway_offset = self._sample_leeway(leeway, rng, lats.shape[0])
+        wind_rad = math.radians(wind['direction'])
+        curr_rad = math.radians(current['direction'])
         
-        # 4. Spatial Projection
-        final_lats = lats + (dn / 60.0)
-        final_lons = lons + (de / (60.0 * np.cos(np.radians(lats))))
+        def velocities(elapsed: float) -> Tuple[np.ndarray, np.ndarray]:
+            t = forcing.start_hours + elapsed
+            if forcing.wind is not None:
+                wind_e, wind_n = forcing.wind.sample(lats, lons, t)
+                wind_speed = np.hypot(wind_e, wind_n)
+            else:
+                wind_e = math.sin(wind_rad) * wind['speed']
+                wind_n = math.cos(wind_rad) * wind['speed']
+                wind_speed = wind['speed']
+            
+            # Leeway along the local wind: |w| * slope * noise + offset
+            leeway_factor = leeway_offset / np.maximum(wind_speed, 1e-9)
+            leeway_factor = leeway_factor + leeway_slope * wind_noise
+            
+            if forcing.current is not None:
+                curr_e, curr_n = forcing.current.sample(lats, lons, t)
+            else:
+                curr_e = math.sin(curr_rad) * current['speed']
+                curr_n = math.cos(curr_rad) * current['speed']
+            
+            dn_rate = wind_n * leeway_factor
+            dn_rate += curr_n * curr_noise
+            de_rate = wind_e * leeway_factor
+            de_rate += curr_e * curr_noise
+            return dn_rate, de_rate
         
-        return pd.DataFrame({
-            'latitude': final_lats,
-            'longitude': final_lons,
-            'weight': 1 / self.iterations # Probability mass per particle
-        })
+        return velocities
 
-    def get_search_area_stats(self, df: pd.DataFrame) -> Dict:
+    def _integrate(
+        self,
+        lkp: Tuple[float, float],
+        wind: Dict[str, float],
+        current: Dict[str, float],
+        hours: float,
+        dt: float,
+        uncertainty_factor: float,
+        rng: np.random.Generator,
+        forcing: Optional[ForcingFields],
+        n: int,
+        lkp_uncertainty_nm: float = 0.0,
+        lkp_reports: Optional[Sequence[Dict[str, float]]] = None,
+        leeway: Optional[Dict[str, float]] = None,
+        workspace: Optional[DriftWorkspace] = None,
+        initial: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Iterator[Tuple[float, np.ndarray, np.ndarray]]:
+        """
+        Explicit Euler integration of the particle cloud in steps of dt hours.
+        
+        Yields (elapsed_hours, lats, lons) after every step. The arrays are
+        updated in place, so consumers must copy anything they want to keep.
+        With gridded forcing, velocities are re-interpolated at every
+        particle position at the start of each step. `initial` (lats, lons)
+        starts the particles there instead of sampling them around the LKP.
+        """
+        if dt <= 0:
+            raise ValueError("dt must be positive")
+        
+        lats = _buffer(workspace, 'step_lat', n)
+        lons = _buffer(workspace, 'step_lon', n)
+        if initial is None:
+            lats.fill(float(lkp[0]))
+            lons.fill(float(lkp[1]))
+        else:
+            lats[:] = initial[0]
+            lons[:] = initial[1]
+        if forcing is None:
+            rates = self._sample_velocities(wind, current, uncertainty_factor, rng, n, leeway, workspace)
+            velocities = lambda elapsed: rates
+        else:
+            velocities = self._field_velocity_model(wind, current, uncertainty_factor, rng, forcing, lats, lons, leeway)
+        start = None
+        if initial is None:
+            start = self._sample_initial_positions(lkp, lkp_uncertainty_nm, lkp_reports, rng, n, workspace)
+        if start is not None:
+            lats[:] = start[0]
+            lons[:] = start[1]
+        
+        # Scratch buffer reused across steps keeps memory flat for long horizons
+        scratch = _buffer(workspace, 'step_scratch', n)
+        n_steps = max(1, math.ceil(hours / dt - 1e-9))
+        elapsed = 0.0
+        for step in range(n_steps):
+            step_dt = min(dt, hours - elapsed) if step == n_steps - 1 else dt
+            dn_rate, de_rate = velocities(elapsed)
+            # Longitude scale uses the particle's current latitude
+            np.radians(lats, out=scratch)
+            np.cos(scratch, out=scratch)
+            scratch *= 60.0
+            np.divide(de_rate, scratch, out=scratch)
+            scratch *= step_dt
+            lons += scratch
+            
+            np.multiply(dn_rate, step_dt / 60.0, out=scratch)
+            lats += scratch
+            
+            elapsed += step_dt
+            yield elapsed, lats, lons
+
+    def get_search_area_stats(self, cloud: ParticleCloud) -> Dict:
         """Returns C1-level technical metrics for the SAR dashboard."""
+        weights = cloud.weights
+        if weights is None:
+            mean_lat = cloud.latitudes.mean(dtype=np.float64)
+            mean_lon = cloud.longitudes.mean(dtype=np.float64)
+            std_lat = cloud.latitudes.std(dtype=np.float64, ddof=1 if cloud.n_particles > 1 else 0)
+        else:
+            mean_lat = np.dot(weights, cloud.latitudes)
+            mean_lon = np.dot(weights, cloud.longitudes)
+            # Reliability-weighted unbiased variance (matches np.cov aweights), or the
+            # plain weighted one when the weight has collapsed onto about one particle
+            correction = 1.0 - np.dot(weights, weights)
+            var = np.dot(weights, (cloud.latitudes - mean_lat) ** 2)
+            if correction > MIN_WEIGHTED_DENOMINATOR:
+                var /= correction
+            std_lat = np.sqrt(var)
+        return {
+            "mean_lat": float(mean_lat),
+            "mean_lon": float(mean_lon),
+            "std_dev_nm": float(std_lat * 60), # Std dev in Nautical Miles
+            "confidence_radius_95": float(std_lat * 60 * 1.96)
+        }
+
+    @staticmethod
+    def sampling_error(cloud: ParticleCloud, replicates: int = DEFAULT_REPLICATES) -> Dict:
+        """
+        Standard errors (nm) of the search statistics of a sampler run.
+        
+        The cloud's replicate blocks (calculate_drift `sampler`) are
+        independent randomisations, so the full-cloud statistic's standard
+        error is the spread of the block statistics over sqrt(R). Also
+        valid for plain draws, whose blocks are just independent subsets.
+        """
+        blocks = replicate_bounds(cloud.n_particles, replicates)
+        if len(blocks) < 2:
+            return {"replicates": len(blocks)}
+        stats = [DriftMoments.from_positions(cloud.latitudes[lo:hi], cloud.longitudes[lo:hi]).search_area_stats()
+                 for lo, hi in blocks]
+        
+        def standard_error(key: str) -> float:
+            return float(np.std([s[key] for s in stats], ddof=1) / math.sqrt(len(stats)))
+        
+        lon_nm = 60.0 * math.cos(math.radians(float(cloud.latitudes.mean(dtype=np.float64))))
         return {
-            "mean_lat": df['latitude'].mean(),
-            "mean_lon": df['longitude'].mean(),
-            "std_dev_nm": (df['latitude'].std() * 60), # Std dev in Nautical Miles
-            "confidence_radius_95": (df['latitude'].std() * 60) * 1.96
+            "replicates": len(blocks),
+            "mean_lat_se_nm": standard_error("mean_lat") * 60.0,
+            "mean_lon_se_nm": standard_error("mean_lon") * lon_nm,
+            "confidence_radius_95_se_nm": standard_error("confidence_radius_95")
         }
 
+    def get_search_area_stats_batch(self, latitudes: np.ndarray, longitudes: np.ndarray) -> List[Dict]:
+        """Row-wise get_search_area_stats for (n_requests, iterations) arrays."""
+        mean_lat = latitudes.mean(axis=1)
+        mean_lon = longitudes.mean(axis=1)
+        std_nm = latitudes.std(axis=1, ddof=1) * 60
+        return [
+            {
+                "mean_lat": float(mean_lat[i]),
+                "mean_lon": float(mean_lon[i]),
+                "std_dev_nm": float(std_nm[i]),
+                "confidence_radius_95": float(std_nm[i] * 1.96)
+            }
+            for i in range(latitudes.shape[0])
+        ]
+
 # --- Example Usage ---
 if __name__ == "__main__":
     engine = BayesianDriftEngine(iterations=5000)
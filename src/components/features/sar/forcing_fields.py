@@ -0,0 +1,173 @@
+"""
+Gridded, time-varying environmental forcing for the drift engine.
+
+Wind and current fields are stored as regular (time, lat, lon) grids of
+east/north velocity components in knots, one .npy file per component plus a
+small grid.json with the axes. Files are opened memory-mapped, and each
+interpolation only materialises the sub-block bounding the particle cloud
+at the current time step, so datasets larger than RAM can be used.
+
+On-disk layout of a forcing dataset:
+
+    <dataset>/
+        wind/     u.npy  v.npy  grid.json
+        current/  u.npy  v.npy  grid.json
+
+Either component may be absent; the engine then falls back to the scalar
+wind/current dict for it.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, os.PathLike]
+
+
+class GriddedField:
+    """
+    2-D vector field (u east, v north; knots) on a regular lat x lon x time grid.
+
+    Arrays are indexed [time, lat, lon] so a single time slice is contiguous on
+    disk. Axes are described by origin and spacing; time is in hours on the
+    dataset's own clock.
+    """
+
+    def __init__(self,
+                 u: np.ndarray,
+                 v: np.ndarray,
+                 lat0: float, dlat: float,
+                 lon0: float, dlon: float,
+                 t0: float = 0.0, dt: float = 1.0):
+        if u.shape != v.shape or u.ndim != 3:
+            raise ValueError("u and v must be 3-D (time, lat, lon) arrays of equal shape")
+        if dlat <= 0 or dlon <= 0 or dt <= 0:
+            raise ValueError("grid spacings must be positive")
+        self.u = u
+        self.v = v
+        self.lat0, self.dlat = float(lat0), float(dlat)
+        self.lon0, self.dlon = float(lon0), float(dlon)
+        self.t0, self.dt = float(t0), float(dt)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.u.shape
+
+    @classmethod
+    def load(cls, directory: PathLike, mmap: bool = True) -> "GriddedField":
+        """Opens u.npy/v.npy (memory-mapped by default) and grid.json."""
+        directory = Path(directory)
+        grid = json.loads((directory / "grid.json").read_text())
+        mode = "r" if mmap else None
+        return cls(
+            np.load(directory / "u.npy", mmap_mode=mode),
+            np.load(directory / "v.npy", mmap_mode=mode),
+            grid["lat0"], grid["dlat"], grid["lon0"], grid["dlon"],
+            grid.get("t0", 0.0), grid.get("dt", 1.0)
+        )
+
+    def save(self, directory: PathLike) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "u.npy", np.asarray(self.u))
+        np.save(directory / "v.npy", np.asarray(self.v))
+        (directory / "grid.json").write_text(json.dumps({
+            "lat0": self.lat0, "dlat": self.dlat,
+            "lon0": self.lon0, "dlon": self.dlon,
+            "t0": self.t0, "dt": self.dt,
+            "shape": list(self.shape)
+        }))
+
+    def _fractional_index(self, values: np.ndarray, origin: float, step: float, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Lower grid index and interpolation weight, clamped to the grid edge."""
+        pos = np.subtract(values, origin, dtype=np.float64)
+        pos /= step
+        np.clip(pos, 0.0, size - 1, out=pos)
+        idx = np.minimum(pos.astype(np.intp), max(size - 2, 0))
+        pos -= idx
+        return idx, pos
+
+    def sample(self, lats: np.ndarray, lons: np.ndarray, t: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bilinear-in-space, linear-in-time interpolation at every particle.
+
+        Positions outside the grid are clamped to its edge.
+        """
+        nt, nlat, nlon = self.shape
+        tpos = min(max((t - self.t0) / self.dt, 0.0), nt - 1)
+        k0 = min(int(tpos), max(nt - 2, 0))
+        wt = tpos - k0
+        k1 = min(k0 + 1, nt - 1)
+
+        i0, wy = self._fractional_index(lats, self.lat0, self.dlat, nlat)
+        j0, wx = self._fractional_index(lons, self.lon0, self.dlon, nlon)
+
+        # Only the window bounding the cloud is read from the memory map
+        i_lo, i_hi = int(i0.min()), min(int(i0.max()) + 2, nlat)
+        j_lo, j_hi = int(j0.min()), min(int(j0.max()) + 2, nlon)
+        i0 -= i_lo
+        j0 -= j_lo
+        i1 = np.minimum(i0 + 1, i_hi - i_lo - 1)
+        j1 = np.minimum(j0 + 1, j_hi - j_lo - 1)
+
+        out = []
+        for component in (self.u, self.v):
+            window = np.asarray(component[k0:k1 + 1, i_lo:i_hi, j_lo:j_hi], dtype=np.float64)
+            # Blend the two time slices first, then interpolate in space
+            tile = window[0] if wt == 0.0 or k1 == k0 else (1.0 - wt) * window[0] + wt * window[-1]
+            bottom = tile[i0, j0] * (1.0 - wx)
+            bottom += tile[i0, j1] * wx
+            top = tile[i1, j0] * (1.0 - wx)
+            top += tile[i1, j1] * wx
+            bottom *= 1.0 - wy
+            top *= wy
+            bottom += top
+            out.append(bottom)
+        return out[0], out[1]
+
+
+@dataclass
+class ForcingFields:
+    """
+    Gridded environmental forcing for one simulation.
+
+    start_hours maps the incident clock (t = 0 at the LKP) onto the datasets'
+    time axes.
+    """
+    wind: Optional[GriddedField] = None
+    current: Optional[GriddedField] = None
+    start_hours: float = 0.0
+
+    @classmethod
+    def load(cls, directory: PathLike, start_hours: float = 0.0) -> "ForcingFields":
+        directory = Path(directory)
+        wind = GriddedField.load(directory / "wind") if (directory / "wind").is_dir() else None
+        current = GriddedField.load(directory / "current") if (directory / "current").is_dir() else None
+        if wind is None and current is None:
+            raise FileNotFoundError(f"No wind/ or current/ field under {directory}")
+        return cls(wind=wind, current=current, start_hours=start_hours)
+
+
+def forcing_root() -> Path:
+    """Directory holding named forcing datasets (SAR_FORCING_DIR, default ./forcing)."""
+    return Path(os.environ.get("SAR_FORCING_DIR", "forcing"))
+
+
+@lru_cache(maxsize=8)
+def _load_dataset(name: str) -> ForcingFields:
+    root = forcing_root().resolve()
+    directory = (root / name).resolve()
+    if root not in directory.parents:
+        raise ValueError(f"Invalid forcing dataset name: {name!r}")
+    return ForcingFields.load(directory)
+
+
+def load_named_forcing(name: str, start_hours: float = 0.0) -> ForcingFields:
+    """Opens (and memoises the memory maps of) a dataset under forcing_root()."""
+    fields = _load_dataset(name)
+    return ForcingFields(wind=fields.wind, current=fields.current, start_hours=start_hours)
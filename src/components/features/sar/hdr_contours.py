@@ -0,0 +1,393 @@
+"""
+Highest-density-region (HDR) contours of a particle cloud's density.
+
+confidence_radius_95 is a circle from the latitude spread and the 95%
+ellipse assumes one Gaussian blob; neither describes a skewed or
+multi-modal cloud (e.g. conflicting LKP reports). The p-HDR is the
+smallest area holding probability p: the cells whose density is at least
+a threshold t_p, where t_p is found by sorting the cells by mass and
+accumulating until p is reached. Its boundary is then traced on the grid
+and returned as polygons, one MultiPolygon per level.
+
+Everything runs on a ProbabilityDensity grid (MissionPlanner, nm cells
+over mean ± extent_sigma sd). hdr_density() sizes its cells so the longer
+axis has `resolution` of them: contours through cell centres shave about
+half a cell off the region, so the planner's coarser critical-path grid
+would under-cover it.
+
+1. Optional binomial smoothing ([1, 2, 1] / 4 per axis and pass) steadies
+   the histogram noise that would otherwise fray the boundary.
+2. Thresholds for all levels come from one sort and cumulative sum; the
+   mass outside the grid counts toward the total, so a level the grid
+   cannot reach is reported with its actual (smaller) mass.
+3. Marching squares over the cell centres, padded with an empty ring so
+   every contour closes. The case of every square and the crossing point
+   of every segment are computed with array operations from a 16-case
+   lookup table (saddles resolved by the square's centre value).
+   Segments are oriented with the region on their left, so each crossing
+   edge starts exactly one segment and ends another: rings chain through
+   a `next` index array, exteriors come out counter-clockwise and holes
+   clockwise, as GeoJSON expects.
+4. Rings enclosing less than one cell (isolated noisy cells just above or
+   below the threshold) are dropped, holes are attached to the smallest
+   exterior containing them, and rings are simplified with Douglas-Peucker
+   in nautical miles, default half a cell (all rings together, one array
+   pass per level of splits).
+
+A level whose cells are all too thin for a ring through their centres
+(a point-like cloud puts everything in one cell) is outlined along the
+cell edges instead: the same tracing on the cell mask upsampled twice
+per axis, keeping every ring, so the region is never empty while it
+holds mass.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mission_planner import MIN_CELL_NM, MissionPlanner, ProbabilityDensity
+
+DEFAULT_LEVELS = (0.5, 0.9, 0.95)
+DEFAULT_SMOOTH = 1  # Binomial smoothing passes
+DEFAULT_RESOLUTION = 128  # Cells along the grid's longer axis
+MIN_RING_CELLS = 1.0  # Smallest ring area kept, in cells
+COORDINATE_DECIMALS = 6  # ~0.1 m
+
+# Square corners counter-clockwise (x = column, y = row): bottom-left,
+# bottom-right, top-right, top-left. Local edge e joins corner e to e + 1.
+_CORNER_OFFSETS = np.array([[0, 0], [0, 1], [1, 1], [1, 0]])  # (row, col)
+
+
+def _segment_table() -> np.ndarray:
+    """
+    (case, centre_inside, k) -> (from_edge, to_edge) of the square's k-th
+    segment, -1 where absent. Walking the square's boundary
+    counter-clockwise, a segment leaves the region at an 'exit' edge
+    (inside -> outside) and re-enters at an 'entry' edge, keeping the
+    region on its left.
+    """
+    table = np.full((16, 2, 2, 2), -1, dtype=np.int8)
+    for case in range(16):
+        inside = [(case >> corner) & 1 for corner in range(4)]
+        exits = [e for e in range(4) if inside[e] and not inside[(e + 1) % 4]]
+        entries = [e for e in range(4) if not inside[e] and inside[(e + 1) % 4]]
+        for centre in (0, 1):
+            for k, exit_edge in enumerate(exits):
+                # Saddles: a connected centre cuts off the outside corner after
+                # the exit (next entry), a separated one wraps the inside corner
+                ordered = sorted(entries, key=lambda entry: (entry - exit_edge) % 4)
+                table[case, centre, k] = (exit_edge, ordered[0] if centre else ordered[-1])
+    return table
+
+
+_SEGMENTS = _segment_table()
+
+
+@dataclass
+class HDRRegion:
+    """One highest-density region: the cells above `threshold`, as polygons."""
+    level: float  # Requested probability
+    threshold: float  # Cell mass at the boundary
+    mass: float  # Probability actually enclosed (cells above the threshold)
+    area_nm2: float  # Area of the traced polygons (before simplification)
+    polygons: List[List[np.ndarray]] = field(default_factory=list)  # [exterior, *holes] of (lon, lat) rings
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Level summary with a GeoJSON MultiPolygon geometry."""
+        return {
+            "level": self.level,
+            "mass": self.mass,
+            "area_nm2": self.area_nm2,
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [np.round(np.vstack([ring, ring[:1]]), COORDINATE_DECIMALS).tolist() for ring in polygon]
+                    for polygon in self.polygons
+                ]
+            }
+        }
+
+
+def hdr_density(latitudes: np.ndarray,
+                longitudes: np.ndarray,
+                weights: Optional[np.ndarray] = None,
+                resolution: int = DEFAULT_RESOLUTION,
+                extent_sigma: float = 4.0) -> ProbabilityDensity:
+    """Probability density on square cells, `resolution` of them along the longer axis."""
+    # The smallest cell size, grown by the per-axis cap to exactly fill it
+    planner = MissionPlanner(grid_mode='nm', cell_nm=MIN_CELL_NM, max_cells=resolution, extent_sigma=extent_sigma)
+    return planner.probability_density(latitudes, longitudes, weights)
+
+
+def smooth_density(H: np.ndarray, passes: int = DEFAULT_SMOOTH) -> np.ndarray:
+    """Separable [1, 2, 1] / 4 smoothing, `passes` times; total mass is kept."""
+    total = H.sum()
+    smoothed = H.astype(np.float64, copy=True)
+    for _ in range(max(passes, 0)):
+        padded = np.pad(smoothed, 1)
+        smoothed = (padded[:-2, 1:-1] + 2 * padded[1:-1, 1:-1] + padded[2:, 1:-1]) * 0.25
+        padded = np.pad(smoothed, 1)
+        smoothed = (padded[1:-1, :-2] + 2 * padded[1:-1, 1:-1] + padded[1:-1, 2:]) * 0.25
+    if passes > 0 and smoothed.sum() > 0:
+        smoothed *= total / smoothed.sum()
+    return smoothed
+
+
+def hdr_thresholds(H: np.ndarray, levels: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cell-mass threshold and enclosed mass of each level's HDR.
+
+    The cells with mass >= threshold[i] hold mass[i] >= levels[i] of the
+    probability, or everything the grid has when that is less.
+    """
+    values = np.sort(H.ravel())[::-1]
+    values = values[values > 0]
+    if values.size == 0:
+        return np.zeros(len(levels)), np.zeros(len(levels))
+    cumulative = np.cumsum(values)
+    index = np.minimum(np.searchsorted(cumulative, np.asarray(levels, dtype=np.float64)), values.size - 1)
+    # Cells tied with the threshold are inside the contour too: count them all
+    last = np.searchsorted(-values, -values[index], side='right') - 1
+    return values[index], cumulative[last]
+
+
+def marching_squares(values: np.ndarray, threshold: float) -> List[np.ndarray]:
+    """
+    Closed iso-contours of `values` at `threshold` as rings of (row, col)
+    node coordinates, region on the left (exteriors counter-clockwise).
+
+    The values must be below the threshold on the border, so every ring
+    closes (pad them with a ring of zeros).
+    """
+    rows, cols = values.shape
+    inside = values >= threshold
+
+    # 1. Case index of every square from its four corners
+    case = (inside[:-1, :-1].astype(np.int8)
+            | inside[:-1, 1:] << 1
+            | inside[1:, 1:] << 2
+            | inside[1:, :-1] << 3)
+    centre = (values[:-1, :-1] + values[:-1, 1:] + values[1:, 1:] + values[1:, :-1]) >= 4 * threshold
+    active = np.nonzero((case > 0) & (case < 15))
+    if active[0].size == 0:
+        return []
+    segments = _SEGMENTS[case[active], centre[active].astype(np.intp)]  # (m, 2, 2)
+
+    # 2. One row per segment: its square and local from/to edges
+    present = segments[:, :, 0] >= 0
+    square_i = np.repeat(active[0], 2)[present.ravel()]
+    square_j = np.repeat(active[1], 2)[present.ravel()]
+    from_edge = segments[:, :, 0][present].astype(np.intp)
+    to_edge = segments[:, :, 1][present].astype(np.intp)
+
+    # 3. Global edge ids: horizontal edges first, then vertical ones
+    n_horizontal = rows * (cols - 1)
+
+    def edge_id(edge: np.ndarray) -> np.ndarray:
+        i = square_i + (edge == 2)
+        j = square_j + (edge == 1)
+        horizontal = (edge % 2) == 0
+        return np.where(horizontal, i * (cols - 1) + j, n_horizontal + i * cols + j)
+
+    from_id = edge_id(from_edge)
+    to_id = edge_id(to_edge)
+
+    # 4. Crossing point on each segment's from-edge (each edge is one segment's from-edge)
+    a = _CORNER_OFFSETS[from_edge]
+    b = _CORNER_OFFSETS[(from_edge + 1) % 4]
+    value_a = values[square_i + a[:, 0], square_j + a[:, 1]]
+    value_b = values[square_i + b[:, 0], square_j + b[:, 1]]
+    fraction = (threshold - value_a) / (value_b - value_a)
+    points = np.empty((from_edge.size, 2))
+    points[:, 0] = square_i + a[:, 0] + fraction * (b[:, 0] - a[:, 0])
+    points[:, 1] = square_j + a[:, 1] + fraction * (b[:, 1] - a[:, 1])
+
+    # 5. Chain segments into rings through the edge they share
+    segment_from = np.empty(n_horizontal + (rows - 1) * cols, dtype=np.intp)
+    segment_from[from_id] = np.arange(from_id.size)
+    following = segment_from[to_id].tolist()
+    visited = np.zeros(from_id.size, dtype=bool)
+    rings = []
+    for start in range(from_id.size):
+        if visited[start]:
+            continue
+        order = []
+        segment = start
+        while not visited[segment]:
+            visited[segment] = True
+            order.append(segment)
+            segment = following[segment]
+        rings.append(points[order])
+    return rings
+
+
+def signed_area(ring: np.ndarray) -> float:
+    """Shoelace area of a (y, x) ring; positive when counter-clockwise in (x, y)."""
+    y, x = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def containing_ring(rings: Sequence[np.ndarray], points: np.ndarray, block: int = 1 << 22) -> np.ndarray:
+    """
+    Index of the first ring containing each (y, x) point, -1 for none.
+
+    Even-odd test against the edges of all rings at once, `block` point x
+    edge pairs at a time; order the rings smallest first to get the
+    innermost one.
+    """
+    owner = np.repeat(np.arange(len(rings)), [ring.shape[0] for ring in rings])
+    start = np.concatenate(rings)
+    end = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+    found = np.full(points.shape[0], -1, dtype=np.intp)
+    step = max(block // max(start.shape[0], 1), 1)
+    for lo in range(0, points.shape[0], step):
+        py = points[lo:lo + step, 0:1]
+        px = points[lo:lo + step, 1:2]
+        crosses = (start[:, 0] > py) != (end[:, 0] > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = start[:, 1] + (py - start[:, 0]) * (end[:, 1] - start[:, 1]) / (end[:, 0] - start[:, 0])
+        hits = crosses & (px < x_cross)
+        # Crossings per (point, ring); odd means inside
+        counts = np.zeros((hits.shape[0], len(rings)), dtype=np.intp)
+        rows, edges = np.nonzero(hits)
+        np.add.at(counts, (rows, owner[edges]), 1)
+        inside = counts % 2 == 1
+        found[lo:lo + step] = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+    return found
+
+
+def simplify_rings(rings: Sequence[np.ndarray], tolerance: float) -> List[np.ndarray]:
+    """
+    Douglas-Peucker simplification of closed rings (tolerance in the
+    rings' units). All rings are processed together: every pass splits
+    each pending interval of every ring at its farthest vertex at once, so
+    the cost is a few array passes per level of the split tree. Rings that
+    would collapse below a triangle are kept as-is.
+    """
+    if tolerance <= 0 or not rings:
+        return list(rings)
+    # Closed copies end to end; ring r spans [begin[r], begin[r] + n_r] (last = first)
+    sizes = np.array([ring.shape[0] for ring in rings])
+    begin = np.concatenate([[0], np.cumsum(sizes + 1)[:-1]])
+    points = np.concatenate([np.vstack([ring, ring[:1]]) for ring in rings])
+    keep = np.zeros(points.shape[0], dtype=bool)
+    keep[begin] = True
+    keep[begin + sizes] = True
+
+    # Split each loop at the vertex farthest from its first one
+    far = np.array([int(np.argmax(np.sum((ring - ring[0]) ** 2, axis=1))) for ring in rings]) + begin
+    keep[far] = True
+    lo = np.concatenate([begin, far])
+    hi = np.concatenate([far, begin + sizes])
+    while lo.size:
+        interior = hi - lo - 1
+        lo, hi, interior = lo[interior > 0], hi[interior > 0], interior[interior > 0]
+        if lo.size == 0:
+            break
+        # Every interior vertex of every interval, with its interval's number
+        interval = np.repeat(np.arange(lo.size), interior)
+        first = np.concatenate([[0], np.cumsum(interior)[:-1]])
+        vertex = lo[interval] + 1 + np.arange(interval.size) - first[interval]
+        chord = points[hi] - points[lo]
+        length = np.hypot(chord[:, 0], chord[:, 1])
+        offset = points[vertex] - points[lo[interval]]
+        cross = np.abs(chord[interval, 0] * offset[:, 1] - chord[interval, 1] * offset[:, 0])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = np.where(length[interval] > 0, cross / length[interval], np.hypot(offset[:, 0], offset[:, 1]))
+        # Farthest vertex per interval (first of ties)
+        farthest = np.maximum.reduceat(distance, first)
+        at_max = np.where(distance == farthest[interval], np.arange(distance.size), distance.size)
+        split = vertex[np.minimum.reduceat(at_max, first)]
+        refine = farthest > tolerance
+        keep[split[refine]] = True
+        lo = np.concatenate([lo[refine], split[refine]])
+        hi = np.concatenate([split[refine], hi[refine]])
+
+    simplified = []
+    for r, ring in enumerate(rings):
+        kept = points[begin[r]:begin[r] + sizes[r]][keep[begin[r]:begin[r] + sizes[r]]]
+        simplified.append(kept if kept.shape[0] >= 3 else ring)
+    return simplified
+
+
+def _traced_rings(nodes: np.ndarray, threshold: float, min_area: float) -> Tuple[List[np.ndarray], np.ndarray]:
+    """marching_squares rings enclosing at least min_area node cells, with their signed areas."""
+    rings = marching_squares(nodes, threshold)
+    areas = np.array([signed_area(ring) for ring in rings], dtype=np.float64)
+    kept = np.abs(areas) >= min_area
+    return [ring for ring, keep in zip(rings, kept) if keep], areas[kept]
+
+
+def hdr_regions(density: ProbabilityDensity,
+                levels: Sequence[float] = DEFAULT_LEVELS,
+                smooth: int = DEFAULT_SMOOTH,
+                simplify_nm: Optional[float] = None) -> List[HDRRegion]:
+    """
+    Highest-density regions of a ProbabilityDensity at each level.
+
+    Args:
+        density: Probability mass on square nm cells (see MissionPlanner.probability_density)
+        levels: Probabilities in (0, 1], e.g. (0.5, 0.9, 0.95)
+        smooth: Binomial smoothing passes before thresholding (0: raw histogram)
+        simplify_nm: Douglas-Peucker tolerance (None: half a cell; 0: off)
+
+    Returns:
+        One HDRRegion per level, in the order given
+    """
+    H = smooth_density(density.H, smooth)
+    thresholds, masses = hdr_thresholds(H, levels)
+    # Empty ring so every contour closes inside the node grid
+    nodes = np.pad(H, 1)
+    tolerance_cells = 0.5 if simplify_nm is None else simplify_nm / density.cell_nm
+    lat_step = density.lat_edges[1] - density.lat_edges[0]
+    lon_step = density.lon_edges[1] - density.lon_edges[0]
+    # Node (r, c) of the padded field is the centre of cell (r - 1, c - 1)
+    origin = np.array([density.lat_edges[0] - 0.5 * lat_step, density.lon_edges[0] - 0.5 * lon_step])
+    scale = np.array([lat_step, lon_step])
+
+    regions = []
+    for level, threshold, mass in zip(levels, thresholds, masses):
+        region = HDRRegion(level=float(level), threshold=float(threshold), mass=float(mass), area_nm2=0.0)
+        if threshold <= 0:
+            regions.append(region)
+            continue
+        rings, areas = _traced_rings(nodes, threshold, MIN_RING_CELLS)
+        ring_origin, ring_scale, subdivide, ring_tolerance = origin, scale, 1, tolerance_cells
+        if not rings:
+            # Too thin to trace through the centres: outline the cells, node (r, c) of the
+            # upsampled mask being the centre of half-cell (r - 1, c - 1)
+            subdivide = 2
+            mask = np.kron((H >= threshold).astype(np.float64), np.ones((subdivide, subdivide)))
+            rings, areas = _traced_rings(np.pad(mask, 1), 0.5, 0.0)
+            ring_scale = scale / subdivide
+            ring_origin = origin + 0.5 * scale - 0.5 * ring_scale
+            # Below the cut corners (0.35 half-cells): drop only the collinear edge crossings
+            ring_tolerance = min(tolerance_cells * subdivide, 0.25)
+        region.area_nm2 = float(areas.sum()) * (density.cell_nm / subdivide) ** 2
+
+        exteriors = [k for k in np.argsort(areas) if areas[k] > 0]  # Smallest first
+        holes = np.nonzero(areas < 0)[0]
+        polygons = {k: [rings[k]] for k in exteriors}
+        if exteriors and holes.size:
+            owners = containing_ring([rings[k] for k in exteriors], np.array([rings[k][0] for k in holes]))
+            for k, owner in zip(holes, owners):
+                if owner >= 0:
+                    polygons[exteriors[owner]].append(rings[k])
+
+        order = sorted(exteriors, key=lambda e: -areas[e])  # Largest polygon first
+        simplified = iter(simplify_rings([ring for k in order for ring in polygons[k]], ring_tolerance))
+        for k in order:
+            # (row, col) nodes -> (lon, lat)
+            region.polygons.append([(ring_origin + next(simplified) * ring_scale)[:, ::-1] for _ in polygons[k]])
+        regions.append(region)
+    return regions
+
+
+def hdr_payload(density: ProbabilityDensity, regions: List[HDRRegion]) -> Dict[str, Any]:
+    """JSON body shared by the HDR endpoints."""
+    return {
+        "cell_nm": density.cell_nm,
+        "outside_mass": density.outside_mass,
+        "regions": [region.to_dict() for region in regions]
+    }
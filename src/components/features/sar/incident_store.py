@@ -0,0 +1,257 @@
+"""
+Persistent per-incident particle state for incremental re-forecasts.
+
+An incident keeps the particle cloud (positions and any weights from
+negative searches) together with the state of the random generator that
+produced it, so moving the clock forward advances the stored cloud by the
+new interval instead of re-running drift from the LKP. Every change is
+written as a new numbered snapshot:
+
+    <root>/<incident_id>/v000000.sarb    created from the LKP
+                         v000001.sarb    advanced, searched, ...
+
+Snapshots are SARB payloads (see binary_export) holding 'latitudes',
+'longitudes' and optionally 'weights' at full precision; the header
+carries the incident clock, the generator state and the incident's
+settings. Compressed snapshots byte-shuffle the arrays and zlib them.
+Uncompressed ones are memory-mapped on load, so reading an incident
+touches only the pages that are used. Writes go to a temporary file
+first and are moved into place, so a crash never leaves a torn snapshot
+and the store survives restarts as-is.
+
+Rolling back to a version deletes the later ones; only the newest
+`max_versions` snapshots of an incident are kept.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import binary_export
+from particle_cloud import ParticleCloud
+
+SNAPSHOT_SUFFIX = ".sarb"
+_INCIDENT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+_SNAPSHOT_NAME = re.compile(r"^v(\d{6})\.sarb$")
+
+
+class UnknownIncidentError(KeyError):
+    """Raised when an incident, or a version of it, is not in the store."""
+
+
+@dataclass
+class IncidentSnapshot:
+    """Header of one stored version of an incident."""
+    incident_id: str
+    version: int
+    hours: float  # Drift time since the LKP
+    event: str  # What produced the version: 'create', 'advance', 'search', ...
+    n_particles: int
+    weighted: bool
+    compressed: bool
+    created_at: float
+    nbytes: int  # Size on disk
+    meta: Dict[str, Any] = field(default_factory=dict)  # Incident settings (lkp, leeway, forcing origin ...)
+    rng_state: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "incident_id": self.incident_id,
+            "version": self.version,
+            "hours": self.hours,
+            "event": self.event,
+            "particles": self.n_particles,
+            "weighted": self.weighted,
+            "compressed": self.compressed,
+            "created_at": self.created_at,
+            "nbytes": self.nbytes
+        }
+
+
+def restore_generator(state: Dict[str, Any]) -> np.random.Generator:
+    """Generator continuing exactly where the one with `state` stopped."""
+    bit_generator = getattr(np.random, state["bit_generator"])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+class IncidentStore:
+    """
+    Directory of versioned incident snapshots.
+
+    Plain data (a path and two settings), so it pickles to pool workers;
+    concurrent writers to one incident must be serialised by the caller.
+
+    Args:
+        root: Directory holding one sub-directory per incident
+        compress: Write shuffled + zlib snapshots (False: raw, memory-mapped on load)
+        max_versions: Snapshots kept per incident (oldest are pruned)
+    """
+
+    def __init__(self, root: str, compress: bool = True, max_versions: int = 64):
+        self.root = Path(root)
+        self.compress = compress
+        self.max_versions = max(max_versions, 1)
+
+    @classmethod
+    def from_env(cls) -> "IncidentStore":
+        """Reads SAR_INCIDENT_DIR / SAR_INCIDENT_COMPRESS / SAR_INCIDENT_MAX_VERSIONS."""
+        return cls(
+            root=os.environ.get("SAR_INCIDENT_DIR", "incidents"),
+            compress=os.environ.get("SAR_INCIDENT_COMPRESS", "1") != "0",
+            max_versions=int(os.environ.get("SAR_INCIDENT_MAX_VERSIONS", 64))
+        )
+
+    def _dir(self, incident_id: str) -> Path:
+        if not _INCIDENT_ID.match(incident_id):
+            raise ValueError("incident_id must be 1-64 characters of [A-Za-z0-9_.-]")
+        return self.root / incident_id
+
+    def _path(self, incident_id: str, version: int) -> Path:
+        return self._dir(incident_id) / f"v{version:06d}{SNAPSHOT_SUFFIX}"
+
+    def versions(self, incident_id: str) -> List[int]:
+        """Stored version numbers, oldest first (empty for an unknown incident)."""
+        directory = self._dir(incident_id)
+        if not directory.is_dir():
+            return []
+        found = (_SNAPSHOT_NAME.match(name) for name in os.listdir(directory))
+        return sorted(int(m.group(1)) for m in found if m)
+
+    def exists(self, incident_id: str) -> bool:
+        return bool(self.versions(incident_id))
+
+    def incidents(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(name for name in os.listdir(self.root) if _INCIDENT_ID.match(name) and self.exists(name))
+
+    def save(self,
+             incident_id: str,
+             cloud: ParticleCloud,
+             rng: np.random.Generator,
+             hours: float,
+             event: str,
+             meta: Optional[Dict[str, Any]] = None) -> IncidentSnapshot:
+        """
+        Writes the cloud and generator state as the incident's next version.
+
+        `meta` defaults to the previous version's settings.
+        """
+        directory = self._dir(incident_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        versions = self.versions(incident_id)
+        version = versions[-1] + 1 if versions else 0
+        if meta is None:
+            meta = self.snapshot(incident_id).meta if versions else {}
+
+        header = {
+            "incident_id": incident_id,
+            "version": version,
+            "hours": float(hours),
+            "event": event,
+            "created_at": time.time(),
+            "meta": meta,
+            "rng_state": rng.bit_generator.state
+        }
+        arrays = [("latitudes", cloud.latitudes), ("longitudes", cloud.longitudes)]
+        if not cloud.is_uniform:
+            arrays.append(("weights", cloud.weights))
+        # Byte planes of float64 positions share their high bytes, which zlib then finds
+        filters = {name: ['shuffle'] for name, _ in arrays}
+        payload = binary_export.encode(arrays, header, self.compress, filters)
+
+        path = self._path(incident_id, version)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+
+        for old in versions[:len(versions) + 1 - self.max_versions]:
+            self._path(incident_id, old).unlink(missing_ok=True)
+        return self._snapshot_from_header(binary_export.read_header(payload), payload, len(payload))
+
+    @staticmethod
+    def _snapshot_from_header(header: Dict[str, Any], payload: bytes, nbytes: int) -> IncidentSnapshot:
+        arrays = {entry["name"]: entry for entry in header["arrays"]}
+        return IncidentSnapshot(
+            incident_id=header["incident_id"],
+            version=header["version"],
+            hours=header["hours"],
+            event=header["event"],
+            n_particles=arrays["latitudes"]["shape"][0],
+            weighted="weights" in arrays,
+            compressed=bool(payload[5] & binary_export.FLAG_ZLIB),
+            created_at=header["created_at"],
+            nbytes=nbytes,
+            meta=header["meta"],
+            rng_state=header["rng_state"]
+        )
+
+    def _map(self, incident_id: str, version: Optional[int]) -> mmap.mmap:
+        versions = self.versions(incident_id)
+        if not versions:
+            raise UnknownIncidentError(incident_id)
+        if version is None:
+            version = versions[-1]
+        elif version not in versions:
+            raise UnknownIncidentError(f"{incident_id} v{version}")
+        with open(self._path(incident_id, version), "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def snapshot(self, incident_id: str, version: Optional[int] = None) -> IncidentSnapshot:
+        """Header of a version (default: the latest) without reading the particles."""
+        mapped = self._map(incident_id, version)
+        try:
+            return self._snapshot_from_header(binary_export.read_header(mapped), mapped, len(mapped))
+        finally:
+            mapped.close()
+
+    def history(self, incident_id: str) -> List[IncidentSnapshot]:
+        return [self.snapshot(incident_id, version) for version in self.versions(incident_id)]
+
+    def load(self,
+             incident_id: str,
+             version: Optional[int] = None,
+             writable: bool = False) -> Tuple[IncidentSnapshot, ParticleCloud, np.random.Generator]:
+        """
+        A version's snapshot header, cloud and restored generator.
+
+        Positions of uncompressed snapshots are read-only views of the
+        mapped file unless `writable` asks for copies (needed by anything
+        that updates positions in place, e.g. resampling).
+
+        Raises:
+            UnknownIncidentError: Unknown incident or version
+        """
+        mapped = self._map(incident_id, version)
+        header, arrays = binary_export.decode(mapped)
+        snapshot = self._snapshot_from_header(header, mapped, len(mapped))
+        lats, lons = arrays["latitudes"], arrays["longitudes"]
+        if writable:
+            lats, lons = lats.copy(), lons.copy()
+        cloud = ParticleCloud(lats, lons, arrays.get("weights"))
+        return snapshot, cloud, restore_generator(snapshot.rng_state)
+
+    def rollback(self, incident_id: str, version: int) -> IncidentSnapshot:
+        """Makes `version` the latest again by deleting every later version."""
+        versions = self.versions(incident_id)
+        if version not in versions:
+            raise UnknownIncidentError(f"{incident_id} v{version}")
+        for later in versions[versions.index(version) + 1:]:
+            self._path(incident_id, later).unlink(missing_ok=True)
+        return self.snapshot(incident_id, version)
+
+    def delete(self, incident_id: str) -> bool:
+        directory = self._dir(incident_id)
+        if not directory.is_dir():
+            return False
+        shutil.rmtree(directory)
+        return True
@@ -0,0 +1,232 @@
+"""
+In-process job queue for simulations that outlast an HTTP request.
+
+Large or long-horizon drift runs exceed client and proxy timeouts, so
+POST /jobs admits them here, answers with an ID straight away and runs
+them as background tasks on the event loop. A job's runner is a coroutine
+that works in chunks (each one dispatched to the simulation pool) and
+calls Job.checkpoint() between them: that publishes progress and a
+partial result, and raises JobCancelled once DELETE has been requested,
+so cancellation always lands on a chunk boundary and never interrupts a
+worker mid-chunk.
+
+Admission is bounded: at most `max_jobs` jobs queued or running in total
+and `per_client` of them per client. At most `max_running` run at once;
+the rest wait in FIFO order without holding a connection. Finished jobs
+keep their result for `ttl_seconds` (and only the newest `max_finished`
+are kept), after which they are dropped.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
+
+JobStatus = Literal['queued', 'running', 'succeeded', 'failed', 'cancelled']
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobRejectedError(RuntimeError):
+    """Raised when a job cannot be admitted (429: client limit, 503: queue full)."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class JobCancelled(Exception):
+    """Raised by Job.checkpoint() once cancellation has been requested."""
+
+
+@dataclass
+class Job:
+    """State of one submitted job, as reported by GET /jobs/{id}."""
+    job_id: str
+    client: str
+    kind: str
+    status: JobStatus = 'queued'
+    progress: float = 0.0  # Fraction of the work done, 0..1
+    partial: Optional[Dict] = None  # Latest intermediate result
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_requested: bool = False
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ACTIVE_STATUSES
+
+    def checkpoint(self, progress: Optional[float] = None, partial: Optional[Dict] = None) -> None:
+        """
+        Chunk boundary: publishes progress and the partial result, then
+        raises JobCancelled if the job has been cancelled meanwhile.
+        """
+        if progress is not None:
+            self.progress = min(max(progress, 0.0), 1.0)
+        if partial is not None:
+            self.partial = partial
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        payload = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.error is not None:
+            payload["error"] = self.error
+        if include_result:
+            if self.status == 'succeeded':
+                payload["result"] = self.result
+            elif self.partial is not None:
+                payload["partial"] = self.partial
+        return payload
+
+
+class JobManager:
+    """
+    Bounded in-process job queue with per-client limits and result expiry.
+
+    Runners are `async def runner(job) -> result` coroutines; they own any
+    resources they acquire and must release them when checkpoint() raises.
+
+    Args:
+        max_jobs: Jobs queued or running at once, over all clients
+        max_running: Jobs executing at once; the rest wait in FIFO order
+        per_client: Jobs queued or running at once per client
+        ttl_seconds: How long a finished job's result stays retrievable
+        max_finished: Finished jobs retained regardless of TTL (oldest go first)
+    """
+
+    def __init__(self,
+                 max_jobs: int = 32,
+                 max_running: int = 1,
+                 per_client: int = 2,
+                 ttl_seconds: float = 600.0,
+                 max_finished: int = 256):
+        self.max_jobs = max_jobs
+        self.max_running = max(max_running, 1)
+        self.per_client = per_client
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None  # Bound to the running loop on first use
+        self.rejected = 0
+        self.expired = 0
+
+    @classmethod
+    def from_env(cls, max_running: int = 1) -> "JobManager":
+        """Reads SAR_JOBS_MAX / SAR_JOBS_RUNNING / SAR_JOBS_PER_CLIENT / SAR_JOBS_TTL."""
+        return cls(
+            max_jobs=int(os.environ.get("SAR_JOBS_MAX", 32)),
+            max_running=int(os.environ.get("SAR_JOBS_RUNNING", max_running)),
+            per_client=int(os.environ.get("SAR_JOBS_PER_CLIENT", 2)),
+            ttl_seconds=float(os.environ.get("SAR_JOBS_TTL", 600))
+        )
+
+    def submit(self, client: str, kind: str, runner: Callable[[Job], Awaitable[Any]]) -> Job:
+        """Admits a job and schedules it; raises JobRejectedError when over a limit."""
+        self.expire()
+        active = [job for job in self._jobs.values() if not job.done]
+        if len(active) >= self.max_jobs:
+            self.rejected += 1
+            raise JobRejectedError(f"Job queue full ({len(active)} jobs active)", 503)
+        if sum(job.client == client for job in active) >= self.per_client:
+            self.rejected += 1
+            raise JobRejectedError(f"Client already has {self.per_client} active jobs", 429)
+
+        job = Job(job_id=uuid.uuid4().hex, client=client, kind=kind)
+        self._jobs[job.job_id] = job
+        job.task = asyncio.ensure_future(self._execute(job, runner))
+        return job
+
+    async def _execute(self, job: Job, runner: Callable[[Job], Awaitable[Any]]) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_running)
+        try:
+            async with self._slots:
+                job.status = 'running'
+                job.started_at = time.time()
+                job.result = await runner(job)
+                job.progress = 1.0
+                job.partial = None
+                job.status = 'succeeded'
+        except (JobCancelled, asyncio.CancelledError):
+            job.status = 'cancelled'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            job.task = None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.expire()
+        return self._jobs.get(job_id)
+
+    def list(self, client: Optional[str] = None) -> List[Job]:
+        self.expire()
+        return [job for job in self._jobs.values() if client is None or job.client == client]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancels an active job, or forgets a finished one.
+
+        A queued job is cancelled at once. A running job is flagged and
+        stops at its next checkpoint; its status stays 'running' (with
+        cancel_requested set) until then.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.done:
+            del self._jobs[job_id]
+        elif job.status == 'queued':
+            # Still waiting for a slot, so nothing is in flight on the pool
+            job.cancel_requested = True
+            job.status = 'cancelled'
+            job.finished_at = time.time()
+            job.task.cancel()
+        else:
+            job.cancel_requested = True
+        return job
+
+    def expire(self) -> int:
+        """Drops finished jobs past their TTL or beyond max_finished. Returns the count."""
+        cutoff = time.time() - self.ttl_seconds
+        finished = [job for job in self._jobs.values() if job.done]
+        stale = [job for job in finished if job.finished_at <= cutoff]
+        overflow = len(finished) - len(stale) - self.max_finished
+        if overflow > 0:
+            live = sorted((job for job in finished if job.finished_at > cutoff), key=lambda job: job.finished_at)
+            stale.extend(live[:overflow])
+        for job in stale:
+            del self._jobs[job.job_id]
+        self.expired += len(stale)
+        return len(stale)
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs per status."""
+        counts = {status: 0 for status in ('queued', 'running', 'succeeded', 'failed', 'cancelled')}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def shutdown(self) -> None:
+        """Cancels every active job and waits for the runners to clean up."""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,15 +1,70 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Tuple, Optional, List
-from drift_engine import BayesianDriftEngine
-from mission_planner import MissionPlanner
+from typing import Dict, Tuple, Optional, List, Literal, Sequence
+from drift_engine import DEFAULT_PARALLEL_CHUNK, BayesianDriftEngine
+from mission_planner import DEFAULT_HORIZON_HOURS, AssetType, MissionPlanner
+from negative_search import SearchEffort, SearchedCell, SearchTrack
+from samplers import SOBOL_UNAVAILABLE, sobol_available
 from scenario_library import ScenarioLibrary, SARScenario
+from search_optimizer import SearchAsset
+import simulation_pool
+import streaming_stats
+from simulation_pool import PoolSaturatedError, SimulationPool
+from result_cache import ResultCache, make_cache_key
+from job_queue import Job, JobManager, JobRejectedError
+from incident_store import IncidentStore, UnknownIncidentError
+from single_flight import FlightTimeoutError, SingleFlight
+import binary_export
+import metrics
+from metrics import RequestTimingMiddleware, StageTimer, stage
+
+# Initialize engines
+drift_engine = BayesianDriftEngine(iterations=int(os.environ.get("SAR_ITERATIONS", 10000)))
+mission_planner = MissionPlanner.from_env()
+
+# CPU-bound work runs here, never on the event loop (SAR_POOL_WORKERS=0 runs inline)
+worker_pool = SimulationPool.from_env(iterations=drift_engine.iterations)
+
+# Seeded results are deterministic, so repeat requests are served from memory
+result_cache = ResultCache(
+    max_bytes=int(os.environ.get("SAR_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    ttl_seconds=float(os.environ.get("SAR_CACHE_TTL", 300))
+)
+
+# Long runs submitted through /jobs; one runs per pool worker unless SAR_JOBS_RUNNING says otherwise
+job_manager = JobManager.from_env(max_running=max(worker_pool.max_workers, 1))
+
+# Incident clouds persist on disk between re-forecasts; mutations of one incident are serialised.
+# A lock lives only while a request holds or waits for it, so unknown IDs leave nothing behind.
+incident_store = IncidentStore.from_env()
+incident_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# Identical concurrent drift/scenario requests share one in-flight run (see single_flight)
+coalescer = SingleFlight.from_env()
+
+# Scenarios without an explicit seed use this one, so they are reproducible and cacheable
+DEFAULT_SCENARIO_SEED = 0
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await job_manager.shutdown()
+    worker_pool.shutdown()
 
 app = FastAPI(
     title="AeroSAR: Probabilistic Command & Control",
     version="2.0.0",
-    description="Agentic Decision Support System for Maritime Search and Rescue Operations"
+    description="Agentic Decision Support System for Maritime Search and Rescue Operations",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend integration
@@ -20,114 +75,871 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestTimingMiddleware)
 
-# Initialize engines
-drift_engine = BayesianDriftEngine(iterations=10000)
-mission_planner = MissionPlanner()
+class LKPReportModel(BaseModel):
+    lat: float
+    lon: float
+    uncertainty_nm: float = 0.0
+    weight: float = 1.0
+
+class VectorModel(BaseModel):
+    speed: float  # Knots
+    direction: float  # Degrees: wind blows from, current sets towards
 
 class DriftRequest(BaseModel):
     lkp: Tuple[float, float]
-    wind: Dict[str, float]
-    current: Dict[str, float]
+    wind: VectorModel
+    current: VectorModel
     hours: float
     craft_type: str = "life_raft"
+    seed: Optional[int] = None  # Reproducible run; seeded results are cached
+    forcing: Optional[str] = None  # Gridded forcing dataset under SAR_FORCING_DIR
+    forcing_start_hours: float = 0.0  # Dataset time (hours) at the LKP
+    tolerance_nm: Optional[float] = None  # Adaptive sampling: target Monte Carlo precision
+    max_particles: Optional[int] = None  # Adaptive sampling budget (<= MAX_PARTICLES)
+    lkp_uncertainty_nm: float = 0.0  # 1-sigma LKP position error
+    lkp_reports: Optional[List[LKPReportModel]] = None  # Conflicting reports (replaces lkp as start)
+    leeway: Optional[Dict[str, float]] = None  # {'slope', 'offset', 'slope_sd', 'offset_sd'}
+    sampler: Optional[Literal['mc', 'antithetic', 'stratified', 'halton', 'sobol']] = None  # Variance-reduced draws, with sampling_error
+    timings: bool = False  # Include per-stage seconds in the response
+
+class SearchAssetModel(BaseModel):
+    asset_id: str
+    asset_type: AssetType
+    speed_kts: Optional[float] = None  # Default: typical for the asset type
+    sweep_width_nm: Optional[float] = None  # Default: typical for the asset type
+    endurance_hours: Optional[float] = None  # Default: unlimited
+    available_at_hours: float = 0.0  # Hours from now until it can start
+    position: Optional[Tuple[float, float]] = None  # (lat, lon); None: starts on its first cell
+
+class FleetDriftRequest(DriftRequest):
+    fleet: Optional[List[SearchAssetModel]] = None  # Assets to schedule; replaces the area-based allocation and coverage hours
+    horizon_hours: float = DEFAULT_HORIZON_HOURS  # Planning horizon of the fleet schedule
+
+class TrajectoryRequest(DriftRequest):
+    dt: float = 1.0  # Integration step in hours
+
+class HeatmapRequest(DriftRequest):
+    bins: int = 128  # Grid cells per side (<= MAX_HEATMAP_BINS)
+    include_particles: bool = False  # Append the raw cloud
+    particle_encoding: Literal['f4', 'u2'] = 'f4'  # float32, or uint16 over the grid bounds
+    compress: bool = False  # zlib the array buffers
+
+class HDROptions(BaseModel):
+    levels: List[float] = [0.5, 0.9, 0.95]  # Probabilities enclosed, each in (0, 1]
+    smooth: int = 1  # Binomial smoothing passes over the density grid
+    simplify_nm: Optional[float] = None  # Polygon simplification tolerance (default: half a cell)
+    resolution: int = 128  # Grid cells along the longer axis (<= MAX_HDR_RESOLUTION)
+
+class HDRRequest(HDROptions, DriftRequest):
+    pass
+
+class IncidentHDRRequest(HDROptions):
+    version: Optional[int] = None  # Stored version (default: the latest)
+
+class StreamDriftRequest(DriftRequest):
+    pilot_particles: int = 1000  # Size of the first (coarse) step
+
+class JobRequest(DriftRequest):
+    particles: Optional[int] = None  # Total cloud size (<= MAX_JOB_PARTICLES, or MAX_STREAMING_PARTICLES when streaming); defaults to SAR_ITERATIONS
+    chunk_particles: int = 250_000  # Largest chunk: bounds the time to cancel and between progress updates
+    streaming: bool = False  # Allow up to MAX_STREAMING_PARTICLES (every job runs in constant memory)
+
+class IncidentRequest(DriftRequest):
+    incident_id: str  # 1-64 characters of [A-Za-z0-9_.-]
+
+class AdvanceIncidentRequest(BaseModel):
+    hours: float  # Interval to move the incident clock forward by
+    wind: VectorModel
+    current: VectorModel
+    forcing: Optional[str] = None  # Gridded forcing dataset under SAR_FORCING_DIR
+    forcing_start_hours: Optional[float] = None  # Dataset time at the start of the interval (default: continues the incident's)
+    dt: Optional[float] = None  # Integration step in hours (default: one step, or DEFAULT_FORCING_DT with forcing)
+    leeway: Optional[Dict[str, float]] = None  # Defaults to the incident's leeway model
+
+class SearchedCellModel(BaseModel):
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+
+class SearchTrackModel(BaseModel):
+    points: List[Tuple[float, float]]
+    sweep_width_nm: float
+
+class IncidentSearchRequest(BaseModel):
+    asset_type: AssetType
+    cells: List[SearchedCellModel] = []
+    tracks: List[SearchTrackModel] = []
+    coverage: float = 1.0
+
+class RollbackRequest(BaseModel):
+    version: int
+
+class BatchDriftRequest(BaseModel):
+    requests: List[DriftRequest]  # Per-item seeds are ignored
+    seed: Optional[int] = None  # Seeds the single draw for the whole batch
 
 class ScenarioRequest(BaseModel):
     scenario_id: str  # 'north_sea', 'mediterranean', 'atlantic'
+    seed: Optional[int] = None  # Defaults to DEFAULT_SCENARIO_SEED
+    timings: bool = False  # Include per-stage seconds in the response
+
+MAX_BATCH_SIZE = 256
+MAX_FLEET_SIZE = 64
+MAX_FLEET_ASSIGNMENTS = 20  # Scheduled searches returned, earliest first
+MAX_PARTICLES = 1_000_000  # Upper bound on any adaptive budget
+MAX_HEATMAP_BINS = 1024
+MAX_HDR_RESOLUTION = 512
+MAX_HDR_LEVELS = 8
+MAX_JOB_PARTICLES = int(os.environ.get("SAR_JOB_MAX_PARTICLES", 20_000_000))
+MAX_STREAMING_PARTICLES = int(os.environ.get("SAR_JOB_MAX_STREAMING_PARTICLES", 1_000_000_000))
+JOB_RETRY_SECONDS = 0.5  # Wait before re-submitting a job chunk the pool shed
+
+def drift_params(request: DriftRequest) -> Dict:
+    """Engine keyword arguments for a drift request (without the seed)."""
+    params = {"lkp": request.lkp, "wind": request.wind.model_dump(), "current": request.current.model_dump(),
+              "hours": request.hours}
+    if request.forcing is not None:
+        # Resolved to memory-mapped fields on the worker
+        params["forcing"] = request.forcing
+        params["forcing_start_hours"] = request.forcing_start_hours
+    if request.tolerance_nm is not None:
+        params["tolerance_nm"] = request.tolerance_nm
+        params["max_particles"] = min(request.max_particles or 10 * drift_engine.iterations, MAX_PARTICLES)
+    if request.lkp_uncertainty_nm > 0:
+        params["lkp_uncertainty_nm"] = request.lkp_uncertainty_nm
+    if request.lkp_reports:
+        params["lkp_reports"] = [dict(report) for report in request.lkp_reports]
+    if request.leeway is not None:
+        params["leeway"] = request.leeway
+    if request.sampler is not None:
+        params["sampler"] = request.sampler
+    return params
+
+# Optional drift request features, by the name endpoints list as unsupported: (present?, name in errors)
+DRIFT_FEATURES = {
+    "adaptive": (lambda r: r.tolerance_nm is not None, "Adaptive sampling"),
+    "sampler": (lambda r: r.sampler is not None, "sampler"),
+    "forcing": (lambda r: r.forcing is not None, "Gridded forcing"),
+    "lkp_reports": (lambda r: bool(r.lkp_reports), "lkp_reports"),
+}
+
+def validate_drift_request(request: DriftRequest, unsupported: Sequence[str] = (), where: str = "") -> None:
+    """
+    Checks a drift request before any work starts (400 on bad input).
+    
+    `unsupported` lists the DRIFT_FEATURES the endpoint cannot run; `where`
+    completes the message, e.g. "in batch mode".
+    """
+    for feature in unsupported:
+        present, name = DRIFT_FEATURES[feature]
+        if present(request):
+            raise HTTPException(status_code=400, detail=f"{name} is not supported {where}")
+    if request.tolerance_nm is not None:
+        if request.tolerance_nm <= 0:
+            raise HTTPException(status_code=400, detail="tolerance_nm must be positive")
+        if request.sampler is not None:
+            raise HTTPException(status_code=400, detail="sampler is not supported with adaptive sampling")
+    if request.max_particles is not None and request.max_particles < 1:
+        raise HTTPException(status_code=400, detail="max_particles must be positive")
+    if request.sampler == 'sobol' and not sobol_available():
+        raise HTTPException(status_code=400, detail=SOBOL_UNAVAILABLE)
+
+def fleet_assets(request: FleetDriftRequest) -> Optional[List[SearchAsset]]:
+    """The request's fleet as optimizer assets (400 on bad input); None without one."""
+    if request.fleet is None:
+        return None
+    if not 1 <= len(request.fleet) <= MAX_FLEET_SIZE:
+        raise HTTPException(status_code=400, detail=f"fleet must hold between 1 and {MAX_FLEET_SIZE} assets")
+    if len({asset.asset_id for asset in request.fleet}) != len(request.fleet):
+        raise HTTPException(status_code=400, detail="asset_id must be unique within the fleet")
+    if request.horizon_hours <= 0:
+        raise HTTPException(status_code=400, detail="horizon_hours must be positive")
+    fleet = []
+    for model in request.fleet:
+        overrides = {name: value for name, value in dict(model).items()
+                     if value is not None and name not in ("asset_id", "asset_type")}
+        asset = SearchAsset.from_profile(model.asset_id, model.asset_type, **overrides)
+        if min(asset.speed_kts, asset.sweep_width_nm, asset.endurance_hours) <= 0 or asset.available_at_hours < 0:
+            raise HTTPException(status_code=400, detail=f"Asset {asset.asset_id}: speed, sweep width and "
+                                                        "endurance must be positive, availability not negative")
+        fleet.append(asset)
+    return fleet
+
+@contextmanager
+def http_errors(not_found: Optional[str] = None):
+    """
+    Maps what an endpoint body raises to an HTTP error, the same way for every route.
+    
+    HTTPException passes through; ValueError (bad input caught below the
+    API) is a 400; UnknownIncidentError is a 404 (with `not_found` as
+    detail, if given); anything else, any other KeyError included, is a 500.
+    """
+    try:
+        yield
+    except HTTPException:
+        raise
+    except UnknownIncidentError:
+        raise HTTPException(status_code=404, detail=not_found or "Unknown incident")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def run_on_pool(fn, *args):
+    """Dispatches work to the simulation pool, mapping saturation to HTTP 503."""
+    metrics.queue_depth.observe(worker_pool.pending)
+    try:
+        return await worker_pool.run(fn, *args)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+async def run_blocking(fn, *args):
+    """Runs a short blocking call (incident store file I/O) on the default thread pool, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+async def coalesce(key: Tuple, fn, *args):
+    """Joins or starts the in-flight computation for key, mapping its deadline to HTTP 504."""
+    try:
+        return await coalescer.run(key, fn, *args)
+    except FlightTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+def build_drift_response(stats: Dict, recommendation) -> Dict:
+    """Shapes engine stats and a SearchRecommendation into the drift API payload."""
+    response = {
+        "status": "success",
+        "search_center": {
+            "lat": stats["mean_lat"],
+            "lon": stats["mean_lon"]
+        },
+        "reliability": {
+            "confidence_radius_nm": stats["confidence_radius_95"],
+            "distribution_variance": stats["std_dev_nm"]
+        },
+        "mission_plan": {
+            "optimal_pattern": recommendation.optimal_pattern,
+            "rationale": recommendation.rationale,
+            "asset_allocation": recommendation.asset_allocation,
+            "critical_path": [
+                {"lat": cell.center_lat, "lon": cell.center_lon, "priority": cell.priority}
+                for cell in recommendation.critical_path[:5]
+            ],
+            "estimated_coverage_hours": recommendation.estimated_coverage_time_hours
+        }
+    }
+    if recommendation.fleet_plan is not None:
+        response["mission_plan"]["fleet_plan"] = {
+            "probability_of_success": recommendation.fleet_plan.total_pos,
+            "assignments": [
+                {"asset_id": a.asset_id, "lat": a.center_lat, "lon": a.center_lon,
+                 "start_hours": a.start_hours, "end_hours": a.end_hours, "pos_gain": a.pos_gain}
+                for a in recommendation.fleet_plan.assignments[:MAX_FLEET_ASSIGNMENTS]
+            ]
+        }
+    if "sampling" in stats:
+        response["sampling"] = stats["sampling"]
+    if "sampling_error" in stats:
+        response["sampling_error"] = stats["sampling_error"]
+    return response
+
+def record_timings(route: str, stats: Dict, timer: StageTimer) -> Dict[str, float]:
+    """Merges worker stage timings into the handler's and feeds /metrics."""
+    timings = {**stats.pop("timings", {}), **timer.timings}
+    n_particles = stats.pop("particles", None)
+    metrics.observe_stages(timings)
+    if n_particles is not None:
+        metrics.particles.observe(n_particles, route)
+    return timings
+
+def json_response(payload: Dict, timer: StageTimer, timings: Optional[Dict[str, float]] = None) -> Response:
+    """
+    Serialises payload the way FastAPI's JSONResponse does, timing the encode.
+    
+    `timings`, when requested, are attached under "timings"; the encode
+    itself can only be reported in /metrics since it finishes afterwards.
+    """
+    if timings is not None:
+        payload = {**payload, "timings": timings}
+    with stage(timer, "serialize"):
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+    metrics.stage_seconds.observe(timer.timings.get("serialize", 0.0), "serialize")
+    return Response(content=body, media_type="application/json")
 
 @app.get("/")
 async def root():
     return {
         "service": "AeroSAR: Bayesian SAR Orchestrator",
         "status": "operational",
-        "capabilities": ["drift_simulation", "mission_planning", "scenario_stress_testing"]
+        "capabilities": ["drift_simulation", "mission_planning", "scenario_stress_testing", "background_jobs", "incident_reforecast", "hdr_contours"],
+        "worker_pool": {
+            "workers": worker_pool.max_workers,
+            "pending": worker_pool.pending,
+            "rejected": worker_pool.rejected
+        }
     }
 
+async def compute_drift(params: Dict,
+                        seed: Optional[int],
+                        cache_key: Optional[Tuple],
+                        fleet: Optional[List[SearchAsset]] = None,
+                        horizon_hours: float = DEFAULT_HORIZON_HOURS) -> Tuple[Dict, Dict[str, float]]:
+    """Drift response and its stage timings, run once per flight of identical requests."""
+    timer = StageTimer()
+    # Drift engine, search stats and mission plan run together on a worker
+    stats, recommendation, _ = await run_on_pool(
+        simulation_pool.simulate_and_plan,
+        {**params, "rng": seed}, False, fleet, horizon_hours
+    )
+    
+    with stage(timer, "build_response"):
+        response = build_drift_response(stats, recommendation)
+    timings = record_timings("/simulate/drift", stats, timer)
+    if cache_key is not None:
+        result_cache.put(cache_key, response)
+    return response, timings
+
 @app.post("/simulate/drift")
-async def simulate_drift(request: DriftRequest):
+async def simulate_drift(request: FleetDriftRequest):
     """
     Triggers Monte Carlo Markov Chain simulation for stochastic drift inference.
     
+    With a `fleet`, the assets are scheduled cell by cell over the drift
+    density (search_optimizer): asset_allocation counts the assets tasked,
+    estimated_coverage_hours is when the schedule has found 90% of the
+    gridded mass (mission_planner.FLEET_COVERAGE_POS) and
+    mission_plan.fleet_plan lists its first searches.
+    
     Returns: Probability heatmap and SAR deployment recommendations.
     """
-    try:
-        # 1. Execute Bayesian drift engine
-        results = drift_engine.calculate_drift(
-            lkp=request.lkp,
-            wind=request.wind,
-            current=request.current,
-            hours=request.hours
+    validate_drift_request(request)
+    fleet = fleet_assets(request)
+    timer = StageTimer()
+    started = time.perf_counter()
+    params = drift_params(request)
+    key_params = params if fleet is None else \
+        {**params, "fleet": [dict(asset) for asset in request.fleet], "horizon_hours": request.horizon_hours}
+    cache_key = make_cache_key("drift", key_params, request.seed) if request.seed is not None else None
+    if cache_key is not None:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            if not request.timings:
+                return cached
+            return json_response(cached, timer, {"cache_hit": time.perf_counter() - started})
+    with http_errors():
+        # Unseeded requests coalesce too: concurrent viewers share one equally valid draw
+        response, timings = await coalesce(
+            cache_key or make_cache_key("drift", key_params, None),
+            compute_drift, params, request.seed, cache_key, fleet, request.horizon_hours
         )
-        
-        # 2. Extract statistical metrics
-        stats = drift_engine.get_search_area_stats(results)
-        
-        # 3. Generate mission plan
-        recommendation = mission_planner.plan_mission(
-            latitudes=results['latitude'].values,
-            longitudes=results['longitude'].values,
-            weights=results['weight'].values
+    if request.timings:
+        return json_response(response, timer, {**timings, "total": time.perf_counter() - started})
+    return json_response(response, timer)
+
+@app.post("/simulate/drift/batch")
+async def simulate_drift_batch(request: BatchDriftRequest):
+    """
+    Runs many drift simulations as one vectorised (requests x particles) computation.
+    
+    Returns: One /simulate/drift payload per request, in input order.
+    """
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one request")
+    if len(request.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch size exceeds limit of {MAX_BATCH_SIZE}")
+    for item in request.requests:
+        validate_drift_request(item, ("adaptive", "sampler", "forcing", "lkp_reports"), "in batch mode")
+    with http_errors():
+        all_stats, recommendations = await run_on_pool(
+            simulation_pool.simulate_and_plan_batch,
+            [drift_params(r) for r in request.requests],
+            request.seed
         )
-        
-        return {
-            "status": "success",
-            "search_center": {
-                "lat": stats["mean_lat"],
-                "lon": stats["mean_lon"]
-            },
-            "reliability": {
-                "confidence_radius_nm": stats["confidence_radius_95"],
-                "distribution_variance": stats["std_dev_nm"]
-            },
-            "mission_plan": {
-                "optimal_pattern": recommendation.optimal_pattern,
-                "rationale": recommendation.rationale,
-                "asset_allocation": recommendation.asset_allocation,
-                "critical_path": [
-                    {"lat": cell.center_lat, "lon": cell.center_lon, "priority": cell.priority}
-                    for cell in recommendation.critical_path[:5]
-                ],
-                "estimated_coverage_hours": recommendation.estimated_coverage_time_hours
-            }
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    metrics.particles.observe(len(request.requests) * worker_pool.iterations, "/simulate/drift/batch")
+    return {
+        "status": "success",
+        "results": [
+            build_drift_response(stats, recommendation)
+            for stats, recommendation in zip(all_stats, recommendations)
+        ]
+    }
 
-@app.post("/simulate/scenario")
-async def run_scenario(request: ScenarioRequest):
+@app.post("/simulate/drift/trajectory")
+async def simulate_trajectory(request: TrajectoryRequest):
     """
-    Executes a predefined high-stakes operational scenario.
+    Time-stepped drift integration for time-lapse rendering.
     
-    Returns: Complete mission analysis including environmental forcing and recommendations.
+    Returns: One compact snapshot (centroid, spread, bounding box) per step.
+    """
+    if request.dt <= 0:
+        raise HTTPException(status_code=400, detail="dt must be positive")
+    validate_drift_request(request, ("adaptive",), "for trajectories")
+    with http_errors():
+        snapshots = await run_on_pool(
+            simulation_pool.simulate_trajectory,
+            {**drift_params(request), "dt": request.dt, "rng": request.seed}
+        )
+    metrics.particles.observe(worker_pool.iterations, "/simulate/drift/trajectory")
+    return {
+        "status": "success",
+        "dt_hours": request.dt,
+        "snapshots": snapshots
+    }
+
+@app.post("/simulate/drift/heatmap")
+async def simulate_drift_heatmap(request: HeatmapRequest):
+    """
+    Probability grid (and optionally the particle cloud) as a binary SARB payload.
+    
+    Returns: application/vnd.sar.grid; see binary_export for the layout.
+    """
+    if not 1 <= request.bins <= MAX_HEATMAP_BINS:
+        raise HTTPException(status_code=400, detail=f"bins must be between 1 and {MAX_HEATMAP_BINS}")
+    validate_drift_request(request)
+    params = drift_params(request)
+    options = (request.bins, request.include_particles, request.particle_encoding, request.compress)
+    cache_key = None
+    if request.seed is not None:
+        cache_key = make_cache_key("heatmap", {**params, "options": options}, request.seed)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type=binary_export.MEDIA_TYPE)
+    with http_errors():
+        stats, payload = await run_on_pool(
+            simulation_pool.simulate_heatmap,
+            {**params, "rng": request.seed},
+            *options
+        )
+    metrics.particles.observe(stats["particles"], "/simulate/drift/heatmap")
+    if cache_key is not None:
+        result_cache.put(cache_key, payload, size_bytes=len(payload))
+    return Response(content=payload, media_type=binary_export.MEDIA_TYPE)
+
+def validate_hdr_options(options: HDROptions) -> Tuple:
+    """Checks HDR options (400 on bad input); returns them as worker arguments."""
+    if not 1 <= len(options.levels) <= MAX_HDR_LEVELS or not all(0 < level <= 1 for level in options.levels):
+        raise HTTPException(status_code=400, detail=f"levels must be 1-{MAX_HDR_LEVELS} probabilities in (0, 1]")
+    if not 2 <= options.resolution <= MAX_HDR_RESOLUTION:
+        raise HTTPException(status_code=400, detail=f"resolution must be between 2 and {MAX_HDR_RESOLUTION}")
+    if not 0 <= options.smooth <= 8:
+        raise HTTPException(status_code=400, detail="smooth must be between 0 and 8")
+    if options.simplify_nm is not None and options.simplify_nm < 0:
+        raise HTTPException(status_code=400, detail="simplify_nm must not be negative")
+    return list(options.levels), options.smooth, options.simplify_nm, options.resolution
+
+@app.post("/simulate/drift/hdr")
+async def simulate_drift_hdr(request: HDRRequest):
+    """
+    Highest-density regions of the drift cloud as GeoJSON MultiPolygons.
+    
+    Unlike the circular confidence radius, the p-region is the smallest
+    area holding probability p, so skewed and multi-modal clouds keep
+    their shape. Seeded results are cached per simulation and options.
+    """
+    options = validate_hdr_options(request)
+    validate_drift_request(request)
+    params = drift_params(request)
+    cache_key = None
+    if request.seed is not None:
+        cache_key = make_cache_key("hdr", {**params, "options": options}, request.seed)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    with http_errors():
+        stats, payload = await run_on_pool(simulation_pool.simulate_hdr, {**params, "rng": request.seed}, *options)
+    metrics.particles.observe(stats["particles"], "/simulate/drift/hdr")
+    response = {
+        "status": "success",
+        "search_center": {"lat": stats["mean_lat"], "lon": stats["mean_lon"]},
+        "reliability": {
+            "confidence_radius_nm": stats["confidence_radius_95"],
+            "distribution_variance": stats["std_dev_nm"]
+        },
+        **payload
+    }
+    if cache_key is not None:
+        result_cache.put(cache_key, response)
+    return response
+
+async def run_progressive_step(*args):
+    """
+    run_on_pool for simulate_progressive_step that never leaks the parked cloud.
+    
+    If the client disconnects while a step is in flight, the step still
+    finishes on its worker; its shared memory block is released then.
     """
+    task = asyncio.ensure_future(run_on_pool(simulation_pool.simulate_progressive_step, *args))
     try:
-        # Load scenario
-        if request.scenario_id == 'north_sea':
-            scenario = ScenarioLibrary.north_sea_grounding()
-        elif request.scenario_id == 'mediterranean':
-            scenario = ScenarioLibrary.mediterranean_multi_lkp()
-        elif request.scenario_id == 'atlantic':
-            scenario = ScenarioLibrary.atlantic_deep_water()
-        else:
-            raise HTTPException(status_code=400, detail="Invalid scenario ID")
-        
-        # Run drift simulation
-        results = drift_engine.calculate_drift(
-            lkp=scenario.lkp,
-            wind={'speed': scenario.environment.wind_speed, 'direction': scenario.environment.wind_direction},
-            current={'speed': scenario.environment.current_speed, 'direction': scenario.environment.current_direction},
-            hours=scenario.hours_elapsed
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        task.add_done_callback(
+            lambda t: None if t.cancelled() or t.exception() else simulation_pool.release_particles(t.result()[3])
         )
-        
-        # Generate mission plan
-        stats = drift_engine.get_search_area_stats(results)
-        recommendation = mission_planner.plan_mission(
-            latitudes=results['latitude'].values,
-            longitudes=results['longitude'].values,
-            weights=results['weight'].values
+        raise
+
+def stream_event(event: str, payload: Dict, sse: bool) -> str:
+    """One progressive result as an SSE event or an NDJSON line."""
+    data = json.dumps({"event": event, **payload}, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {data}\n\n" if sse else data + "\n"
+
+def progressive_stats(stats: Dict) -> Dict:
+    return {
+        "particles": stats["particles"],
+        "search_center": {"lat": stats["mean_lat"], "lon": stats["mean_lon"]},
+        "reliability": {
+            "confidence_radius_nm": stats["confidence_radius_95"],
+            "distribution_variance": stats["std_dev_nm"]
+        }
+    }
+
+@app.post("/simulate/drift/stream")
+async def simulate_drift_stream(request: StreamDriftRequest, http_request: Request):
+    """
+    Progressive /simulate/drift: NDJSON by default, SSE with Accept: text/event-stream.
+    
+    Events, in order: 'coarse' (centroid and radius from a small pilot
+    cloud), 'refined' (stats and critical_path as the cloud grows
+    geometrically), then 'final' (the /simulate/drift payload on the full
+    cloud). Every step runs on the pool and extends the previous step's
+    cloud, so the full cloud is drawn exactly once. A failure after the
+    stream has started is reported as an 'error' event.
+    """
+    validate_drift_request(request, ("adaptive",), "for streaming")
+    if request.pilot_particles < 1:
+        raise HTTPException(status_code=400, detail="pilot_particles must be positive")
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+    params = drift_params(request)
+    # Seeded streams are reproducible; unseeded ones draw fresh entropy
+    entropy = request.seed if request.seed is not None else np.random.SeedSequence().entropy
+    schedule = simulation_pool.progressive_schedule(worker_pool.iterations, request.pilot_particles)
+    last = len(schedule) - 1
+    
+    # The pilot step runs before the response starts, so saturation is still a 503
+    with http_errors():
+        first = await run_progressive_step(params, entropy, 0, schedule[0], None, last == 0)
+    
+    async def events():
+        stats, critical_path, recommendation, handle = first
+        try:
+            yield stream_event("coarse", progressive_stats(stats), sse)
+            for index in range(1, len(schedule)):
+                stats, critical_path, recommendation, handle = await run_progressive_step(
+                    params, entropy, index, schedule[index], handle, index == last
+                )
+                if index < last:
+                    yield stream_event("refined", {
+                        **progressive_stats(stats),
+                        "critical_path": [
+                            {"lat": cell.center_lat, "lon": cell.center_lon, "priority": cell.priority}
+                            for cell in critical_path[:5]
+                        ]
+                    }, sse)
+            metrics.particles.observe(stats["particles"], "/simulate/drift/stream")
+            yield stream_event("final", {"particles": stats["particles"], **build_drift_response(stats, recommendation)}, sse)
+        except HTTPException as e:
+            yield stream_event("error", {"status_code": e.status_code, "detail": e.detail}, sse)
+        except Exception as e:
+            yield stream_event("error", {"status_code": 500, "detail": str(e)}, sse)
+        finally:
+            # Only set while an intermediate cloud is parked (e.g. client gone)
+            if recommendation is None:
+                simulation_pool.release_particles(handle)
+    
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers=headers)
+
+async def run_job_step(step, *args):
+    """Awaits step(*args) (a pool dispatch), waiting for pool capacity instead of failing the job."""
+    while True:
+        try:
+            return await step(*args)
+        except HTTPException as e:
+            if e.status_code != 503:
+                raise
+            await asyncio.sleep(JOB_RETRY_SECONDS)
+
+def streaming_partial(summary: streaming_stats.StreamingSummary) -> Dict:
+    """Partial job result from a StreamingSummary: stats and the critical path so far."""
+    density = summary.density.density()
+    critical_path = mission_planner.critical_path_from_grid(density.H, density.lat_edges, density.lon_edges, 5)
+    return {
+        **progressive_stats(summary.search_area_stats()),
+        "critical_path": [
+            {"lat": cell.center_lat, "lon": cell.center_lon, "priority": cell.priority}
+            for cell in critical_path
+        ]
+    }
+
+async def run_drift_job(job: Job, request: JobRequest) -> Dict:
+    """
+    Background /simulate/drift on `request.particles` particles, in constant memory.
+    
+    No cloud is ever held: workers stream fixed-size chunks into mergeable
+    summaries (streaming_stats) and only those come back, so every particle
+    is drawn and binned once. The first step places the density grid from
+    chunk 0; the remaining chunk ranges of about chunk_particles each then
+    run up to one per pool worker at a time, and their summaries are merged
+    in chunk order. Progress and the partial result are published, and a
+    pending cancellation takes effect, after every round.
+    """
+    params = drift_params(request)
+    entropy = request.seed if request.seed is not None else np.random.SeedSequence().entropy
+    total = request.particles or worker_pool.iterations
+    n_chunks = streaming_stats.chunk_count(total)
+    per_step = max(request.chunk_particles // DEFAULT_PARALLEL_CHUNK, 1)
+    ranges = [(first, min(first + per_step, n_chunks)) for first in range(0, n_chunks, per_step)]
+    
+    summary = await run_job_step(run_on_pool, simulation_pool.summarize_drift_chunks,
+                                 params, entropy, total, ranges[0])
+    parallel = max(worker_pool.max_workers, 1)
+    for start in range(1, len(ranges), parallel):
+        job.checkpoint(summary.n_particles / total, streaming_partial(summary))
+        parts = await asyncio.gather(*(
+            run_job_step(run_on_pool, simulation_pool.summarize_drift_chunks,
+                         params, entropy, total, chunks, summary.geometry)
+            for chunks in ranges[start:start + parallel]
+        ))
+        for part in parts:
+            summary = summary.merge(part)
+    
+    stats = summary.search_area_stats()
+    recommendation = mission_planner.plan_from_density(summary.moments_tuple(), summary.density.density())
+    metrics.particles.observe(stats["particles"], "/jobs")
+    return {
+        "particles": stats["particles"],
+        **build_drift_response(stats, recommendation),
+        # Finest-resolution cells; each mass is a lower bound, at most hotspot_error_bound under
+        "hotspots": [
+            {"lat": cell.center_lat, "lon": cell.center_lon, "probability_mass": cell.probability_mass,
+             "size_nm": cell.size_nm}
+            for cell in summary.top_cells.top(10)
+        ],
+        "hotspot_error_bound": summary.top_cells.error_bound
+    }
+
+def job_client(http_request: Request) -> str:
+    """Client identity for per-client job limits: X-Client-Id, else the peer address."""
+    client = http_request.headers.get("x-client-id")
+    if client:
+        return client
+    return http_request.client.host if http_request.client else "anonymous"
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest, http_request: Request, response: Response):
+    """
+    Queues a drift simulation too large or long for a request/response call.
+    
+    Returns: The job (poll GET /jobs/{job_id}); 429 when the client is at
+    its concurrency limit, 503 when the queue is full.
+    """
+    validate_drift_request(request, ("adaptive",), "for jobs")
+    max_particles = MAX_STREAMING_PARTICLES if request.streaming else MAX_JOB_PARTICLES
+    if request.particles is not None and not 1 <= request.particles <= max_particles:
+        raise HTTPException(status_code=400, detail=f"particles must be between 1 and {max_particles}")
+    if request.chunk_particles < 1:
+        raise HTTPException(status_code=400, detail="chunk_particles must be positive")
+    try:
+        job = job_manager.submit(job_client(http_request), "drift", lambda job: run_drift_job(job, request))
+    except JobRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "5"})
+    response.headers["Location"] = f"/jobs/{job.job_id}"
+    return job.to_dict()
+
+@app.get("/jobs")
+async def list_jobs(http_request: Request):
+    """The calling client's jobs (without results)."""
+    return {"jobs": [job.to_dict(include_result=False) for job in job_manager.list(job_client(http_request))]}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status and progress, with the partial result while running and the result once done."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job.to_dict()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancels a queued or running job; a finished job is deleted instead.
+    
+    A running job stops at its next chunk boundary, so the returned status
+    may still be 'running' with cancel_requested set.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job.to_dict(include_result=False)
+
+def incident_lock(incident_id: str) -> asyncio.Lock:
+    lock = incident_locks.get(incident_id)
+    if lock is None:
+        lock = incident_locks[incident_id] = asyncio.Lock()
+    return lock
+
+@app.post("/incidents")
+async def create_incident(request: IncidentRequest):
+    """
+    Starts a stateful incident: drift from the LKP, stored for later re-forecasts.
+    
+    Returns: The /simulate/drift payload plus the stored incident version.
+    """
+    validate_drift_request(request, ("adaptive",), "for incidents")
+    with http_errors():
+        async with incident_lock(request.incident_id):
+            if await run_blocking(incident_store.exists, request.incident_id):
+                raise HTTPException(status_code=409, detail="Incident already exists")
+            stats, recommendation, snapshot = await run_on_pool(
+                simulation_pool.start_incident, incident_store, request.incident_id,
+                drift_params(request), request.seed
+            )
+    metrics.particles.observe(stats["particles"], "/incidents")
+    return {"incident": snapshot.to_dict(), **build_drift_response(stats, recommendation)}
+
+@app.get("/incidents")
+async def list_incidents():
+    """Stored incidents with their latest version."""
+    def latest():
+        snapshots = []
+        for incident_id in incident_store.incidents():
+            try:
+                snapshots.append(incident_store.snapshot(incident_id).to_dict())
+            except UnknownIncidentError:
+                pass  # Deleted while listing
+        return snapshots
+    
+    return {"incidents": await run_blocking(latest)}
+
+@app.get("/incidents/{incident_id}")
+async def incident_history(incident_id: str):
+    """Every stored version of an incident, oldest first."""
+    with http_errors():
+        history = await run_blocking(incident_store.history, incident_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="Unknown incident")
+    return {"incident_id": incident_id, "versions": [snapshot.to_dict() for snapshot in history]}
+
+@app.post("/incidents/{incident_id}/hdr")
+async def incident_hdr(incident_id: str, request: IncidentHDRRequest):
+    """
+    Highest-density regions of a stored incident version, negative-search
+    weights included. Cached per version: a version rewritten after a
+    rollback has a new timestamp and so a new cache entry.
+    """
+    options = validate_hdr_options(request)
+    
+    def cache_key(snapshot):
+        return make_cache_key("hdr", {"incident_id": incident_id, "version": snapshot.version,
+                                      "created_at": snapshot.created_at, "options": options}, None)
+    
+    with http_errors(not_found="Unknown incident or version"):
+        snapshot = await run_blocking(incident_store.snapshot, incident_id, request.version)
+        cached = result_cache.get(cache_key(snapshot))
+        if cached is not None:
+            return cached
+        # Keyed by the snapshot actually loaded, in case the version was rewritten meanwhile
+        snapshot, payload = await run_on_pool(
+            simulation_pool.incident_hdr, incident_store, incident_id, snapshot.version, *options
         )
-        
-        return {
+    response = {"incident": snapshot.to_dict(), **payload}
+    result_cache.put(cache_key(snapshot), response)
+    return response
+
+@app.post("/incidents/{incident_id}/advance")
+async def advance_incident(incident_id: str, request: AdvanceIncidentRequest):
+    """
+    Moves the incident clock forward by `hours` under new forcing.
+    
+    The stored cloud (with any negative-search weights) is advanced from
+    where it is, so the work is proportional to the new interval only.
+    """
+    if request.hours <= 0:
+        raise HTTPException(status_code=400, detail="hours must be positive")
+    if request.dt is not None and request.dt <= 0:
+        raise HTTPException(status_code=400, detail="dt must be positive")
+    params = {"wind": request.wind.model_dump(), "current": request.current.model_dump(), "hours": request.hours}
+    if request.forcing is not None:
+        params["forcing"] = request.forcing
+        params["forcing_start_hours"] = request.forcing_start_hours
+    if request.dt is not None:
+        params["dt"] = request.dt
+    if request.leeway is not None:
+        params["leeway"] = request.leeway
+    with http_errors(not_found="Unknown incident"):
+        async with incident_lock(incident_id):
+            stats, recommendation, snapshot = await run_on_pool(
+                simulation_pool.advance_incident, incident_store, incident_id, params
+            )
+    metrics.particles.observe(stats["particles"], "/incidents/advance")
+    return {"incident": snapshot.to_dict(), **build_drift_response(stats, recommendation)}
+
+@app.post("/incidents/{incident_id}/search")
+async def search_incident(incident_id: str, request: IncidentSearchRequest):
+    """
+    Records an unsuccessful search: reweights the stored cloud by (1 - POD).
+    
+    The weights persist into later advances of the incident.
+    """
+    if not request.cells and not request.tracks:
+        raise HTTPException(status_code=400, detail="A search needs at least one cell or track")
+    effort = SearchEffort(
+        asset_type=request.asset_type,
+        cells=[SearchedCell(**dict(cell)) for cell in request.cells],
+        tracks=[SearchTrack(points=track.points, sweep_width_nm=track.sweep_width_nm) for track in request.tracks],
+        coverage=request.coverage
+    )
+    with http_errors(not_found="Unknown incident"):
+        async with incident_lock(incident_id):
+            stats, result, snapshot = await run_on_pool(
+                simulation_pool.search_incident, incident_store, incident_id, effort
+            )
+    return {
+        "incident": snapshot.to_dict(),
+        **progressive_stats(stats),
+        "search": {
+            "pod": result.pod,
+            "pos": result.pos,
+            "particles_searched": result.particles_searched,
+            "effective_sample_size": result.effective_sample_size,
+            "resampled": result.resampled
+        },
+        "critical_path": [
+            {"lat": cell.center_lat, "lon": cell.center_lon, "priority": cell.priority}
+            for cell in result.critical_path[:5]
+        ]
+    }
+
+@app.post("/incidents/{incident_id}/rollback")
+async def rollback_incident(incident_id: str, request: RollbackRequest):
+    """Restores an earlier version (cloud, weights and generator); later versions are deleted."""
+    with http_errors(not_found="Unknown incident or version"):
+        async with incident_lock(incident_id):
+            snapshot = await run_blocking(incident_store.rollback, incident_id, request.version)
+    return {"incident": snapshot.to_dict()}
+
+@app.delete("/incidents/{incident_id}")
+async def delete_incident(incident_id: str):
+    with http_errors():
+        async with incident_lock(incident_id):
+            deleted = await run_blocking(incident_store.delete, incident_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Unknown incident")
+    return {"deleted": incident_id}
+
+async def compute_scenario(scenario: SARScenario, seed: int, cache_key: Tuple) -> Tuple[Dict, Dict[str, float]]:
+    """Scenario response and its stage timings, run once per flight of identical requests."""
+    timer = StageTimer()
+    # Run drift simulation and mission plan on a worker
+    stats, recommendation, _ = await run_on_pool(
+        simulation_pool.simulate_and_plan,
+        {**scenario.drift_params(), "rng": seed}
+    )
+    
+    with stage(timer, "build_response"):
+        response = {
             "scenario": {
                 "id": scenario.scenario_id,
                 "name": scenario.name,
@@ -147,8 +959,42 @@ async def run_scenario(request: ScenarioRequest):
                 "recommended_assets": recommendation.asset_allocation
             }
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    timings = record_timings("/simulate/scenario", stats, timer)
+    result_cache.put(cache_key, response)
+    return response, timings
+
+@app.post("/simulate/scenario")
+async def run_scenario(request: ScenarioRequest):
+    """
+    Executes a predefined high-stakes operational scenario.
+    
+    Returns: Complete mission analysis including environmental forcing and recommendations.
+    """
+    # Load scenario
+    if request.scenario_id == 'north_sea':
+        scenario = ScenarioLibrary.north_sea_grounding()
+    elif request.scenario_id == 'mediterranean':
+        scenario = ScenarioLibrary.mediterranean_multi_lkp()
+    elif request.scenario_id == 'atlantic':
+        scenario = ScenarioLibrary.atlantic_deep_water()
+    else:
+        raise HTTPException(status_code=400, detail="Invalid scenario ID")
+    
+    timer = StageTimer()
+    started = time.perf_counter()
+    seed = DEFAULT_SCENARIO_SEED if request.seed is None else request.seed
+    cache_key = make_cache_key("scenario", {"scenario_id": request.scenario_id}, seed)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        if not request.timings:
+            return cached
+        return json_response(cached, timer, {"cache_hit": time.perf_counter() - started})
+    
+    with http_errors():
+        response, timings = await coalesce(cache_key, compute_scenario, scenario, seed, cache_key)
+    if request.timings:
+        return json_response(response, timer, {**timings, "total": time.perf_counter() - started})
+    return json_response(response, timer)
 
 @app.get("/scenarios/list")
 async def list_scenarios():
@@ -164,6 +1010,43 @@ async def list_scenarios():
         ]
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition of stage/request histograms and pool/cache state."""
+    cache = result_cache.stats()
+    jobs = job_manager.counts()
+    gauges = [
+        ("sar_pool_pending", "gauge", "Simulation jobs running or queued.", worker_pool.pending),
+        ("sar_pool_rejected_total", "counter", "Requests shed with 503 because the pool was full.", worker_pool.rejected),
+        ("sar_cache_hits_total", "counter", "Result cache hits.", cache["hits"]),
+        ("sar_cache_misses_total", "counter", "Result cache misses.", cache["misses"]),
+        ("sar_cache_bytes", "gauge", "Estimated bytes held by the result cache.", cache["bytes"]),
+        ("sar_jobs_queued", "gauge", "Background jobs waiting to run.", jobs["queued"]),
+        ("sar_jobs_running", "gauge", "Background jobs running.", jobs["running"]),
+        ("sar_jobs_rejected_total", "counter", "Job submissions refused by queue or client limits.", job_manager.rejected),
+        ("sar_coalesce_in_flight", "gauge", "Distinct drift/scenario computations in flight.", coalescer.in_flight),
+        ("sar_coalesce_waiting", "gauge", "Requests waiting on an in-flight computation.", coalescer.waiting),
+        ("sar_coalesce_started_total", "counter", "Computations started for uncached drift/scenario requests.", sum(coalescer.started.values())),
+        ("sar_coalesce_coalesced_total", "counter", "Requests that joined an identical in-flight computation.", sum(coalescer.coalesced.values())),
+        ("sar_coalesce_timeouts_total", "counter", "In-flight computations that hit their deadline.", coalescer.timeouts),
+    ]
+    return PlainTextResponse(metrics.registry.render(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Result cache occupancy and hit/miss counters."""
+    return result_cache.stats()
+
+@app.get("/coalesce/stats")
+async def coalesce_stats():
+    """In-flight computations, and per kind how many were started and how many requests joined one."""
+    return coalescer.stats()
+
+@app.delete("/cache")
+async def invalidate_cache(kind: Optional[str] = None):
+    """Drops cached results; `kind` ('drift', 'scenario', 'heatmap' or 'hdr') limits the purge."""
+    return {"invalidated": result_cache.invalidate(kind)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -5,12 +5,30 @@ This module implements search pattern optimization and resource allocation
 recommendations based on Bayesian drift inference.
 """
 
+import math
+import os
 import numpy as np
-from typing import Dict, List, Tuple, Literal
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Literal
 from dataclasses import dataclass
+from particle_cloud import ParticleCloud
+from metrics import StageTimer, stage
+
+if TYPE_CHECKING:
+    from search_optimizer import SearchAsset, SearchPlan
 
 SearchPattern = Literal['expanding_square', 'parallel_sweep', 'sector_search', 'creeping_line']
 AssetType = Literal['uav', 'fixed_wing', 'surface_vessel', 'helicopter']
+GridMode = Literal['bins', 'nm', 'quadtree']
+
+NM_PER_DEG = 60.0
+MIN_CELL_NM = 0.01
+GRID_BINS = 20  # Cells per side of the 'bins' critical-path grid
+
+# Fallback coverage model: every allocated asset sweeps this much of the 95% ellipse per hour
+AREA_RATE_KM2_PER_HOUR = 50.0
+# A fleet's coverage time is when its schedule has found this share of the gridded mass
+FLEET_COVERAGE_POS = 0.9
+DEFAULT_HORIZON_HOURS = 24.0
 
 @dataclass
 class GridCell:
@@ -19,6 +37,41 @@ class GridCell:
     center_lon: float
     probability_mass: float
     priority: int
+    size_nm: Optional[float] = None  # Edge length; None for bounding-box bins
+
+@dataclass
+class ProbabilityDensity:
+    """
+    Probability mass on square cells of cell_nm nautical miles.
+    
+    The grid covers mean ± extent_sigma standard deviations of the cloud,
+    so outliers land in outside_mass instead of stretching the cells.
+    Computed once per cloud from the moments shared with the geometry stage.
+    """
+    H: np.ndarray  # (rows, cols) mass per cell, rows south to north
+    lat_edges: np.ndarray
+    lon_edges: np.ndarray
+    cell_nm: float
+    outside_mass: float
+
+@dataclass
+class DensityGeometry:
+    """Placement of a ProbabilityDensity grid: rows x cols cells from (lat0, lon0)."""
+    lat0: float
+    lon0: float
+    lat_step: float  # Degrees per cell
+    lon_step: float
+    rows: int
+    cols: int
+    cell_nm: float
+    
+    @property
+    def lat_edges(self) -> np.ndarray:
+        return self.lat0 + self.lat_step * np.arange(self.rows + 1)
+    
+    @property
+    def lon_edges(self) -> np.ndarray:
+        return self.lon0 + self.lon_step * np.arange(self.cols + 1)
 
 @dataclass
 class SearchRecommendation:
@@ -28,6 +81,7 @@ class SearchRecommendation:
     asset_allocation: Dict[AssetType, int]
     critical_path: List[GridCell]
     estimated_coverage_time_hours: float
+    fleet_plan: Optional['SearchPlan'] = None  # Schedule of the given fleet, if one was given
 
 class MissionPlanner:
     """
@@ -36,7 +90,30 @@ class MissionPlanner:
     Synthesizes probability distributions to generate actionable deployment plans.
     """
     
-    def __init__(self):
+    def __init__(self,
+                 grid_mode: GridMode = 'bins',
+                 cell_nm: Optional[float] = None,
+                 max_cells: int = 256,
+                 extent_sigma: float = 4.0,
+                 split_mass: float = 0.01):
+        """
+        Args:
+            grid_mode: Critical-path grid. 'bins' is a GRID_BINS-square grid over the
+                cloud's bounding box; 'nm' uses square cells of cell_nm
+                over mean ± extent_sigma sd; 'quadtree' refines those cells
+                only where a quadrant holds more than split_mass
+            cell_nm: Cell size in nautical miles (None: a quarter of the
+                minor-axis standard deviation)
+            max_cells: Cells per axis cap; cells grow to stay within it
+        """
+        if grid_mode not in ('bins', 'nm', 'quadtree'):
+            raise ValueError(f"Unknown grid mode: {grid_mode}")
+        self.grid_mode = grid_mode
+        self.cell_nm = cell_nm
+        self.max_cells = max_cells
+        self.extent_sigma = extent_sigma
+        self.split_mass = split_mass
+        
         # Probability of Detection (POD) coefficients by asset type
         self.pod_coefficients = {
             'uav': 0.75,
@@ -45,10 +122,17 @@ class MissionPlanner:
             'helicopter': 0.90
         }
     
+    @classmethod
+    def from_env(cls) -> 'MissionPlanner':
+        """Planner configured by SAR_GRID_MODE and SAR_GRID_CELL_NM."""
+        cell_nm = os.environ.get("SAR_GRID_CELL_NM")
+        return cls(grid_mode=os.environ.get("SAR_GRID_MODE", "bins"),
+                   cell_nm=float(cell_nm) if cell_nm else None)
+    
     def analyze_distribution_geometry(self, 
                                      latitudes: np.ndarray, 
                                      longitudes: np.ndarray,
-                                     weights: np.ndarray) -> Dict[str, float]:
+                                     weights: Optional[np.ndarray] = None) -> Dict[str, float]:
         """
         Computes geometric properties of the probability distribution.
         
@@ -56,10 +140,47 @@ class MissionPlanner:
             - aspect_ratio: Width/Height of the distribution
             - eccentricity: Degree of elongation (0=circular, 1=linear)
             - spread_km2: Total search area in square kilometers
-        """
-        # Calculate covariance matrix
-        cov_matrix = np.cov(latitudes, longitudes, aweights=weights)
         
+        weights=None means a uniformly weighted cloud.
+        """
+        _, _, cov_matrix = self.distribution_moments(latitudes, longitudes, weights)
+        return self.geometry_from_covariance(cov_matrix)
+    
+    @staticmethod
+    def distribution_moments(latitudes: np.ndarray,
+                             longitudes: np.ndarray,
+                             weights: Optional[np.ndarray] = None) -> Tuple[float, float, np.ndarray]:
+        """Weighted mean position and 2x2 (lat, lon) covariance in degrees."""
+        # Calculate covariance matrix (same normalisation as np.cov with aweights,
+        # but from dot products so no stacked (2, n) copies are made)
+        if weights is None:
+            mean_lat = latitudes.mean(dtype=np.float64)
+            mean_lon = longitudes.mean(dtype=np.float64)
+            fact = latitudes.shape[0] - 1
+            d_lat = latitudes - mean_lat
+            d_lon = longitudes - mean_lon
+            w_lat = d_lat
+        else:
+            v1 = weights.sum()
+            mean_lat = np.dot(weights, latitudes) / v1
+            mean_lon = np.dot(weights, longitudes) / v1
+            fact = v1 - np.dot(weights, weights) / v1
+            d_lat = latitudes - mean_lat
+            d_lon = longitudes - mean_lon
+            w_lat = weights * d_lat
+        if fact <= 0:
+            # One particle (or all the weight on one): a point has no spread, as DriftMoments.covariance
+            return float(mean_lat), float(mean_lon), np.zeros((2, 2))
+        cov_lat_lon = np.dot(w_lat, d_lon) / fact
+        cov_matrix = np.array([
+            [np.dot(w_lat, d_lat) / fact, cov_lat_lon],
+            [cov_lat_lon, (np.dot(weights, d_lon * d_lon) if weights is not None else np.dot(d_lon, d_lon)) / fact]
+        ])
+        return float(mean_lat), float(mean_lon), cov_matrix
+    
+    @staticmethod
+    def geometry_from_covariance(cov_matrix: np.ndarray) -> Dict[str, float]:
+        """analyze_distribution_geometry from an already computed covariance."""
         # Eigenvalues determine spread geometry
         eigenvalues = np.linalg.eigvalsh(cov_matrix)
         
@@ -117,65 +238,530 @@ class MissionPlanner:
         
         return allocation
     
+    def estimate_coverage(self, geometry: Dict[str, float], pattern: SearchPattern) -> Tuple[Dict[AssetType, int], float]:
+        """
+        allocate_assets plus the hours its assets need to sweep the 95% ellipse once.
+        
+        The estimate when no fleet is known: each asset is assumed to cover
+        AREA_RATE_KM2_PER_HOUR regardless of type or the shape of the density.
+        """
+        assets = self.allocate_assets(geometry['spread_km2'], pattern)
+        return assets, geometry['spread_km2'] / (sum(assets.values()) * AREA_RATE_KM2_PER_HOUR)
+    
+    def plan_fleet(self,
+                   density: ProbabilityDensity,
+                   fleet: Sequence['SearchAsset'],
+                   horizon_hours: float = DEFAULT_HORIZON_HOURS) -> Tuple[Dict[AssetType, int], float, 'SearchPlan']:
+        """
+        Allocation and coverage time of an actual fleet, from its SearchEffortOptimizer schedule.
+        
+        Returns:
+            (assets tasked at least once per type, hours until the schedule
+            has found FLEET_COVERAGE_POS of the mass on the grid or
+            horizon_hours if it does not get there, the schedule)
+        """
+        # search_optimizer builds on this module, so it is imported on use
+        from search_optimizer import ASSET_PROFILES, SearchEffortOptimizer
+        
+        plan = SearchEffortOptimizer(self, density, fleet).plan(horizon_hours)
+        asset_types = {asset.asset_id: asset.asset_type for asset in fleet}
+        allocation = {asset_type: 0 for asset_type in ASSET_PROFILES}
+        for asset_id in {assignment.asset_id for assignment in plan.assignments}:
+            allocation[asset_types[asset_id]] += 1
+        
+        ends, pos = plan.pos_curve()
+        reached = np.flatnonzero(pos >= FLEET_COVERAGE_POS * float(density.H.sum()))
+        coverage_time = float(ends[reached[0]]) if reached.size else horizon_hours
+        return allocation, coverage_time, plan
+    
+    def critical_path_from_density(self, density: ProbabilityDensity, n_cells: int = 10) -> List[GridCell]:
+        """Critical path over a ProbabilityDensity: its nm cells, or quadtree leaves in 'quadtree' mode."""
+        if self.grid_mode == 'quadtree':
+            return self.critical_path_from_quadtree(density, self.split_mass, n_cells)
+        return self.critical_path_from_grid(density.H, density.lat_edges, density.lon_edges, n_cells,
+                                            size_nm=density.cell_nm)
+    
     def generate_critical_path(self, 
                                latitudes: np.ndarray, 
                                longitudes: np.ndarray,
-                               weights: np.ndarray,
-                               n_cells: int = 10) -> List[GridCell]:
+                               weights: Optional[np.ndarray] = None,
+                               n_cells: int = 10,
+                               moments: Optional[Tuple[float, float, np.ndarray]] = None) -> List[GridCell]:
         """
         Identifies high-probability grid cells for prioritized search.
         
         Strategy: Partition distribution into grid, rank by probability mass.
+        In 'nm'/'quadtree' mode, `moments` (from distribution_moments) saves
+        recomputing the cloud's mean and covariance.
         """
-        # Create 2D histogram (grid)
-        H, lat_edges, lon_edges = np.histogram2d(latitudes, longitudes, bins=20, weights=weights)
+        if self.grid_mode == 'bins':
+            # Create 2D histogram (grid)
+            H, lat_edges, lon_edges = self._histogram_grid(latitudes, longitudes, weights, bins=GRID_BINS)
+            return self.critical_path_from_grid(H, lat_edges, lon_edges, n_cells)
         
+        return self.critical_path_from_density(self.probability_density(latitudes, longitudes, weights, moments),
+                                               n_cells)
+    
+    @staticmethod
+    def top_indices(values: np.ndarray, n: int) -> np.ndarray:
+        """Indices of the n largest values, largest first, by partial selection."""
+        n = min(n, values.size)
+        if n <= 0:
+            return np.empty(0, dtype=np.intp)
+        top = np.argpartition(values, values.size - n)[values.size - n:]
+        return top[np.argsort(values[top])[::-1]]
+    
+    @classmethod
+    def critical_path_from_grid(cls,
+                                H: np.ndarray,
+                                lat_edges: np.ndarray,
+                                lon_edges: np.ndarray,
+                                n_cells: int = 10,
+                                size_nm: Optional[float] = None) -> List[GridCell]:
+        """Ranks the cells of a probability-mass grid into a critical path."""
         # Find top N cells by probability mass
-        flat_indices = np.argsort(H.ravel())[-n_cells:][::-1]
+        flat_indices = cls.top_indices(H.ravel(), n_cells)
         
         critical_path = []
         for idx in flat_indices:
             i, j = np.unravel_index(idx, H.shape)
             cell = GridCell(
-                center_lat=(lat_edges[i] + lat_edges[i+1]) / 2,
-                center_lon=(lon_edges[j] + lon_edges[j+1]) / 2,
-                probability_mass=H[i, j],
-                priority=len(critical_path) + 1
+                center_lat=float((lat_edges[i] + lat_edges[i+1]) / 2),
+                center_lon=float((lon_edges[j] + lon_edges[j+1]) / 2),
+                probability_mass=float(H[i, j]),
+                priority=len(critical_path) + 1,
+                size_nm=size_nm
             )
             critical_path.append(cell)
         
         return critical_path
     
-    def plan_mission(self, 
-                     latitudes: np.ndarray, 
-                     longitudes: np.ndarray,
-                     weights: np.ndarray) -> SearchRecommendation:
+    def probability_density(self,
+                            latitudes: np.ndarray,
+                            longitudes: np.ndarray,
+                            weights: Optional[np.ndarray] = None,
+                            moments: Optional[Tuple[float, float, np.ndarray]] = None) -> ProbabilityDensity:
+        """
+        Probability mass on square nautical-mile cells around the cloud's mean.
+        
+        The extent comes from the moments rather than min/max, so it costs
+        no extra pass over the particles and ignores outliers. In quadtree
+        mode the grid is square with a power-of-two side.
+        """
+        mean_lat, mean_lon, cov = moments if moments is not None else \
+            self.distribution_moments(latitudes, longitudes, weights)
+        geometry = self.density_geometry(mean_lat, mean_lon, cov)
+        padded = self.bin_padded(latitudes, longitudes, weights, geometry)
+        padded /= padded.sum()
+        H = padded[1:-1, 1:-1].copy()
+        
+        return ProbabilityDensity(
+            H=H,
+            lat_edges=geometry.lat_edges,
+            lon_edges=geometry.lon_edges,
+            cell_nm=geometry.cell_nm,
+            outside_mass=max(1.0 - float(H.sum()), 0.0)
+        )
+    
+    def density_geometry(self, mean_lat: float, mean_lon: float, cov: np.ndarray) -> DensityGeometry:
+        """probability_density's grid placement for a cloud with these moments."""
+        nm_per_deg_lon = NM_PER_DEG * math.cos(math.radians(mean_lat))
+        sd_lat_nm = math.sqrt(max(cov[0, 0], 0.0)) * NM_PER_DEG
+        sd_lon_nm = math.sqrt(max(cov[1, 1], 0.0)) * nm_per_deg_lon
+        
+        # 1. Cell size: requested, or a quarter of the minor-axis sd
+        cell_nm = self.cell_nm or max(min(sd_lat_nm, sd_lon_nm) / 4.0, MIN_CELL_NM)
+        half_lat_nm = max(self.extent_sigma * sd_lat_nm, cell_nm / 2)
+        half_lon_nm = max(self.extent_sigma * sd_lon_nm, cell_nm / 2)
+        
+        # 2. Grid shape within the per-axis cap
+        if self.grid_mode == 'quadtree':
+            side = 2 * max(half_lat_nm, half_lon_nm)
+            size = min(1 << max(math.ceil(math.log2(side / cell_nm)), 0), 1 << int(math.log2(self.max_cells)))
+            cell_nm = max(cell_nm, side / size)
+            rows = cols = size
+        else:
+            cell_nm = max(cell_nm, 2 * max(half_lat_nm, half_lon_nm) / self.max_cells)
+            rows = max(math.ceil(2 * half_lat_nm / cell_nm), 1)
+            cols = max(math.ceil(2 * half_lon_nm / cell_nm), 1)
+        lat_step = cell_nm / NM_PER_DEG
+        lon_step = cell_nm / nm_per_deg_lon
+        lat0 = mean_lat - rows * lat_step / 2
+        lon0 = mean_lon - cols * lon_step / 2
+        return DensityGeometry(lat0, lon0, lat_step, lon_step, rows, cols, cell_nm)
+    
+    @classmethod
+    def bin_padded(cls,
+                   latitudes: np.ndarray,
+                   longitudes: np.ndarray,
+                   weights: Optional[np.ndarray],
+                   geometry: DensityGeometry) -> np.ndarray:
+        """
+        Unnormalised mass on the grid padded by one ring, (rows + 2, cols + 2).
+        
+        Clipping sends particles outside the grid to the ring, so the
+        interior plus the ring always holds the whole cloud.
+        """
+        flat_idx = cls.padded_bin_index(latitudes, longitudes, geometry)
+        size = (geometry.rows + 2) * (geometry.cols + 2)
+        padded = np.bincount(flat_idx, weights=weights, minlength=size).astype(np.float64)
+        return padded.reshape(geometry.rows + 2, geometry.cols + 2)
+    
+    @staticmethod
+    def padded_bin_index(latitudes: np.ndarray,
+                         longitudes: np.ndarray,
+                         geometry: DensityGeometry) -> np.ndarray:
+        """
+        Flat cell index of every particle on bin_padded's (rows + 2, cols + 2) grid.
+        
+        The index only depends on positions, so callers that reweight a
+        fixed cloud can keep it.
+        """
+        rows, cols = geometry.rows, geometry.cols
+        scratch = np.subtract(latitudes, geometry.lat0 - geometry.lat_step, dtype=np.float64)
+        scratch *= 1.0 / geometry.lat_step
+        np.clip(scratch, 0, rows + 1, out=scratch)
+        flat_idx = scratch.astype(np.intp)
+        flat_idx *= cols + 2
+        np.subtract(longitudes, geometry.lon0 - geometry.lon_step, out=scratch, dtype=np.float64)
+        scratch *= 1.0 / geometry.lon_step
+        np.clip(scratch, 0, cols + 1, out=scratch)
+        np.add(flat_idx, scratch, out=flat_idx, casting='unsafe')
+        return flat_idx
+    
+    @staticmethod
+    def quadtree_leaves(H: np.ndarray, split_mass: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Adaptive cells over a square power-of-two grid.
+        
+        Starting from the whole grid, a quadrant is split into four while it
+        holds more than split_mass, down to single cells. Empty leaves are
+        dropped.
+        
+        Returns:
+            (row, col, level, mass) per leaf; a leaf at `level` spans
+            2**level base cells on a side starting at (row, col) * 2**level
+        """
+        # Mass pyramid: level k sums 2**k x 2**k base cells
+        pyramid = [H]
+        while pyramid[-1].shape[0] > 1:
+            half = pyramid[-1].shape[0] // 2
+            pyramid.append(pyramid[-1].reshape(half, 2, half, 2).sum(axis=(1, 3)))
+        
+        rows, cols, levels, masses = [], [], [], []
+        i = np.zeros(1, dtype=np.intp)
+        j = np.zeros(1, dtype=np.intp)
+        for level in range(len(pyramid) - 1, -1, -1):
+            mass = pyramid[level][i, j]
+            split = mass > split_mass if level > 0 else np.zeros(mass.shape, dtype=bool)
+            leaf = ~split & (mass > 0)
+            rows.append(i[leaf])
+            cols.append(j[leaf])
+            levels.append(np.full(int(leaf.sum()), level))
+            masses.append(mass[leaf])
+            # Children of split quadrants
+            i = (2 * i[split][:, None] + np.array([0, 0, 1, 1])).ravel()
+            j = (2 * j[split][:, None] + np.array([0, 1, 0, 1])).ravel()
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(levels), np.concatenate(masses)
+    
+    @classmethod
+    def critical_path_from_quadtree(cls,
+                                    density: ProbabilityDensity,
+                                    split_mass: float,
+                                    n_cells: int = 10) -> List[GridCell]:
+        """
+        Critical path over quadtree leaves, ranked by probability density.
+        
+        Leaves differ in area, so they are ordered by mass per unit area
+        (search effort scales with area); probability_mass is the leaf's.
+        """
+        rows, cols, levels, masses = cls.quadtree_leaves(density.H, split_mass)
+        span = np.left_shift(1, levels)
+        order = cls.top_indices(masses / (span * span), n_cells)
+        
+        lat_step = density.lat_edges[1] - density.lat_edges[0]
+        lon_step = density.lon_edges[1] - density.lon_edges[0]
+        critical_path = []
+        for idx in order:
+            critical_path.append(GridCell(
+                center_lat=float(density.lat_edges[0] + (rows[idx] + 0.5) * span[idx] * lat_step),
+                center_lon=float(density.lon_edges[0] + (cols[idx] + 0.5) * span[idx] * lon_step),
+                probability_mass=float(masses[idx]),
+                priority=len(critical_path) + 1,
+                size_nm=float(density.cell_nm * span[idx])
+            ))
+        return critical_path
+    
+    @staticmethod
+    def grid_bin_index(latitudes: np.ndarray,
+                       longitudes: np.ndarray,
+                       bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Flat cell index of every particle on a bins x bins grid over the cloud's bounding box.
+        
+        Same binning as np.histogram2d(..., bins=bins), but built with one
+        reusable float scratch and one flat index array instead of the
+        stacked (n, 2) copies histogramdd makes. The index only depends on
+        positions, so callers that reweight a fixed cloud can keep it.
+        
+        Returns:
+            (flat_idx, lat_edges, lon_edges)
+        """
+        def _bounds(values: np.ndarray) -> Tuple[float, float]:
+            lo, hi = float(values.min()), float(values.max())
+            return (lo - 0.5, hi + 0.5) if lo == hi else (lo, hi)
+        
+        lat_lo, lat_hi = _bounds(latitudes)
+        lon_lo, lon_hi = _bounds(longitudes)
+        
+        scratch = np.subtract(latitudes, lat_lo, dtype=np.float64)
+        scratch *= bins / (lat_hi - lat_lo)
+        np.clip(scratch, 0, bins - 1, out=scratch)
+        flat_idx = scratch.astype(np.intp)
+        flat_idx *= bins
+        np.subtract(longitudes, lon_lo, out=scratch, dtype=np.float64)
+        scratch *= bins / (lon_hi - lon_lo)
+        np.clip(scratch, 0, bins - 1, out=scratch)
+        np.add(flat_idx, scratch, out=flat_idx, casting='unsafe')
+        
+        return (flat_idx,
+                np.linspace(lat_lo, lat_hi, bins + 1),
+                np.linspace(lon_lo, lon_hi, bins + 1))
+    
+    def probability_grid(self,
+                         latitudes: np.ndarray,
+                         longitudes: np.ndarray,
+                         weights: Optional[np.ndarray] = None,
+                         bins: int = GRID_BINS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Probability mass per cell on a bins x bins grid: (H, lat_edges, lon_edges)."""
+        return self._histogram_grid(latitudes, longitudes, weights, bins)
+    
+    @classmethod
+    def _histogram_grid(cls,
+                        latitudes: np.ndarray,
+                        longitudes: np.ndarray,
+                        weights: Optional[np.ndarray],
+                        bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Probability-mass grid over the cloud's bounding box: (H, lat_edges, lon_edges)."""
+        flat_idx, lat_edges, lon_edges = cls.grid_bin_index(latitudes, longitudes, bins)
+        H = np.bincount(flat_idx, weights=weights, minlength=bins * bins).astype(np.float64)
+        if weights is None:
+            H /= latitudes.shape[0]  # Counts -> probability mass
+        return H.reshape(bins, bins), lat_edges, lon_edges
+    
+    def plan_mission(self,
+                     cloud: ParticleCloud,
+                     timer: Optional[StageTimer] = None,
+                     fleet: Optional[Sequence['SearchAsset']] = None,
+                     horizon_hours: float = DEFAULT_HORIZON_HOURS) -> SearchRecommendation:
         """
         Orchestrates complete SAR mission planning workflow.
         
-        Input: Monte Carlo particle cloud (lat, lon, weights)
+        Input: Monte Carlo particle cloud (lat, lon, optional weights)
         Output: Actionable deployment recommendation
+        
+        With a `fleet`, allocation and coverage time come from its search
+        schedule over the probability density (plan_fleet) instead of the
+        area-based estimate. A StageTimer, if given, records the time spent
+        in each stage.
         """
-        # 1. Analyze distribution geometry
-        geometry = self.analyze_distribution_geometry(latitudes, longitudes, weights)
+        latitudes, longitudes, weights = cloud.latitudes, cloud.longitudes, cloud.weights
+
+        # 1. Analyze distribution geometry (moments are reused by the grid)
+        with stage(timer, 'analyze_distribution_geometry'):
+            moments = self.distribution_moments(latitudes, longitudes, weights)
+            geometry = self.geometry_from_covariance(moments[2])
         
         # 2. Select optimal search pattern
-        pattern, rationale = self.recommend_search_pattern(geometry)
+        with stage(timer, 'recommend_search_pattern'):
+            pattern, rationale = self.recommend_search_pattern(geometry)
         
-        # 3. Allocate SAR assets
-        assets = self.allocate_assets(geometry['spread_km2'], pattern)
+        # 3. Allocate SAR assets and estimate coverage time
+        density, fleet_plan = None, None
+        with stage(timer, 'allocate_assets'):
+            if fleet:
+                density = self.probability_density(latitudes, longitudes, weights, moments)
+                assets, coverage_time, fleet_plan = self.plan_fleet(density, fleet, horizon_hours)
+            else:
+                assets, coverage_time = self.estimate_coverage(geometry, pattern)
+        
+        # 4. Generate prioritized search grid (from the fleet's density when there is one)
+        with stage(timer, 'generate_critical_path'):
+            if density is not None and self.grid_mode != 'bins':
+                critical_path = self.critical_path_from_density(density)
+            else:
+                critical_path = self.generate_critical_path(latitudes, longitudes, weights, moments=moments)
+        
+        return SearchRecommendation(
+            optimal_pattern=pattern,
+            rationale=rationale,
+            asset_allocation=assets,
+            critical_path=critical_path,
+            estimated_coverage_time_hours=coverage_time,
+            fleet_plan=fleet_plan
+        )
+    
+    def plan_from_density(self,
+                          moments: Tuple[float, float, np.ndarray],
+                          density: ProbabilityDensity,
+                          timer: Optional[StageTimer] = None,
+                          fleet: Optional[Sequence['SearchAsset']] = None,
+                          horizon_hours: float = DEFAULT_HORIZON_HOURS) -> SearchRecommendation:
+        """
+        plan_mission from summaries instead of the particles.
+        
+        `moments` are (mean_lat, mean_lon, cov) as distribution_moments
+        returns them and `density` the cloud's ProbabilityDensity, e.g. both
+        accumulated chunk by chunk (see streaming_stats). The critical path
+        comes from the density's nm cells (quadtree leaves in 'quadtree'
+        mode); 'bins' mode needs the bounding box and so falls back to them.
+        A `fleet` is planned over the density as in plan_mission.
+        """
+        # 1. Geometry from the covariance
+        with stage(timer, 'analyze_distribution_geometry'):
+            geometry = self.geometry_from_covariance(moments[2])
         
-        # 4. Generate prioritized search grid
-        critical_path = self.generate_critical_path(latitudes, longitudes, weights)
+        # 2. Pattern and 3. assets with coverage time, as in plan_mission
+        with stage(timer, 'recommend_search_pattern'):
+            pattern, rationale = self.recommend_search_pattern(geometry)
+        fleet_plan = None
+        with stage(timer, 'allocate_assets'):
+            if fleet:
+                assets, coverage_time, fleet_plan = self.plan_fleet(density, fleet, horizon_hours)
+            else:
+                assets, coverage_time = self.estimate_coverage(geometry, pattern)
         
-        # 5. Estimate coverage time (simplified model)
-        total_assets = sum(assets.values())
-        coverage_time = geometry['spread_km2'] / (total_assets * 50)  # Assuming 50 km²/h per asset
+        # 4. Critical path over the accumulated grid
+        with stage(timer, 'generate_critical_path'):
+            critical_path = self.critical_path_from_density(density)
         
         return SearchRecommendation(
             optimal_pattern=pattern,
             rationale=rationale,
             asset_allocation=assets,
             critical_path=critical_path,
-            estimated_coverage_time_hours=coverage_time
+            estimated_coverage_time_hours=coverage_time,
+            fleet_plan=fleet_plan
         )
+    
+    def analyze_distribution_geometry_batch(self,
+                                            latitudes: np.ndarray,
+                                            longitudes: np.ndarray,
+                                            weights: Optional[np.ndarray] = None) -> List[Dict[str, float]]:
+        """
+        Row-wise analyze_distribution_geometry for (n_requests, n_particles) clouds.
+        
+        Covariances for all rows are built with one set of reductions and
+        decomposed with a single stacked eigvalsh call.
+        """
+        if weights is None:
+            weights = np.full(latitudes.shape, 1.0 / latitudes.shape[1])
+        
+        # Weighted covariance, same normalisation as np.cov(..., aweights=w)
+        v1 = weights.sum(axis=1)
+        v2 = (weights * weights).sum(axis=1)
+        fact = v1 - v2 / v1
+        d_lat = latitudes - ((weights * latitudes).sum(axis=1) / v1)[:, None]
+        d_lon = longitudes - ((weights * longitudes).sum(axis=1) / v1)[:, None]
+        w_lat = weights * d_lat
+        cov = np.empty((latitudes.shape[0], 2, 2))
+        cov[:, 0, 0] = (w_lat * d_lat).sum(axis=1) / fact
+        cov[:, 0, 1] = cov[:, 1, 0] = (w_lat * d_lon).sum(axis=1) / fact
+        cov[:, 1, 1] = (weights * d_lon * d_lon).sum(axis=1) / fact
+        
+        eigenvalues = np.linalg.eigvalsh(cov)
+        aspect_ratio = np.sqrt(eigenvalues[:, 1] / eigenvalues[:, 0])
+        eccentricity = 1 - (eigenvalues[:, 0] / eigenvalues[:, 1])
+        spread_km2 = np.pi * 1.96 * np.sqrt(eigenvalues[:, 0]) * np.sqrt(eigenvalues[:, 1]) * (60 * 1.852)**2
+        
+        return [
+            {
+                'aspect_ratio': float(aspect_ratio[i]),
+                'eccentricity': float(eccentricity[i]),
+                'spread_km2': float(spread_km2[i])
+            }
+            for i in range(latitudes.shape[0])
+        ]
+    
+    def generate_critical_paths_batch(self,
+                                      latitudes: np.ndarray,
+                                      longitudes: np.ndarray,
+                                      weights: Optional[np.ndarray] = None,
+                                      n_cells: int = 10,
+                                      bins: int = GRID_BINS) -> List[List[GridCell]]:
+        """
+        Row-wise generate_critical_path using one flat bincount for all rows.
+        
+        Bin edges follow np.histogram2d: each row spans its own min/max.
+        """
+        n_rows, n_particles = latitudes.shape
+        if weights is None:
+            weights = np.full(latitudes.shape, 1.0 / n_particles)
+        
+        def _edges(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            lo = values.min(axis=1)
+            hi = values.max(axis=1)
+            flat = hi == lo
+            lo = np.where(flat, lo - 0.5, lo)
+            hi = np.where(flat, hi + 0.5, hi)
+            return lo, hi
+        
+        lat_lo, lat_hi = _edges(latitudes)
+        lon_lo, lon_hi = _edges(longitudes)
+        
+        def _bin_index(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+            idx = ((values - lo[:, None]) * (bins / (hi - lo))[:, None]).astype(np.intp)
+            np.clip(idx, 0, bins - 1, out=idx)
+            return idx
+        
+        flat_idx = _bin_index(latitudes, lat_lo, lat_hi) * bins + _bin_index(longitudes, lon_lo, lon_hi)
+        flat_idx += (np.arange(n_rows) * bins * bins)[:, None]
+        H = np.bincount(flat_idx.ravel(), weights=weights.ravel(), minlength=n_rows * bins * bins)
+        H = H.reshape(n_rows, bins * bins)
+        
+        # Partial selection per row, then order only the selected cells
+        k = min(n_cells, H.shape[1])
+        top = np.argpartition(H, H.shape[1] - k, axis=1)[:, H.shape[1] - k:]
+        top = np.take_along_axis(top, np.argsort(np.take_along_axis(H, top, axis=1), axis=1)[:, ::-1], axis=1)
+        lat_step = (lat_hi - lat_lo) / bins
+        lon_step = (lon_hi - lon_lo) / bins
+        
+        paths = []
+        for r in range(n_rows):
+            path = []
+            for idx in top[r]:
+                i, j = divmod(int(idx), bins)
+                path.append(GridCell(
+                    center_lat=float(lat_lo[r] + (i + 0.5) * lat_step[r]),
+                    center_lon=float(lon_lo[r] + (j + 0.5) * lon_step[r]),
+                    probability_mass=float(H[r, idx]),
+                    priority=len(path) + 1
+                ))
+            paths.append(path)
+        return paths
+    
+    def plan_missions_batch(self,
+                            latitudes: np.ndarray,
+                            longitudes: np.ndarray,
+                            weights: Optional[np.ndarray] = None) -> List[SearchRecommendation]:
+        """
+        Plans many missions at once from (n_requests, n_particles) clouds.
+        
+        The array-heavy stages (geometry, gridding) are vectorised across
+        requests; only the small decision tables run per request.
+        """
+        geometries = self.analyze_distribution_geometry_batch(latitudes, longitudes, weights)
+        critical_paths = self.generate_critical_paths_batch(latitudes, longitudes, weights)
+        
+        recommendations = []
+        for geometry, critical_path in zip(geometries, critical_paths):
+            pattern, rationale = self.recommend_search_pattern(geometry)
+            assets, coverage_time = self.estimate_coverage(geometry, pattern)
+            recommendations.append(SearchRecommendation(
+                optimal_pattern=pattern,
+                rationale=rationale,
+                asset_allocation=assets,
+                critical_path=critical_path,
+                estimated_coverage_time_hours=coverage_time
+            ))
+        return recommendations
@@ -0,0 +1,285 @@
+"""
+Bayesian updating of the live particle cloud after unsuccessful searches.
+
+An area searched without a find lowers the probability that the target is
+there by the asset's probability of detection (POD). Particles inside the
+searched cells or swept tracks are reweighted by (1 - POD) in place; when the
+weights degenerate, the cloud is systematically resampled. The critical path
+is then regenerated from the updated cloud, without re-running drift from
+the LKP.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from drift_engine import RandomSource
+from mission_planner import GRID_BINS, AssetType, GridCell, MissionPlanner, ProbabilityDensity
+from particle_cloud import ParticleCloud
+
+MAX_TRACK_BUCKETS = 256  # Per axis of a track's candidate grid: ids fit uint16, which sorts by radix
+
+
+@dataclass
+class SearchedCell:
+    """Rectangular search area (degrees)."""
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+
+
+@dataclass
+class SearchTrack:
+    """Asset track as a polyline of (lat, lon) fixes swept to sweep_width_nm."""
+    points: Sequence[Tuple[float, float]]
+    sweep_width_nm: float
+
+
+@dataclass
+class SearchEffort:
+    """
+    One completed, unsuccessful search.
+
+    coverage is the IAMSAR coverage factor of the effort (1.0 = the nominal
+    coverage at which the asset achieves its tabulated POD).
+    """
+    asset_type: AssetType
+    cells: List[SearchedCell] = field(default_factory=list)
+    tracks: List[SearchTrack] = field(default_factory=list)
+    coverage: float = 1.0
+
+
+@dataclass
+class SearchUpdateResult:
+    """Outcome of a negative-search update."""
+    pod: float  # Probability of detection applied per look
+    pos: float  # Probability mass removed (probability of success of the search)
+    particles_searched: int
+    effective_sample_size: float
+    resampled: bool
+    critical_path: List[GridCell]
+
+
+class _GridState:
+    """Critical-path grid cached for one cloud between updates."""
+    __slots__ = ('cloud', 'flat_idx', 'H', 'lat_edges', 'lon_edges', 'geometry')
+
+
+class NegativeSearchUpdater:
+    """
+    Particle-filter update engine for negative search results.
+    
+    The critical path is ranked on the planner's own grid: the
+    probability_density cells (density_geometry, from the cloud's weighted
+    moments) in 'nm' and 'quadtree' mode, the bounding-box bins in 'bins'
+    mode. A cell the planner emitted for the cloud is therefore a cell of
+    this grid. Positions do not move during an update, so each particle's
+    grid cell is computed once per cloud and the probability grid is then
+    adjusted by the mass removed from searched particles only. The cache is
+    rebuilt after resampling, or when a different cloud is passed in; call
+    reset() if the cloud is modified elsewhere between updates.
+    
+    Args:
+        planner: Supplies pod_coefficients and the grid, and ranks the critical path
+        resample_threshold: Resample when ESS < threshold * n_particles
+        rng: Seed or Generator for the systematic-resampling offset
+    """
+    
+    def __init__(self,
+                 planner: MissionPlanner,
+                 resample_threshold: float = 0.5,
+                 rng: RandomSource = None):
+        self.planner = planner
+        self.resample_threshold = resample_threshold
+        self.rng = np.random.default_rng(rng)
+        self._grid: Optional[_GridState] = None
+    
+    def reset(self) -> None:
+        """Drops the cached grid (use after modifying the cloud externally)."""
+        self._grid = None
+    
+    def detection_probability(self, asset_type: AssetType, coverage: float) -> float:
+        """POD for a coverage factor, from the asset's tabulated POD at coverage 1."""
+        nominal = self.planner.pod_coefficients[asset_type]
+        # Exponential detection law: POD(C) = 1 - exp(-k C), k fitted to POD(1)
+        return 1.0 - (1.0 - nominal) ** max(coverage, 0.0)
+    
+    def count_looks(self, cloud: ParticleCloud, effort: SearchEffort) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Indices of particles inside the searched area and how often each was covered.
+        
+        Each cell and each track is one look: overlapping cells or separate
+        tracks over a particle count independently, but a track covers a
+        particle at most once however many fixes it has.
+        """
+        lats, lons = cloud.latitudes, cloud.longitudes
+        looks = np.zeros(cloud.n_particles, dtype=np.uint16)
+        inside = np.empty(cloud.n_particles, dtype=bool)
+        scratch = np.empty(cloud.n_particles, dtype=bool)
+        
+        for cell in effort.cells:
+            _box_mask(lats, lons, cell.lat_min, cell.lat_max, cell.lon_min, cell.lon_max, inside, scratch)
+            looks += inside
+        
+        for track in effort.tracks:
+            hits = _near_track(lats, lons, track, inside, scratch)
+            looks[hits] += 1
+        
+        # nonzero on a bool view is several times faster than on uint16
+        indices = np.flatnonzero(looks != 0)
+        return indices, looks[indices]
+    
+    def _grid_for(self, cloud: ParticleCloud) -> _GridState:
+        if self._grid is None or self._grid.cloud is not cloud:
+            state = _GridState()
+            state.cloud = cloud
+            if self.planner.grid_mode == 'bins':
+                state.geometry = None
+                state.flat_idx, state.lat_edges, state.lon_edges = self.planner.grid_bin_index(
+                    cloud.latitudes, cloud.longitudes, GRID_BINS
+                )
+                size = GRID_BINS * GRID_BINS
+            else:
+                # Padded like bin_padded, so mass outside the grid stays accounted for
+                moments = self.planner.distribution_moments(cloud.latitudes, cloud.longitudes, cloud.weights)
+                state.geometry = self.planner.density_geometry(*moments)
+                state.flat_idx = self.planner.padded_bin_index(cloud.latitudes, cloud.longitudes, state.geometry)
+                state.lat_edges, state.lon_edges = state.geometry.lat_edges, state.geometry.lon_edges
+                size = (state.geometry.rows + 2) * (state.geometry.cols + 2)
+            state.H = np.bincount(state.flat_idx, weights=cloud.weights, minlength=size).astype(np.float64)
+            if cloud.is_uniform:
+                state.H /= cloud.n_particles
+            self._grid = state
+        return self._grid
+    
+    def _critical_path(self, grid: _GridState, n_cells: int) -> List[GridCell]:
+        """The planner's critical path over the cached grid."""
+        geometry = grid.geometry
+        if geometry is None:
+            return self.planner.critical_path_from_grid(
+                grid.H.reshape(GRID_BINS, GRID_BINS), grid.lat_edges, grid.lon_edges, n_cells
+            )
+        H = grid.H.reshape(geometry.rows + 2, geometry.cols + 2)[1:-1, 1:-1]
+        density = ProbabilityDensity(H=H, lat_edges=grid.lat_edges, lon_edges=grid.lon_edges,
+                                     cell_nm=geometry.cell_nm, outside_mass=max(1.0 - float(H.sum()), 0.0))
+        return self.planner.critical_path_from_density(density, n_cells)
+    
+    def apply(self,
+              cloud: ParticleCloud,
+              effort: SearchEffort,
+              n_cells: int = 10) -> SearchUpdateResult:
+        """Reweights `cloud` in place by (1 - POD)^looks and refreshes the critical path."""
+        pod = self.detection_probability(effort.asset_type, effort.coverage)
+        grid = self._grid_for(cloud)
+        indices, looks = self.count_looks(cloud, effort)
+        
+        pos = 0.0
+        if indices.size:
+            # (1 - POD)^looks via a small lookup table
+            likelihood = np.power(1.0 - pod, np.arange(int(looks.max()) + 1))[looks]
+            prior = cloud.normalized_weights()[indices] if cloud.is_uniform else cloud.weights[indices]
+            pos = cloud.update_weights(indices, likelihood)
+            # Grid update touches only the searched particles
+            removed = prior * (1.0 - likelihood)
+            grid.H -= np.bincount(grid.flat_idx[indices], weights=removed, minlength=grid.H.size)
+            grid.H /= 1.0 - pos
+        
+        resampled = False
+        ess = cloud.effective_sample_size()
+        if ess < self.resample_threshold * cloud.n_particles:
+            cloud.resample_systematic(self.rng)
+            resampled = True
+            ess = cloud.effective_sample_size()
+            self.reset()
+            grid = self._grid_for(cloud)
+        
+        critical_path = self._critical_path(grid, n_cells)
+        return SearchUpdateResult(
+            pod=pod,
+            pos=pos,
+            particles_searched=int(indices.size),
+            effective_sample_size=ess,
+            resampled=resampled,
+            critical_path=critical_path
+        )
+
+
+def _box_mask(lats: np.ndarray, lons: np.ndarray,
+              lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+              out: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """Boolean mask of particles inside a lat/lon box, built in preallocated buffers."""
+    np.greater_equal(lats, lat_min, out=out)
+    np.less_equal(lats, lat_max, out=scratch)
+    out &= scratch
+    np.greater_equal(lons, lon_min, out=scratch)
+    out &= scratch
+    np.less_equal(lons, lon_max, out=scratch)
+    out &= scratch
+    return out
+
+
+def _near_track(lats: np.ndarray, lons: np.ndarray, track: SearchTrack,
+                mask: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """Indices of particles within half the sweep width of any segment of the track (local flat-earth nm)."""
+    points = np.asarray(track.points, dtype=np.float64).reshape(-1, 2)
+    if points.shape[0] < 2:
+        return np.empty(0, dtype=np.intp)
+    half_width_nm = track.sweep_width_nm / 2.0
+    pad_lat = half_width_nm / 60.0
+    # One box around the whole track; the widest longitude pad is at its highest latitude
+    lat_min, lon_min = points.min(axis=0)
+    lat_max, lon_max = points.max(axis=0)
+    lon_nm = 60.0 * math.cos(math.radians(min(max(abs(lat_min), abs(lat_max)) + pad_lat, 90.0)))
+    pad_lon = half_width_nm / max(lon_nm, 1e-9)
+    _box_mask(lats, lons, lat_min - pad_lat, lat_max + pad_lat, lon_min - pad_lon, lon_max + pad_lon,
+              mask, scratch)
+    candidates = np.flatnonzero(mask)
+    if candidates.size == 0 or points.shape[0] == 2:
+        (lat_a, lon_a), (lat_b, lon_b) = points[0], points[-1]
+        return candidates[_near_segment(lats[candidates], lons[candidates], lat_a, lon_a, lat_b, lon_b, half_width_nm)]
+    
+    # Bucket the candidates on a grid about one swath wide, sorted so every row of buckets
+    # is contiguous: a segment then reads only the few row slices around it
+    origin = (lat_min - pad_lat, lon_min - pad_lon)
+    spans = (lat_max - lat_min + 2 * pad_lat, lon_max - lon_min + 2 * pad_lon)
+    shape = [min(max(int(span / (2 * pad)), 1), MAX_TRACK_BUCKETS) if pad > 0 else 1
+             for span, pad in zip(spans, (pad_lat, pad_lon))]
+    sizes = [span / n if span > 0 else 1.0 for span, n in zip(spans, shape)]
+    
+    def bucket(value, axis):
+        return np.clip((value - origin[axis]) / sizes[axis], 0, shape[axis] - 1).astype(np.uint16)
+    
+    cand_lats, cand_lons = lats[candidates], lons[candidates]
+    ids = bucket(cand_lats, 0) * np.uint16(shape[1]) + bucket(cand_lons, 1)
+    order = np.argsort(ids, kind='stable')
+    candidates, cand_lats, cand_lons = candidates[order], cand_lats[order], cand_lons[order]
+    starts = np.concatenate([[0], np.cumsum(np.bincount(ids, minlength=shape[0] * shape[1]))])
+    near = np.zeros(candidates.size, dtype=bool)
+    for a, b in zip(points[:-1], points[1:]):
+        row_first, row_last = bucket(np.array([min(a[0], b[0]) - pad_lat, max(a[0], b[0]) + pad_lat]), 0).tolist()
+        col_first, col_last = bucket(np.array([min(a[1], b[1]) - pad_lon, max(a[1], b[1]) + pad_lon]), 1).tolist()
+        for row in range(row_first, row_last + 1):
+            band = slice(starts[row * shape[1] + col_first], starts[row * shape[1] + col_last + 1])
+            near[band] |= _near_segment(cand_lats[band], cand_lons[band], a[0], a[1], b[0], b[1], half_width_nm)
+    return candidates[near]
+
+
+def _near_segment(lats: np.ndarray, lons: np.ndarray,
+                  lat_a: float, lon_a: float, lat_b: float, lon_b: float,
+                  half_width_nm: float) -> np.ndarray:
+    """Mask of particles within half_width_nm of segment A-B (local flat-earth nm)."""
+    lon_nm = 60.0 * math.cos(math.radians((lat_a + lat_b) / 2.0))
+    # Project onto the segment in nm relative to A
+    px = (lons - lon_a) * lon_nm
+    py = (lats - lat_a) * 60.0
+    sx = (lon_b - lon_a) * lon_nm
+    sy = (lat_b - lat_a) * 60.0
+    length_sq = sx * sx + sy * sy
+    if length_sq > 0:
+        t = np.clip((px * sx + py * sy) / length_sq, 0.0, 1.0)
+        px -= t * sx
+        py -= t * sy
+    return px * px + py * py <= half_width_nm * half_width_nm
@@ -0,0 +1,151 @@
+"""
+Compact struct-of-arrays container for Monte Carlo particle clouds.
+
+Replaces the pandas DataFrame hand-off between the drift engine, the search
+statistics and the mission planner. Weights stay implicit (uniform) until a
+Bayesian update actually reweights the cloud, so the common case carries no
+weight column at all.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class ParticleCloud:
+    """
+    Particle positions (degrees) with optional per-particle probability weights.
+
+    weights is None while the cloud is uniformly weighted; once set it holds
+    normalised probability mass per particle (sums to 1).
+    """
+
+    __slots__ = ('latitudes', 'longitudes', '_weights')
+
+    def __init__(self,
+                 latitudes: np.ndarray,
+                 longitudes: np.ndarray,
+                 weights: Optional[np.ndarray] = None):
+        if latitudes.shape != longitudes.shape or latitudes.ndim != 1:
+            raise ValueError("latitudes and longitudes must be 1-D arrays of equal length")
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self._weights = None
+        if weights is not None:
+            self.set_weights(weights)
+
+    def __len__(self) -> int:
+        return self.latitudes.shape[0]
+
+    def __repr__(self) -> str:
+        return (f"ParticleCloud(n={len(self)}, dtype={self.dtype}, "
+                f"uniform={self.is_uniform}, nbytes={self.nbytes})")
+
+    @property
+    def n_particles(self) -> int:
+        return self.latitudes.shape[0]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.latitudes.dtype
+
+    @property
+    def weights(self) -> Optional[np.ndarray]:
+        """Normalised weights, or None for an implicitly uniform cloud."""
+        return self._weights
+
+    @property
+    def is_uniform(self) -> bool:
+        return self._weights is None
+
+    @property
+    def nbytes(self) -> int:
+        total = self.latitudes.nbytes + self.longitudes.nbytes
+        if self._weights is not None:
+            total += self._weights.nbytes
+        return total
+
+    def set_weights(self, weights: np.ndarray) -> None:
+        """Installs explicit weights, normalised to unit total mass."""
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != self.latitudes.shape:
+            raise ValueError("weights must match the particle count")
+        total = weights.sum()
+        if not total > 0:
+            raise ValueError("weights must have positive total mass")
+        self._weights = weights / total
+
+    def normalized_weights(self) -> np.ndarray:
+        """Explicit weight array (materialised as 1/n for uniform clouds)."""
+        if self._weights is None:
+            return np.full(self.n_particles, 1.0 / self.n_particles)
+        return self._weights
+
+    def effective_sample_size(self) -> float:
+        """Kish effective sample size, 1 / sum(w^2); equals n for a uniform cloud."""
+        if self._weights is None:
+            return float(self.n_particles)
+        return 1.0 / float(np.dot(self._weights, self._weights))
+
+    def update_weights(self, indices: np.ndarray, likelihood) -> float:
+        """
+        In-place Bayesian update of a subset of particles.
+
+        Multiplies the weights at `indices` by `likelihood` (scalar or array)
+        and renormalises. Returns the probability mass removed, i.e. the
+        posterior-normalising loss (for a negative search, its POS).
+        """
+        if self._weights is None:
+            self._weights = np.full(self.n_particles, 1.0 / self.n_particles)
+        weights = self._weights
+        selected = weights[indices]
+        prior = float(selected.sum())
+        selected *= likelihood
+        weights[indices] = selected
+        remaining = 1.0 - prior + float(selected.sum())
+        if not remaining > 0:
+            raise ValueError("update would remove all probability mass")
+        weights /= remaining
+        return 1.0 - remaining
+
+    def resample_systematic(self, rng: np.random.Generator) -> None:
+        """
+        Systematic resampling in place: n equally spaced draws on the weight CDF.
+
+        Positions are replaced by the resampled ones and weights return to
+        implicit-uniform.
+        """
+        if self._weights is None:
+            return
+        n = self.n_particles
+        cdf = np.cumsum(self._weights)
+        cdf[-1] = 1.0
+        positions = (rng.random() + np.arange(n)) / n
+        idx = np.searchsorted(cdf, positions, side='right')
+        np.take(self.latitudes, idx, out=self.latitudes)
+        np.take(self.longitudes, idx, out=self.longitudes)
+        self._weights = None
+
+    def astype(self, dtype) -> "ParticleCloud":
+        """Copy of the cloud with positions cast to dtype (weights stay float64)."""
+        cloud = ParticleCloud(self.latitudes.astype(dtype), self.longitudes.astype(dtype))
+        cloud._weights = None if self._weights is None else self._weights.copy()
+        return cloud
+
+    def to_dataframe(self):
+        """Optional pandas export: latitude/longitude/weight columns."""
+        import pandas as pd
+        return pd.DataFrame({
+            'latitude': self.latitudes,
+            'longitude': self.longitudes,
+            'weight': self.normalized_weights()
+        })
+
+    @classmethod
+    def from_dataframe(cls, df) -> "ParticleCloud":
+        """Builds a cloud from a DataFrame with latitude/longitude[/weight] columns."""
+        weights = df['weight'].to_numpy() if 'weight' in df else None
+        cloud = cls(df['latitude'].to_numpy(), df['longitude'].to_numpy())
+        if weights is not None and not np.allclose(weights, weights[0]):
+            cloud.set_weights(weights)
+        return cloud
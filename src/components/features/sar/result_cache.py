@@ -0,0 +1,128 @@
+"""
+In-process LRU + TTL cache for deterministic (seeded) SAR results.
+
+A seeded simulation is a pure function of its inputs, so identical requests
+from dashboard refreshes can be served from memory instead of re-running the
+Monte Carlo engine. Keys are built from quantised request parameters so that
+float noise in client payloads does not defeat the cache.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Quantisation step per request field; anything unlisted uses DEFAULT_RESOLUTION
+FIELD_RESOLUTION: Dict[str, float] = {
+    'lkp': 1e-5,        # degrees (~1 m)
+    'speed': 1e-3,      # knots
+    'direction': 1e-2,  # degrees
+    'hours': 1e-4,      # hours
+}
+DEFAULT_RESOLUTION = 1e-6
+
+
+def _quantize(value: Any, resolution: float) -> Any:
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return int(round(float(value) / resolution))
+    if isinstance(value, dict):
+        return tuple(sorted(
+            (k, _quantize(v, FIELD_RESOLUTION.get(k, resolution))) for k, v in value.items()
+        ))
+    if isinstance(value, (list, tuple)):
+        return tuple(_quantize(v, resolution) for v in value)
+    return value
+
+
+def make_cache_key(kind: str, params: Dict[str, Any], seed: Optional[int]) -> Tuple:
+    """Builds a hashable key from an endpoint kind, quantised params and the seed."""
+    return (kind, seed, _quantize(params, DEFAULT_RESOLUTION))
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size_bytes: int
+    expires_at: float
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by total bytes, with per-entry TTL.
+
+    Entry size is estimated from the pickled payload, which is accurate for
+    the small response dicts stored here and cheap next to a simulation.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, size_bytes: Optional[int] = None) -> None:
+        if size_bytes is None:
+            size_bytes = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size_bytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size_bytes, time.monotonic() + self.ttl_seconds)
+            self._bytes += size_bytes
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, kind: Optional[str] = None) -> int:
+        """Drops every entry (or only those of one endpoint kind). Returns the count."""
+        with self._lock:
+            if kind is None:
+                keys = list(self._entries)
+            else:
+                keys = [k for k in self._entries if isinstance(k, tuple) and k and k[0] == kind]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
@@ -6,7 +6,11 @@ the Bayesian SAR Orchestrator's capacity to handle diverse maritime emergencies.
 """
 
 from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+# A deployed sea anchor (drogue) roughly halves a survival craft's leeway and
+# its craft-to-craft spread (Allen & Plourde 1999 leeway tables)
+SEA_ANCHOR_LEEWAY_FACTOR = 0.5
 
 @dataclass
 class EnvironmentalConditions:
@@ -23,9 +27,29 @@ class EnvironmentalConditions:
 class CraftCharacteristics:
     """Maritime survival craft specifications."""
     craft_type: str  # 'life_raft_6', 'open_lifeboat', 'debris'
-    leeway_slope: float  # Percentage of wind speed
+    leeway_slope: float  # Fraction of wind speed, without sea anchor
     leeway_offset: float  # Baseline drift (knots)
     sea_anchor_deployed: bool
+    leeway_slope_sd: float = 0.0  # Craft-to-craft spread of the slope, without sea anchor
+    leeway_offset_sd: float = 0.0  # Craft-to-craft spread of the offset (knots)
+    
+    def leeway_params(self) -> Dict[str, float]:
+        """Leeway model in the drift engine's `leeway` format, sea anchor applied."""
+        factor = SEA_ANCHOR_LEEWAY_FACTOR if self.sea_anchor_deployed else 1.0
+        return {
+            'slope': self.leeway_slope * factor,
+            'offset': self.leeway_offset,
+            'slope_sd': self.leeway_slope_sd * factor,
+            'offset_sd': self.leeway_offset_sd
+        }
+
+@dataclass
+class LKPReport:
+    """One reported position of the distressed craft."""
+    lat: float
+    lon: float
+    uncertainty_nm: float  # 1-sigma position error
+    weight: float = 1.0  # Relative credibility of the report
 
 @dataclass
 class SARScenario:
@@ -39,6 +63,25 @@ class SARScenario:
     craft: CraftCharacteristics
     hours_elapsed: float
     objective: str
+    lkp_reports: List[LKPReport] = field(default_factory=list)  # Conflicting reports, if any
+    
+    def drift_params(self) -> Dict:
+        """Drift engine keyword arguments for this scenario (without the seed)."""
+        params = {
+            "lkp": self.lkp,
+            "wind": {'speed': self.environment.wind_speed, 'direction': self.environment.wind_direction},
+            "current": {'speed': self.environment.current_speed, 'direction': self.environment.current_direction},
+            "hours": self.hours_elapsed,
+            "leeway": self.craft.leeway_params()
+        }
+        if self.lkp_reports:
+            params["lkp_reports"] = [
+                {'lat': r.lat, 'lon': r.lon, 'uncertainty_nm': r.uncertainty_nm, 'weight': r.weight}
+                for r in self.lkp_reports
+            ]
+        else:
+            params["lkp_uncertainty_nm"] = self.lkp_uncertainty_nm
+        return params
     
 class ScenarioLibrary:
     """Repository of predefined high-fidelity SAR scenarios."""
@@ -69,9 +112,11 @@ class ScenarioLibrary:
             ),
             craft=CraftCharacteristics(
                 craft_type='life_raft_6',
-                leeway_slope=0.035,  # 3.5% of wind speed
+                leeway_slope=0.07,  # Halved to 3.5% by the sea anchor
                 leeway_offset=0.03,
-                sea_anchor_deployed=True
+                sea_anchor_deployed=True,
+                leeway_slope_sd=0.008,
+                leeway_offset_sd=0.01
             ),
             hours_elapsed=4.0,
             objective="Minimize search window through high-confidence grid prioritization"
@@ -105,10 +150,17 @@ class ScenarioLibrary:
                 craft_type='open_lifeboat',
                 leeway_slope=0.025,
                 leeway_offset=0.02,
-                sea_anchor_deployed=False
+                sea_anchor_deployed=False,
+                leeway_slope_sd=0.005,
+                leeway_offset_sd=0.01
             ),
             hours_elapsed=6.0,
-            objective="Disambiguate LKP via probability mass concentration analysis"
+            objective="Disambiguate LKP via probability mass concentration analysis",
+            lkp_reports=[
+                LKPReport(lat=38.45, lon=15.20, uncertainty_nm=2.0, weight=0.5),  # Ferry radar contact
+                LKPReport(lat=38.52, lon=15.31, uncertainty_nm=3.0, weight=0.3),  # Fishing vessel sighting
+                LKPReport(lat=38.39, lon=15.11, uncertainty_nm=4.0, weight=0.2)   # Relayed VHF position
+            ]
         )
     
     @staticmethod
@@ -137,9 +189,11 @@ class ScenarioLibrary:
             ),
             craft=CraftCharacteristics(
                 craft_type='life_raft_6',
-                leeway_slope=0.02,  # Reduced due to sea anchor
+                leeway_slope=0.04,  # Halved to 2% by the sea anchor
                 leeway_offset=0.015,
-                sea_anchor_deployed=True
+                sea_anchor_deployed=True,
+                leeway_slope_sd=0.006,
+                leeway_offset_sd=0.008
             ),
             hours_elapsed=8.0,
             objective="Long-duration probabilistic drift with hydrodynamic damping"
@@ -0,0 +1,381 @@
+"""
+Parameter sweeps over the ScenarioLibrary for sensitivity studies.
+
+Every scenario is expanded over the Cartesian product of a parameter grid
+(wind, current, hours elapsed, craft leeway, LKP uncertainty), and the
+cases run in chunks on a process pool, simulated and planned exactly like
+/simulate/scenario. Each finished chunk is written to the output
+directory as one columnar part file:
+
+    <out>/sweep.json          manifest: grid, scenarios, seed, particles, ...
+    <out>/part-000000.npz     one file per chunk, one array per column
+    <out>/part-000001.npz     (or .parquet when pyarrow is installed)
+
+Parts are written to a temporary name and renamed, so a part on disk is
+always complete. Resuming re-reads the manifest and only runs the chunks
+whose part is missing. Case k draws from SeedSequence(seed,
+spawn_key=(k,)), so its result is the same whichever run or worker
+produces it.
+
+Usage:
+    python scenario_sweep.py OUT --grid wind_speed=20,35,50 --grid hours=2:24:2
+        [--scenarios NORTH_SEA_001,...] [--particles 10000] [--seed 0]
+        [--workers N] [--chunk-size 32] [--format auto|npz|parquet] [--resume]
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from drift_engine import BayesianDriftEngine
+from mission_planner import MissionPlanner
+from scenario_library import SARScenario, ScenarioLibrary
+
+MANIFEST = "sweep.json"
+
+# Sweepable parameters and how each one is applied to the drift params
+SWEEP_PARAMETERS = (
+    'wind_speed', 'wind_direction', 'current_speed', 'current_direction',
+    'hours', 'leeway_slope', 'leeway_offset', 'lkp_uncertainty_nm'
+)
+RESULT_COLUMNS = (
+    'mean_lat', 'mean_lon', 'std_dev_nm', 'confidence_radius_95',
+    'spread_km2', 'eccentricity', 'estimated_coverage_hours', 'elapsed_s'
+)
+
+
+@dataclass
+class SweepCase:
+    """One scenario with one combination of swept parameter values."""
+    case_id: int
+    scenario_id: str
+    values: Dict[str, float]
+
+
+def expand_sweep(scenarios: Sequence[SARScenario], grid: Dict[str, Sequence[float]]) -> List[SweepCase]:
+    """Cases for every scenario x grid combination, numbered in a stable order."""
+    unknown = set(grid) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    if 'lkp_uncertainty_nm' in grid:
+        for scenario in scenarios:
+            if scenario.lkp_reports and scenario.lkp_uncertainty_nm <= 0:
+                raise ValueError(f"{scenario.scenario_id} has LKP reports but no lkp_uncertainty_nm to scale them by")
+    names = list(grid)
+    cases = []
+    for scenario in scenarios:
+        for combo in itertools.product(*(grid[name] for name in names)):
+            cases.append(SweepCase(len(cases), scenario.scenario_id, dict(zip(names, map(float, combo)))))
+    return cases
+
+
+def case_drift_params(scenario: SARScenario, values: Dict[str, float]) -> Dict:
+    """The scenario's drift params with the swept values applied."""
+    # Leeway is swept on the craft, so a deployed sea anchor still applies
+    craft = {name: value for name, value in values.items() if name in ('leeway_slope', 'leeway_offset')}
+    if craft:
+        scenario = replace(scenario, craft=replace(scenario.craft, **craft))
+    params = scenario.drift_params()
+    params["wind"] = dict(params["wind"])
+    params["current"] = dict(params["current"])
+    for name, value in values.items():
+        if name in ('wind_speed', 'wind_direction'):
+            params["wind"][name.split('_')[1]] = value
+        elif name in ('current_speed', 'current_direction'):
+            params["current"][name.split('_')[1]] = value
+        elif name in craft:
+            continue
+        elif name == 'lkp_uncertainty_nm':
+            if "lkp_reports" in params:
+                # Multi-report scenarios scale every report's uncertainty by the
+                # swept value over the scenario's own, keeping their relative sizes
+                scale = value / scenario.lkp_uncertainty_nm
+                params["lkp_reports"] = [{**report, 'uncertainty_nm': report['uncertainty_nm'] * scale}
+                                         for report in params["lkp_reports"]]
+            else:
+                params["lkp_uncertainty_nm"] = value
+        else:
+            params[name] = value
+    return params
+
+
+# Per-process engine/planner, built on first use
+_engine: Optional[BayesianDriftEngine] = None
+_planner: Optional[MissionPlanner] = None
+
+
+def run_chunk(cases: List[SweepCase], particles: int, seed: int) -> Dict[str, np.ndarray]:
+    """Simulates and plans a chunk of cases; returns its result columns."""
+    global _engine, _planner
+    if _engine is None or _engine.iterations != particles:
+        _engine = BayesianDriftEngine(iterations=particles)
+        _planner = MissionPlanner.from_env()
+    scenarios = {s.scenario_id: s for s in ScenarioLibrary.get_all_scenarios()}
+
+    results = {name: np.empty(len(cases)) for name in RESULT_COLUMNS}
+    patterns = []
+    for row, case in enumerate(cases):
+        start = time.perf_counter()
+        params = case_drift_params(scenarios[case.scenario_id], case.values)
+        rng = np.random.SeedSequence(seed, spawn_key=(case.case_id,))
+        cloud = _engine.calculate_drift(**params, rng=rng)
+        stats = _engine.get_search_area_stats(cloud)
+        moments = _planner.distribution_moments(cloud.latitudes, cloud.longitudes, cloud.weights)
+        geometry = _planner.geometry_from_covariance(moments[2])
+        pattern, _ = _planner.recommend_search_pattern(geometry)
+        _, coverage_time = _planner.estimate_coverage(geometry, pattern)
+        for name in ('mean_lat', 'mean_lon', 'std_dev_nm', 'confidence_radius_95'):
+            results[name][row] = stats[name]
+        results['spread_km2'][row] = geometry['spread_km2']
+        results['eccentricity'][row] = geometry['eccentricity']
+        results['estimated_coverage_hours'][row] = coverage_time
+        results['elapsed_s'][row] = time.perf_counter() - start
+        patterns.append(pattern)
+
+    columns = {
+        'case_id': np.array([case.case_id for case in cases], dtype=np.int64),
+        'scenario_id': np.array([case.scenario_id for case in cases]),
+    }
+    for name in (cases[0].values if cases else ()):
+        columns[name] = np.array([case.values[name] for case in cases])
+    columns.update(results)
+    columns['optimal_pattern'] = np.array(patterns)
+    return columns
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _write_part(out_dir: Path, index: int, columns: Dict[str, np.ndarray], fmt: str) -> None:
+    final = out_dir / f"part-{index:06d}.{fmt}"
+    tmp = out_dir / f".part-{index:06d}.{fmt}.tmp"
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.table(columns), tmp)
+    else:
+        with open(tmp, 'wb') as f:
+            np.savez(f, **columns)
+    os.replace(tmp, final)
+
+
+def _read_part(path: Path) -> Dict[str, np.ndarray]:
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    with np.load(path) as part:
+        return {name: part[name] for name in part.files}
+
+
+class ScenarioSweep:
+    """
+    Resumable sweep of ScenarioLibrary scenarios over a parameter grid.
+
+    Args:
+        out_dir: Directory for the manifest and part files
+        grid: {parameter: values} over SWEEP_PARAMETERS
+        scenario_ids: Scenarios to expand (defaults to the whole library)
+        particles: Particles per case
+        seed: Root seed; case k uses SeedSequence(seed, spawn_key=(k,))
+        chunk_size: Cases per chunk (one part file per chunk)
+        fmt: 'parquet', 'npz' or 'auto' (parquet when pyarrow is installed)
+    """
+
+    def __init__(self,
+                 out_dir,
+                 grid: Dict[str, Sequence[float]],
+                 scenario_ids: Optional[Sequence[str]] = None,
+                 particles: int = 10000,
+                 seed: int = 0,
+                 chunk_size: int = 32,
+                 fmt: str = 'auto'):
+        library = {s.scenario_id: s for s in ScenarioLibrary.get_all_scenarios()}
+        scenario_ids = list(scenario_ids or library)
+        missing = [s for s in scenario_ids if s not in library]
+        if missing:
+            raise ValueError(f"Unknown scenarios: {missing}")
+        if fmt == 'auto':
+            fmt = 'parquet' if _parquet_available() else 'npz'
+        elif fmt not in ('parquet', 'npz'):
+            raise ValueError("fmt must be 'auto', 'parquet' or 'npz'")
+
+        self.out_dir = Path(out_dir)
+        self.manifest = {
+            "grid": {name: [float(v) for v in values] for name, values in grid.items()},
+            "scenarios": scenario_ids,
+            "particles": int(particles),
+            "seed": int(seed),
+            "chunk_size": int(chunk_size),
+            "format": fmt
+        }
+        self.cases = expand_sweep([library[s] for s in scenario_ids], grid)
+        self.manifest["cases"] = len(self.cases)
+
+    @property
+    def n_chunks(self) -> int:
+        size = self.manifest["chunk_size"]
+        return (len(self.cases) + size - 1) // size
+
+    def chunk(self, index: int) -> List[SweepCase]:
+        size = self.manifest["chunk_size"]
+        return self.cases[index * size:(index + 1) * size]
+
+    def pending_chunks(self) -> List[int]:
+        """Chunks without a part file on disk."""
+        fmt = self.manifest["format"]
+        return [i for i in range(self.n_chunks) if not (self.out_dir / f"part-{i:06d}.{fmt}").exists()]
+
+    def _prepare(self, resume: bool) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / MANIFEST
+        if path.exists():
+            existing = json.loads(path.read_text())
+            if existing != self.manifest:
+                raise ValueError(f"{self.out_dir} holds a different sweep; use a new output directory")
+            if not resume and len(self.pending_chunks()) < self.n_chunks:
+                raise ValueError(f"{self.out_dir} already holds parts of this sweep; pass resume=True to continue it")
+        else:
+            path.write_text(json.dumps(self.manifest, indent=2))
+
+    def run(self,
+            workers: Optional[int] = None,
+            resume: bool = False,
+            progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Runs every pending chunk and writes its part file as soon as it finishes.
+
+        Args:
+            workers: Processes (defaults to the CPU count; 0 runs inline)
+            resume: Continue a sweep already present in out_dir
+            progress: Called with (chunks done, total chunks) after each part
+
+        Returns:
+            Number of chunks run by this call
+        """
+        self._prepare(resume)
+        pending = self.pending_chunks()
+        total = self.n_chunks
+        done = total - len(pending)
+        particles, seed, fmt = self.manifest["particles"], self.manifest["seed"], self.manifest["format"]
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers == 0:
+            for index in pending:
+                _write_part(self.out_dir, index, run_chunk(self.chunk(index), particles, seed), fmt)
+                done += 1
+                if progress:
+                    progress(done, total)
+            return len(pending)
+
+        # Keep a bounded window of chunks in flight so parts land steadily
+        context = multiprocessing.get_context("spawn")
+        queue = iter(pending)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            running = {}
+            for index in itertools.islice(queue, 2 * workers):
+                running[executor.submit(run_chunk, self.chunk(index), particles, seed)] = index
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    _write_part(self.out_dir, index, future.result(), fmt)
+                    done += 1
+                    if progress:
+                        progress(done, total)
+                    for following in itertools.islice(queue, 1):
+                        running[executor.submit(run_chunk, self.chunk(following), particles, seed)] = following
+        return len(pending)
+
+
+def load_sweep(out_dir) -> Dict[str, np.ndarray]:
+    """All parts of a sweep as columns, ordered by case_id."""
+    out_dir = Path(out_dir)
+    parts = [_read_part(path) for path in sorted(out_dir.glob("part-*.*")) if not path.name.endswith(".tmp")]
+    if not parts:
+        return {}
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    order = np.argsort(columns['case_id'], kind='stable')
+    return {name: values[order] for name, values in columns.items()}
+
+
+def load_sweep_dataframe(out_dir):
+    """Optional pandas export of load_sweep."""
+    import pandas as pd
+    return pd.DataFrame(load_sweep(out_dir))
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[float]]:
+    """
+    Parses 'name=v1,v2,...' or 'name=start:stop:step' (stop inclusive).
+
+    Raises:
+        ValueError: A malformed spec, or a range with step <= 0 or stop < start
+    """
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if ':' in values:
+            bounds = values.split(':')
+            if len(bounds) != 3:
+                raise ValueError(f"{spec}: a range is start:stop:step")
+            start, stop, step = (float(v) for v in bounds)
+            if step <= 0 or stop < start:
+                raise ValueError(f"{spec}: a range needs step > 0 and stop >= start")
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            grid[name.strip()] = [start + k * step for k in range(count)]
+        else:
+            grid[name.strip()] = [float(v) for v in values.split(',') if v]
+    return grid
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out", help="Output directory")
+    parser.add_argument("--grid", action="append", default=[], help="name=v1,v2 or name=start:stop:step")
+    parser.add_argument("--scenarios", default="", help="Comma-separated scenario IDs (default: all)")
+    parser.add_argument("--particles", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (0 = inline)")
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--format", default="auto", choices=("auto", "npz", "parquet"))
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted sweep in OUT")
+    args = parser.parse_args()
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        parser.error(f"--grid {e}")
+
+    sweep = ScenarioSweep(args.out, grid,
+                          scenario_ids=[s for s in args.scenarios.split(",") if s] or None,
+                          particles=args.particles, seed=args.seed,
+                          chunk_size=args.chunk_size, fmt=args.format)
+    started = time.perf_counter()
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done}/{total} chunks ({time.perf_counter() - started:.1f} s)", end="", file=sys.stderr, flush=True)
+
+    ran = sweep.run(workers=args.workers, resume=args.resume, progress=report)
+    elapsed = time.perf_counter() - started
+    print(f"\n{len(sweep.cases):,} cases in {sweep.n_chunks} chunks -> {sweep.out_dir} "
+          f"({ran} chunks run in {elapsed:.1f} s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main_cli()
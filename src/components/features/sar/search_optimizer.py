@@ -0,0 +1,269 @@
+"""
+Multi-asset search-effort optimisation over a probability grid.
+
+Each asset searches one cell at a time at coverage 1. A search takes the
+transit from the asset's previous cell plus cell_area / (speed * sweep
+width) hours and succeeds with probability POD * p, where p is the cell's
+remaining probability mass and POD the asset's pod_coefficients entry. An
+unsuccessful search leaves p * (1 - POD) in the cell. Whenever an asset
+becomes free it takes, among the cells with the most remaining mass, the
+one with the highest POS gain per hour, so cumulative probability of
+success grows as fast as the greedy choice allows at every point in time.
+
+Remaining masses live in a max-heap. Searching a cell pushes its reduced
+mass and superseded entries are skipped when popped, so reporting a
+completed search costs O(log n) and re-planning continues from the
+current heap instead of rebuilding it.
+"""
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mission_planner import NM_PER_DEG, AssetType, MissionPlanner, ProbabilityDensity
+from negative_search import SearchedCell
+
+# Typical search speed (knots) and sweep width (nm) by asset type
+ASSET_PROFILES: Dict[AssetType, Tuple[float, float]] = {
+    'uav': (60.0, 1.0),
+    'fixed_wing': (150.0, 3.0),
+    'surface_vessel': (12.0, 2.0),
+    'helicopter': (90.0, 2.0)
+}
+
+
+@dataclass
+class SearchAsset:
+    """One asset available for tasking."""
+    asset_id: str
+    asset_type: AssetType
+    speed_kts: float
+    sweep_width_nm: float
+    endurance_hours: float = math.inf
+    available_at_hours: float = 0.0
+    position: Optional[Tuple[float, float]] = None  # (lat, lon); None: starts on its first cell
+
+    @classmethod
+    def from_profile(cls, asset_id: str, asset_type: AssetType, **kwargs) -> 'SearchAsset':
+        """Asset with the typical speed and sweep width of its type, unless given in kwargs."""
+        speed, sweep_width = ASSET_PROFILES[asset_type]
+        kwargs = {'speed_kts': speed, 'sweep_width_nm': sweep_width, **kwargs}
+        return cls(asset_id=asset_id, asset_type=asset_type, **kwargs)
+
+
+@dataclass
+class CellAssignment:
+    """One planned (or completed) search of a grid cell."""
+    asset_id: str
+    row: int
+    col: int
+    center_lat: float
+    center_lon: float
+    start_hours: float  # Transit starts
+    end_hours: float  # Search of the cell ends
+    pod: float
+    pos_gain: float  # Probability of success added by this search
+
+
+@dataclass
+class SearchPlan:
+    """Greedy schedule from the optimizer's current state."""
+    assignments: List[CellAssignment] = field(default_factory=list)
+    found_before: float = 0.0  # POS of the searches already completed
+
+    @property
+    def total_pos(self) -> float:
+        return self.found_before + sum(a.pos_gain for a in self.assignments)
+
+    def pos_curve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Cumulative probability of success at each search completion time."""
+        ends = np.array([a.end_hours for a in self.assignments])
+        gains = np.array([a.pos_gain for a in self.assignments])
+        order = np.argsort(ends, kind='stable')
+        return ends[order], self.found_before + np.cumsum(gains[order])
+
+    def pos_at(self, hours: float) -> float:
+        """Cumulative probability of success of the searches finished by `hours`."""
+        return self.found_before + sum(a.pos_gain for a in self.assignments if a.end_hours <= hours)
+
+    def for_asset(self, asset_id: str) -> List[CellAssignment]:
+        return [a for a in self.assignments if a.asset_id == asset_id]
+
+
+class _AssetState:
+    __slots__ = ('asset', 'pod', 'search_hours', 'clock', 'position', 'deadline')
+
+
+class SearchEffortOptimizer:
+    """
+    Assigns and sequences search assets over a probability grid.
+
+    The optimizer keeps the committed state: remaining mass per cell after
+    the searches reported through complete(), and where and when each asset
+    becomes free. plan() schedules from that state without changing it, so
+    re-planning after a report is one plan() call.
+
+    Args:
+        planner: Supplies pod_coefficients
+        density: Probability grid (MissionPlanner.probability_density)
+        assets: Assets available for tasking
+        candidates: Cells with the most remaining mass considered for each
+            assignment (ranked by gain per hour, transit included)
+        min_gain: Stop when the best remaining search adds less POS
+    """
+
+    def __init__(self,
+                 planner: MissionPlanner,
+                 density: ProbabilityDensity,
+                 assets: Sequence[SearchAsset],
+                 candidates: int = 8,
+                 min_gain: float = 1e-6):
+        self.density = density
+        self.candidates = candidates
+        self.min_gain = min_gain
+        self.cols = density.H.shape[1]
+
+        # Cell geometry as plain floats: the planning loop is scalar Python
+        lat_edges, lon_edges = density.lat_edges, density.lon_edges
+        self._nm_per_deg_lon = NM_PER_DEG * math.cos(math.radians(float(lat_edges[0] + lat_edges[-1]) / 2))
+        self._cell_area_nm2 = (float(lat_edges[1] - lat_edges[0]) * NM_PER_DEG *
+                               float(lon_edges[1] - lon_edges[0]) * self._nm_per_deg_lon)
+        self._lat_centers = ((lat_edges[:-1] + lat_edges[1:]) / 2).tolist()
+        self._lon_centers = ((lon_edges[:-1] + lon_edges[1:]) / 2).tolist()
+
+        self.mass: List[float] = density.H.ravel().astype(np.float64).tolist()
+        self._heap = [(-m, idx) for idx, m in enumerate(self.mass) if m > 0]
+        heapq.heapify(self._heap)
+        self.found = 0.0
+        self.completed: List[CellAssignment] = []
+
+        self._assets: Dict[str, _AssetState] = {}
+        for asset in assets:
+            state = _AssetState()
+            state.asset = asset
+            state.pod = planner.pod_coefficients[asset.asset_type]
+            state.search_hours = self._cell_area_nm2 / (asset.speed_kts * asset.sweep_width_nm)
+            state.clock = asset.available_at_hours
+            state.position = asset.position
+            state.deadline = asset.available_at_hours + asset.endurance_hours
+            self._assets[asset.asset_id] = state
+
+    def _center(self, idx: int) -> Tuple[float, float]:
+        row, col = divmod(idx, self.cols)
+        return self._lat_centers[row], self._lon_centers[col]
+
+    def _transit_hours(self, state: _AssetState, position: Optional[Tuple[float, float]], idx: int) -> float:
+        if position is None:
+            return 0.0
+        lat, lon = self._center(idx)
+        distance = math.hypot((lat - position[0]) * NM_PER_DEG, (lon - position[1]) * self._nm_per_deg_lon)
+        return distance / state.asset.speed_kts
+
+    def searched_cell(self, assignment: CellAssignment) -> SearchedCell:
+        """The assignment's cell as a NegativeSearchUpdater search area."""
+        lat_edges, lon_edges = self.density.lat_edges, self.density.lon_edges
+        return SearchedCell(
+            lat_min=float(lat_edges[assignment.row]), lat_max=float(lat_edges[assignment.row + 1]),
+            lon_min=float(lon_edges[assignment.col]), lon_max=float(lon_edges[assignment.col + 1])
+        )
+
+    def complete(self,
+                 asset_id: str,
+                 row: int,
+                 col: int,
+                 end_hours: Optional[float] = None,
+                 coverage: float = 1.0) -> CellAssignment:
+        """
+        Commits an unsuccessful search of cell (row, col) by `asset_id`.
+
+        end_hours defaults to the asset's planned finish (transit plus
+        search); coverage scales the POD with the exponential detection law.
+        """
+        state = self._assets[asset_id]
+        idx = row * self.cols + col
+        start = state.clock
+        if end_hours is None:
+            end_hours = start + self._transit_hours(state, state.position, idx) + state.search_hours
+        pod = 1.0 - (1.0 - state.pod) ** max(coverage, 0.0)
+        gain = self.mass[idx] * pod
+        self.mass[idx] -= gain
+        heapq.heappush(self._heap, (-self.mass[idx], idx))
+        self.found += gain
+
+        state.clock = end_hours
+        state.position = self._center(idx)
+        assignment = CellAssignment(asset_id, row, col, *state.position, start, end_hours, pod, gain)
+        self.completed.append(assignment)
+
+        # Superseded entries only slow pops down; drop them once they dominate
+        if len(self._heap) > 2 * len(self.mass):
+            self._heap = [(-m, i) for i, m in enumerate(self.mass) if m > 0]
+            heapq.heapify(self._heap)
+        return assignment
+
+    def plan(self, horizon_hours: float) -> SearchPlan:
+        """
+        Greedy schedule for all assets up to `horizon_hours` from the committed state.
+
+        Assets are served in the order they become free; each takes the
+        best of the `candidates` highest-mass cells by POS gain per hour,
+        counting transit from its previous cell, and the cell's mass is
+        reduced for the assets that follow. Cells the asset cannot finish
+        before the horizon or its endurance runs out are passed over; it
+        stops once none of the candidates fits.
+        """
+        heap = list(self._heap)
+        mass = list(self.mass)
+        positions = {asset_id: state.position for asset_id, state in self._assets.items()}
+        free = [(state.clock, order, asset_id) for order, (asset_id, state) in enumerate(self._assets.items())]
+        heapq.heapify(free)
+        plan = SearchPlan(found_before=self.found)
+
+        while free:
+            clock, order, asset_id = heapq.heappop(free)
+            state = self._assets[asset_id]
+            limit = min(horizon_hours, state.deadline)
+            if clock >= limit:
+                continue
+
+            # 1. Pop the live entries with the most remaining mass
+            candidates = []
+            while heap and len(candidates) < self.candidates:
+                entry = heapq.heappop(heap)
+                if -entry[0] == mass[entry[1]]:
+                    candidates.append(entry)
+            if not candidates or -candidates[0][0] * state.pod < self.min_gain:
+                for entry in candidates:
+                    heapq.heappush(heap, entry)
+                continue
+
+            # 2. Best gain per hour, transit included, among the cells it can finish in time
+            best, best_rate, end = None, -1.0, limit
+            for entry in candidates:
+                transit = self._transit_hours(state, positions[asset_id], entry[1])
+                finish = clock + transit + state.search_hours
+                rate = -entry[0] * state.pod / (transit + state.search_hours)
+                if finish <= limit and rate > best_rate:
+                    best, best_rate, end = entry, rate, finish
+            for entry in candidates:
+                if entry is not best:
+                    heapq.heappush(heap, entry)
+            if best is None:
+                continue
+
+            # 3. Commit to the tentative state and requeue the asset
+            idx = best[1]
+            gain = mass[idx] * state.pod
+            mass[idx] -= gain
+            heapq.heappush(heap, (-mass[idx], idx))
+            row, col = divmod(idx, self.cols)
+            positions[asset_id] = self._center(idx)
+            plan.assignments.append(CellAssignment(
+                asset_id, row, col, *positions[asset_id], clock, end, state.pod, gain
+            ))
+            heapq.heappush(free, (end, order, asset_id))
+
+        return plan
@@ -0,0 +1,482 @@
+"""
+Process-based worker pool for CPU-bound SAR simulation and planning.
+
+Keeps Monte Carlo drift runs and mission planning off the FastAPI event loop.
+Workers own their own engine/planner instances and hand back only compact
+results (stats + SearchRecommendation). When the raw particle cloud is
+needed it travels through shared memory instead of being pickled.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import binary_export
+from drift_engine import BayesianDriftEngine
+from forcing_fields import load_named_forcing
+from hdr_contours import hdr_density, hdr_payload, hdr_regions
+from incident_store import IncidentSnapshot, IncidentStore
+from metrics import StageTimer, stage
+from mission_planner import DEFAULT_HORIZON_HOURS, DensityGeometry, GridCell, MissionPlanner, SearchRecommendation
+from negative_search import NegativeSearchUpdater, SearchEffort, SearchUpdateResult
+from particle_cloud import ParticleCloud
+from search_optimizer import SearchAsset
+from streaming_stats import StreamingSummary, summarize_drift
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the pool's queue is full and the request must be shed."""
+
+
+@dataclass
+class SharedCloudHandle:
+    """Descriptor of a particle cloud parked in a shared memory block."""
+    name: str
+    n_particles: int
+    dtype: str = 'float64'
+    weighted: bool = False
+
+
+# Per-process engine state, created by the pool initializer
+_engine: Optional[BayesianDriftEngine] = None
+_planner: Optional[MissionPlanner] = None
+
+# Larger runs allocate per call instead of pinning workspace buffers for good
+WORKSPACE_MAX_PARTICLES = int(os.environ.get("SAR_WORKSPACE_MAX_PARTICLES", 1_000_000))
+
+
+def _init_worker(iterations: int) -> None:
+    global _engine, _planner
+    _engine = BayesianDriftEngine(iterations=iterations)
+    _planner = MissionPlanner.from_env()
+
+
+def _ensure_worker(iterations: int) -> None:
+    """Inline mode runs in the API process; build its engine on first use."""
+    if _engine is None or _engine.iterations != iterations:
+        _init_worker(iterations)
+
+
+def _export_particles(cloud: ParticleCloud) -> SharedCloudHandle:
+    """Copies a cloud into a new shared memory block owned by the caller."""
+    n = cloud.n_particles
+    dtype = cloud.dtype
+    # Positions first, then float64 weights if the cloud carries any
+    size = 2 * n * dtype.itemsize + (0 if cloud.is_uniform else n * 8)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        positions = np.ndarray((2, n), dtype=dtype, buffer=shm.buf)
+        positions[0] = cloud.latitudes
+        positions[1] = cloud.longitudes
+        del positions
+        if not cloud.is_uniform:
+            weights = np.ndarray((n,), dtype=np.float64, buffer=shm.buf, offset=2 * n * dtype.itemsize)
+            weights[:] = cloud.weights
+            del weights
+        return SharedCloudHandle(name=shm.name, n_particles=n, dtype=dtype.str, weighted=not cloud.is_uniform)
+    finally:
+        shm.close()
+
+
+def import_particles(handle: SharedCloudHandle) -> ParticleCloud:
+    """Reads a cloud out of shared memory and releases the block."""
+    shm = shared_memory.SharedMemory(name=handle.name)
+    try:
+        dtype = np.dtype(handle.dtype)
+        n = handle.n_particles
+        positions = np.ndarray((2, n), dtype=dtype, buffer=shm.buf)
+        cloud = ParticleCloud(positions[0].copy(), positions[1].copy())
+        del positions
+        if handle.weighted:
+            weights = np.ndarray((n,), dtype=np.float64, buffer=shm.buf, offset=2 * n * dtype.itemsize)
+            cloud.set_weights(weights.copy())
+            del weights
+        return cloud
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def release_particles(handle: Optional[SharedCloudHandle]) -> None:
+    """Frees a shared memory block whose cloud is no longer wanted."""
+    if handle is None:
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=handle.name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def progressive_schedule(total: int, pilot: int = 1000, growth: int = 4) -> List[int]:
+    """
+    New-particle counts per progressive step: a small pilot chunk, then
+    geometrically growing chunks until `total` particles exist. Growth 4
+    keeps the summed re-planning cost within ~1.3x of planning once.
+    """
+    sizes = []
+    have = 0
+    step = max(1, min(pilot, total))
+    while have < total:
+        step = min(step, total - have)
+        sizes.append(step)
+        have += step
+        step = have * (growth - 1)
+    return sizes
+
+
+def _workspace_for(n: Optional[int]):
+    """This thread's drift workspace, or None for runs above the size cap."""
+    n = _engine.iterations if n is None else n
+    return _engine.workspace() if n <= WORKSPACE_MAX_PARTICLES else None
+
+
+def _resolve_forcing(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Swaps a forcing dataset name for its (memoised, memory-mapped) fields."""
+    if params.get('forcing') is None:
+        return params
+    params = dict(params)
+    params['forcing'] = load_named_forcing(params['forcing'], params.pop('forcing_start_hours', 0.0))
+    return params
+
+
+def _run_drift(params: Dict[str, Any], timer: Optional[StageTimer] = None) -> Tuple[ParticleCloud, Dict]:
+    """calculate_drift (or the adaptive variant) plus get_search_area_stats."""
+    params = _resolve_forcing(params)
+    if params.get('tolerance_nm') is not None:
+        with stage(timer, 'calculate_drift'):
+            cloud, report = _engine.calculate_drift_adaptive(**params)
+        with stage(timer, 'get_search_area_stats'):
+            stats = _engine.get_search_area_stats(cloud)
+        stats['sampling'] = asdict(report)
+    else:
+        # The cloud is a workspace view: consumed or copied out before the next run
+        with stage(timer, 'calculate_drift'):
+            cloud = _engine.calculate_drift(**params, workspace=_workspace_for(params.get('n_particles')))
+        with stage(timer, 'get_search_area_stats'):
+            stats = _engine.get_search_area_stats(cloud)
+            if params.get('sampler') is not None:
+                stats['sampling_error'] = _engine.sampling_error(cloud)
+    return cloud, stats
+
+
+# --- Worker entry points (module level so they pickle by reference) ---
+# Each takes the engine particle count first, then its own arguments.
+
+def simulate_and_plan(
+    iterations: int,
+    params: Dict[str, Any],
+    return_particles: bool = False,
+    fleet: Optional[List[SearchAsset]] = None,
+    horizon_hours: float = DEFAULT_HORIZON_HOURS
+) -> Tuple[Dict, SearchRecommendation, Optional[SharedCloudHandle]]:
+    """
+    Runs calculate_drift, get_search_area_stats and plan_mission.
+
+    A 'tolerance_nm' in params selects calculate_drift_adaptive; its report
+    is returned under stats['sampling']. A fleet is scheduled over the
+    cloud up to horizon_hours (plan_mission). Per-stage seconds are
+    returned under stats['timings'] and the cloud size under
+    stats['particles'].
+    """
+    _ensure_worker(iterations)
+    timer = StageTimer()
+    cloud, stats = _run_drift(params, timer)
+    recommendation = _planner.plan_mission(cloud, timer, fleet, horizon_hours)
+    handle = _export_particles(cloud) if return_particles else None
+    stats['timings'] = timer.timings
+    stats['particles'] = cloud.n_particles
+    return stats, recommendation, handle
+
+
+def simulate_and_plan_batch(
+    iterations: int,
+    requests: List[Dict[str, Any]],
+    seed: Optional[int] = None
+) -> Tuple[List[Dict], List[SearchRecommendation]]:
+    """Runs calculate_drift_batch and plan_missions_batch."""
+    _ensure_worker(iterations)
+    lats, lons = _engine.calculate_drift_batch(requests, rng=seed)
+    return _engine.get_search_area_stats_batch(lats, lons), _planner.plan_missions_batch(lats, lons)
+
+
+def simulate_heatmap(
+    iterations: int,
+    params: Dict[str, Any],
+    bins: int = 128,
+    include_particles: bool = False,
+    particle_encoding: str = 'f4',
+    compress: bool = False
+) -> Tuple[Dict, bytes]:
+    """Runs the drift and returns (stats, SARB payload) with the probability grid."""
+    _ensure_worker(iterations)
+    cloud, stats = _run_drift(params)
+    H, lat_edges, lon_edges = _planner.probability_grid(cloud.latitudes, cloud.longitudes, cloud.weights, bins)
+    payload = binary_export.encode_heatmap(
+        H, lat_edges, lon_edges,
+        cloud.latitudes if include_particles else None,
+        cloud.longitudes if include_particles else None,
+        cloud.weights if include_particles else None,
+        particle_encoding=particle_encoding,
+        compress=compress,
+        meta={"stats": stats}
+    )
+    stats['particles'] = cloud.n_particles
+    return stats, payload
+
+
+def simulate_hdr(
+    iterations: int,
+    params: Dict[str, Any],
+    levels: List[float],
+    smooth: int,
+    simplify_nm: Optional[float],
+    resolution: int
+) -> Tuple[Dict, Dict]:
+    """Runs the drift and returns (stats, highest-density-region payload)."""
+    _ensure_worker(iterations)
+    cloud, stats = _run_drift(params)
+    density = hdr_density(cloud.latitudes, cloud.longitudes, cloud.weights, resolution, _planner.extent_sigma)
+    payload = hdr_payload(density, hdr_regions(density, levels, smooth, simplify_nm))
+    stats['particles'] = cloud.n_particles
+    return stats, payload
+
+
+def simulate_progressive_step(
+    iterations: int,
+    params: Dict[str, Any],
+    entropy: int,
+    index: int,
+    n_new: int,
+    previous: Optional[SharedCloudHandle] = None,
+    final: bool = False
+) -> Tuple[Dict, Optional[List[GridCell]], Optional[SearchRecommendation], Optional[SharedCloudHandle]]:
+    """
+    One step of a progressive drift run.
+    
+    Draws n_new particles from the step's own stream (SeedSequence(entropy)
+    child `index`), appends them to the cloud parked at `previous` and
+    returns stats for the combined cloud. Intermediate steps also return
+    the critical path (except the pilot step, kept as cheap as possible)
+    and park the cloud for the next step; the final step returns the full
+    SearchRecommendation instead.
+    """
+    _ensure_worker(iterations)
+    params = _resolve_forcing(params)
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+    cloud = _engine.calculate_drift(**params, rng=rng, n_particles=n_new, workspace=_workspace_for(n_new))
+    if previous is not None:
+        earlier = import_particles(previous)
+        cloud = ParticleCloud(np.concatenate([earlier.latitudes, cloud.latitudes]),
+                              np.concatenate([earlier.longitudes, cloud.longitudes]))
+    stats = _engine.get_search_area_stats(cloud)
+    stats['particles'] = cloud.n_particles
+    if final:
+        return stats, None, _planner.plan_mission(cloud), None
+    critical_path = _planner.generate_critical_path(cloud.latitudes, cloud.longitudes) if index > 0 else None
+    return stats, critical_path, None, _export_particles(cloud)
+
+
+def summarize_drift_chunks(
+    iterations: int,
+    params: Dict[str, Any],
+    entropy: int,
+    n_particles: int,
+    chunks: Tuple[int, int],
+    geometry: Optional[DensityGeometry] = None
+) -> StreamingSummary:
+    """
+    Streams chunks [first, stop) of an n_particles run into a StreamingSummary.
+    
+    Only one chunk is ever held, so the returned summary (a few MB at most)
+    is all that leaves the worker. The range starting at chunk 0 places the
+    density grid; every other range needs that summary's geometry.
+    """
+    _ensure_worker(iterations)
+    return summarize_drift(_engine, _planner, _resolve_forcing(params), entropy, n_particles,
+                           chunks=chunks, geometry=geometry)
+
+
+def simulate_trajectory(iterations: int, params: Dict[str, Any]) -> List[Dict]:
+    """Runs simulate_trajectory and returns plain-dict snapshots."""
+    _ensure_worker(iterations)
+    return [asdict(snapshot) for snapshot in _engine.simulate_trajectory(**_resolve_forcing(params))]
+
+
+def start_incident(
+    iterations: int,
+    store: IncidentStore,
+    incident_id: str,
+    params: Dict[str, Any],
+    seed: Optional[int] = None
+) -> Tuple[Dict, SearchRecommendation, IncidentSnapshot]:
+    """Drifts from the LKP and stores the cloud and generator as the incident's first version."""
+    _ensure_worker(iterations)
+    rng = np.random.default_rng(seed)
+    cloud = _engine.calculate_drift(**_resolve_forcing(params), rng=rng, workspace=_workspace_for(None))
+    snapshot = store.save(incident_id, cloud, rng, params['hours'], 'create', meta={'origin': params})
+    stats = _engine.get_search_area_stats(cloud)
+    stats['particles'] = cloud.n_particles
+    return stats, _planner.plan_mission(cloud), snapshot
+
+
+def advance_incident(
+    iterations: int,
+    store: IncidentStore,
+    incident_id: str,
+    params: Dict[str, Any]
+) -> Tuple[Dict, SearchRecommendation, IncidentSnapshot]:
+    """
+    Advances the incident's latest cloud by params['hours'] and stores the result.
+    
+    The leeway model defaults to the incident's; a forcing dataset without
+    an explicit forcing_start_hours continues from the incident clock.
+    """
+    _ensure_worker(iterations)
+    snapshot, cloud, rng = store.load(incident_id)
+    origin = snapshot.meta.get('origin', {})
+    params = dict(params)
+    if params.get('leeway') is None:
+        params['leeway'] = origin.get('leeway')
+    if params.get('forcing') is not None and params.get('forcing_start_hours') is None:
+        params['forcing_start_hours'] = origin.get('forcing_start_hours', 0.0) + snapshot.hours
+    cloud = _engine.advance_drift(cloud, **_resolve_forcing(params), rng=rng,
+                                  workspace=_workspace_for(cloud.n_particles))
+    saved = store.save(incident_id, cloud, rng, snapshot.hours + params['hours'], 'advance')
+    stats = _engine.get_search_area_stats(cloud)
+    stats['particles'] = cloud.n_particles
+    return stats, _planner.plan_mission(cloud), saved
+
+
+def search_incident(
+    iterations: int,
+    store: IncidentStore,
+    incident_id: str,
+    effort: SearchEffort
+) -> Tuple[Dict, SearchUpdateResult, IncidentSnapshot]:
+    """Applies an unsuccessful search to the incident's latest cloud and stores the reweighted cloud."""
+    _ensure_worker(iterations)
+    snapshot, cloud, rng = store.load(incident_id, writable=True)
+    # The incident's generator drives resampling, so its state stays reproducible
+    result = NegativeSearchUpdater(_planner, rng=rng).apply(cloud, effort)
+    saved = store.save(incident_id, cloud, rng, snapshot.hours, 'search')
+    stats = _engine.get_search_area_stats(cloud)
+    stats['particles'] = cloud.n_particles
+    return stats, result, saved
+
+
+def incident_hdr(
+    iterations: int,
+    store: IncidentStore,
+    incident_id: str,
+    version: Optional[int],
+    levels: List[float],
+    smooth: int,
+    simplify_nm: Optional[float],
+    resolution: int
+) -> Tuple[IncidentSnapshot, Dict]:
+    """Highest-density regions of a stored version (default: the latest), weights included."""
+    _ensure_worker(iterations)
+    snapshot, cloud, _ = store.load(incident_id, version)
+    density = hdr_density(cloud.latitudes, cloud.longitudes, cloud.weights, resolution, _planner.extent_sigma)
+    return snapshot, hdr_payload(density, hdr_regions(density, levels, smooth, simplify_nm))
+
+
+class SimulationPool:
+    """
+    Bounded process pool with load shedding.
+
+    At most `max_workers` jobs run concurrently and at most `max_queue` more
+    wait for a slot; anything beyond that raises PoolSaturatedError so the
+    API can answer 503 instead of growing an unbounded backlog.
+
+    max_workers=0 selects inline mode (run on the calling thread), which is
+    the pre-pool behaviour and is kept for debugging and benchmarking.
+    """
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 max_queue: Optional[int] = None,
+                 iterations: int = 10000):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_queue is None:
+            max_queue = 4 * max(max_workers, 1)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.iterations = iterations
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()  # Released from executor callback threads
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, iterations: int = 10000) -> "SimulationPool":
+        """Reads SAR_POOL_WORKERS / SAR_POOL_QUEUE (unset = CPU-count defaults)."""
+        workers = os.environ.get("SAR_POOL_WORKERS")
+        queue = os.environ.get("SAR_POOL_QUEUE")
+        return cls(
+            max_workers=int(workers) if workers else None,
+            max_queue=int(queue) if queue else None,
+            iterations=iterations
+        )
+
+    @property
+    def inline(self) -> bool:
+        return self.max_workers == 0
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently running or queued."""
+        return self._pending
+
+    def _release(self, _future=None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                # spawn: forking a threaded ASGI server is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.iterations,)
+            )
+        return self._executor
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Executes fn(iterations, *args) on the pool, shedding load when full."""
+        if self.inline:
+            return fn(self.iterations, *args)
+
+        with self._pending_lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturatedError(
+                    f"Simulation queue full ({self._pending} jobs pending)"
+                )
+            self._pending += 1
+        try:
+            future = self._get_executor().submit(fn, self.iterations, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is freed when the worker is done with the job, not when the
+        # caller stops waiting: a cancelled await (job DELETE, coalescing
+        # deadline) cannot stop a job that has already started
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,123 @@
+"""
+Single-flight coalescing of identical concurrent computations.
+
+At shift handover several dashboards often post the same drift or
+scenario request within milliseconds of each other. The result cache only
+helps once the first run has finished; until then every copy would start
+its own Monte Carlo run and mission plan. SingleFlight keeps one in-flight
+task per key (the quantised request parameters and seed, as built by
+make_cache_key): the first request starts it and later ones with the same
+key wait on the same task, so N viewers cost one simulation.
+
+Every waiter receives the task's outcome: its result, or the exception it
+raised (pool saturation, a failed simulation, the flight's timeout). The
+task is shielded from its waiters, so a client that disconnects does not
+cancel the run the others are waiting for. A key is released as soon as
+its flight finishes; results are reused after that through the result
+cache, not here.
+
+Each flight has a deadline (`timeout_seconds`, overridable per call) so a
+stuck run cannot hold every waiter on its key indefinitely: when it
+expires all of them get FlightTimeoutError and the next request starts a
+fresh flight. Work already running on a pool worker runs to completion,
+since a process cannot be interrupted mid-chunk.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class FlightTimeoutError(RuntimeError):
+    """Raised to every waiter of a flight that outlived its deadline."""
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Future
+    waiters: int = 1
+
+
+class SingleFlight:
+    """
+    One shared in-flight computation per key on the event loop.
+
+    Args:
+        timeout_seconds: Default deadline of a flight (None: no deadline)
+    """
+
+    def __init__(self, timeout_seconds: Optional[float] = 120.0):
+        self.timeout_seconds = timeout_seconds
+        self._flights: Dict[Hashable, _Flight] = {}
+        # Per kind (key[0] for tuple keys): flights started, requests that joined one
+        self.started: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+        self.timeouts = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        """Reads SAR_COALESCE_TIMEOUT (seconds; 0 disables the deadline)."""
+        timeout = float(os.environ.get("SAR_COALESCE_TIMEOUT", 120))
+        return cls(timeout_seconds=timeout if timeout > 0 else None)
+
+    async def run(self,
+                  key: Hashable,
+                  fn: Callable[..., Awaitable[Any]],
+                  *args: Any,
+                  timeout: Optional[float] = None) -> Any:
+        """
+        Result of `await fn(*args)`, shared with concurrent calls for `key`.
+
+        Only the call that starts the flight runs fn (with its own args and
+        `timeout`, default timeout_seconds); calls that join an existing
+        flight just wait for it, so equal keys must mean interchangeable
+        results.
+        """
+        kind = str(key[0]) if isinstance(key, tuple) and key else ""
+        flight = self._flights.get(key)
+        if flight is None:
+            deadline = self.timeout_seconds if timeout is None else timeout
+            task = asyncio.ensure_future(self._lead(key, fn(*args), deadline))
+            # Retrieve the outcome even if every waiter has gone, so it is never logged as lost
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            flight = self._flights[key] = _Flight(task)
+            self.started[kind] = self.started.get(kind, 0) + 1
+        else:
+            flight.waiters += 1
+            self.coalesced[kind] = self.coalesced.get(kind, 0) + 1
+        return await asyncio.shield(flight.task)
+
+    async def _lead(self, key: Hashable, work: Awaitable[Any], deadline: Optional[float]) -> Any:
+        try:
+            if deadline is None:
+                return await work
+            return await asyncio.wait_for(work, deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise FlightTimeoutError(f"Computation did not finish within {deadline:g} s") from None
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._flights.pop(key, None)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    @property
+    def waiting(self) -> int:
+        """Requests attached to the flights in progress, starters included."""
+        return sum(flight.waiters for flight in self._flights.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "started": dict(self.started),
+            "coalesced": dict(self.coalesced),
+            "timeouts": self.timeouts,
+            "errors": self.errors
+        }
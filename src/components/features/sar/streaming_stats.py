@@ -0,0 +1,320 @@
+"""
+Constant-memory search statistics for drift runs too large to hold.
+
+A 1e8-particle cloud is 1.6 GB of float64 positions before any
+temporaries, but the search products only need three summaries of it.
+Each summary folds in one chunk at a time and merges with the summary of
+any other chunk range, so workers can split a run and combine results:
+
+    DriftMoments         weighted mean and covariance (Welford / Chan et
+                         al. pairwise update, see drift_engine)
+    DensityAccumulator   mass on a fixed nautical-mile grid, with the ring
+                         around it collecting everything outside
+    TopCellTracker       heaviest cells of an unbounded fine lattice
+                         (mergeable Misra-Gries summary, bounded size)
+
+The density grid has to be placed before the first particle is binned,
+so its geometry comes from the moments of the first chunk: with
+DEFAULT_PARALLEL_CHUNK particles those place the grid to a small
+fraction of a cell, and whatever falls outside lands in outside_mass as
+it does for MissionPlanner.probability_density. Every later chunk, and
+every worker, bins onto that same geometry.
+
+summarize_drift() drives BayesianDriftEngine.iter_drift_chunks through a
+StreamingSummary. Peak memory is one chunk plus the fixed-size summaries,
+whatever the particle count.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from drift_engine import DEFAULT_PARALLEL_CHUNK, BayesianDriftEngine, DriftMoments
+from mission_planner import DensityGeometry, GridCell, MissionPlanner, ProbabilityDensity
+
+DEFAULT_TOP_CAPACITY = 16384
+DEFAULT_SUBDIVIDE = 4  # Tracker cells per density-grid cell, per axis
+
+_KEY_OFFSET = 1 << 30  # Row/column range either side of the origin; keeps packed keys positive
+_KEY_MASK = (1 << 32) - 1
+
+
+class DensityAccumulator:
+    """
+    Unnormalised mass on a fixed DensityGeometry plus its outside ring.
+
+    Args:
+        geometry: Grid placement shared by every accumulator that will be merged
+    """
+
+    def __init__(self, geometry: DensityGeometry):
+        self.geometry = geometry
+        self.padded = np.zeros((geometry.rows + 2, geometry.cols + 2))
+
+    def add(self, latitudes: np.ndarray, longitudes: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        self.padded += MissionPlanner.bin_padded(latitudes, longitudes, weights, self.geometry)
+
+    def merge(self, other: "DensityAccumulator") -> "DensityAccumulator":
+        if other.geometry != self.geometry:
+            raise ValueError("Density accumulators must share one grid geometry to merge")
+        merged = DensityAccumulator(self.geometry)
+        np.add(self.padded, other.padded, out=merged.padded)
+        return merged
+
+    def density(self) -> ProbabilityDensity:
+        """Normalised ProbabilityDensity of everything folded in so far."""
+        total = self.padded.sum()
+        H = self.padded[1:-1, 1:-1] / total if total > 0 else self.padded[1:-1, 1:-1].copy()
+        return ProbabilityDensity(
+            H=H,
+            lat_edges=self.geometry.lat_edges,
+            lon_edges=self.geometry.lon_edges,
+            cell_nm=self.geometry.cell_nm,
+            outside_mass=max(1.0 - float(H.sum()), 0.0) if total > 0 else 0.0
+        )
+
+
+class TopCellTracker:
+    """
+    Approximate heaviest cells of a lattice anchored at (lat0, lon0).
+
+    Keeps at most `capacity` (cell, mass) counters. Each chunk is first
+    aggregated exactly; when the union with the kept counters exceeds the
+    capacity, the (capacity + 1)-th largest mass is subtracted from every
+    counter and the non-positive ones are dropped. Merging two trackers
+    does the same, so for any split of the stream a cell's kept mass
+    under-counts its true mass by at most `error` <= total / (capacity + 1),
+    and every cell heavier than that is guaranteed to be kept.
+
+    Args:
+        lat0, lon0: Lattice origin (a cell corner)
+        lat_step, lon_step: Cell size in degrees
+        cell_nm: Cell edge in nautical miles (reported on GridCells)
+        capacity: Counters kept
+    """
+
+    def __init__(self,
+                 lat0: float,
+                 lon0: float,
+                 lat_step: float,
+                 lon_step: float,
+                 cell_nm: float,
+                 capacity: int = DEFAULT_TOP_CAPACITY):
+        self.lat0 = lat0
+        self.lon0 = lon0
+        self.lat_step = lat_step
+        self.lon_step = lon_step
+        self.cell_nm = cell_nm
+        self.capacity = max(capacity, 1)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.mass = np.empty(0)
+        self.total = 0.0
+        self.error = 0.0  # Largest possible under-count of any cell's mass
+
+    @classmethod
+    def for_geometry(cls,
+                     geometry: DensityGeometry,
+                     subdivide: int = DEFAULT_SUBDIVIDE,
+                     capacity: int = DEFAULT_TOP_CAPACITY) -> "TopCellTracker":
+        """Tracker on the density grid's lattice refined `subdivide` times per axis."""
+        subdivide = max(subdivide, 1)
+        return cls(geometry.lat0, geometry.lon0, geometry.lat_step / subdivide, geometry.lon_step / subdivide,
+                   geometry.cell_nm / subdivide, capacity)
+
+    def _lattice(self) -> Tuple[float, float, float, float]:
+        return self.lat0, self.lon0, self.lat_step, self.lon_step
+
+    def _keys(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        # Row and column offset into 32 unsigned bits each, packed into one int64
+        scratch = np.subtract(latitudes, self.lat0, dtype=np.float64)
+        scratch *= 1.0 / self.lat_step
+        np.floor(scratch, out=scratch)
+        np.clip(scratch, -_KEY_OFFSET, _KEY_OFFSET - 1, out=scratch)
+        keys = scratch.astype(np.int64)
+        keys += _KEY_OFFSET
+        keys <<= 32
+        np.subtract(longitudes, self.lon0, out=scratch, dtype=np.float64)
+        scratch *= 1.0 / self.lon_step
+        np.floor(scratch, out=scratch)
+        np.clip(scratch, -_KEY_OFFSET, _KEY_OFFSET - 1, out=scratch)
+        # Integer add: the packed keys exceed float64's 53-bit mantissa
+        keys += scratch.astype(np.int64)
+        keys += _KEY_OFFSET
+        return keys
+
+    def _fold(self, keys: np.ndarray, mass: np.ndarray) -> None:
+        keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        mass = np.bincount(inverse.ravel(), weights=np.concatenate([self.mass, mass]), minlength=keys.size)
+        if keys.size > self.capacity:
+            cut = float(np.partition(mass, keys.size - self.capacity - 1)[keys.size - self.capacity - 1])
+            mass -= cut
+            kept = mass > 0
+            keys, mass = keys[kept], mass[kept]
+            self.error += cut
+        self.keys, self.mass = keys, mass
+
+    def add(self, latitudes: np.ndarray, longitudes: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        keys, inverse = np.unique(self._keys(latitudes, longitudes), return_inverse=True)
+        mass = np.bincount(inverse.ravel(), weights=weights, minlength=keys.size).astype(np.float64)
+        self.total += float(mass.sum())
+        self._fold(keys, mass)
+
+    def merge(self, other: "TopCellTracker") -> "TopCellTracker":
+        if other._lattice() != self._lattice():
+            raise ValueError("Top-cell trackers must share one lattice to merge")
+        merged = TopCellTracker(*self._lattice(), self.cell_nm, self.capacity)
+        merged.keys, merged.mass = self.keys, self.mass
+        merged.total = self.total + other.total
+        merged.error = self.error + other.error
+        merged._fold(other.keys, other.mass)
+        return merged
+
+    @property
+    def error_bound(self) -> float:
+        """Largest possible under-count of any reported probability_mass."""
+        return self.error / self.total if self.total > 0 else 0.0
+
+    def top(self, n: int = 10) -> List[GridCell]:
+        """
+        The n heaviest kept cells, heaviest first. probability_mass is a
+        lower bound on the cell's share, at most error_bound below it.
+        """
+        critical_path = []
+        for idx in MissionPlanner.top_indices(self.mass, n):
+            key = int(self.keys[idx])
+            row = (key >> 32) - _KEY_OFFSET
+            col = (key & _KEY_MASK) - _KEY_OFFSET
+            critical_path.append(GridCell(
+                center_lat=self.lat0 + (row + 0.5) * self.lat_step,
+                center_lon=self.lon0 + (col + 0.5) * self.lon_step,
+                probability_mass=float(self.mass[idx]) / self.total,
+                priority=len(critical_path) + 1,
+                size_nm=self.cell_nm
+            ))
+        return critical_path
+
+
+@dataclass
+class StreamingSummary:
+    """
+    Moments, density grid and top cells of every chunk folded in so far.
+    
+    Moments are kept per chunk (a few floats each) and merged in chunk
+    order on demand, so they come out bit-for-bit the same however the
+    chunks were split across workers, and equal to the moments of
+    calculate_drift_parallel for the same seed. Unweighted density counts
+    are exact sums, so only the top-cell estimates depend on the split.
+    """
+    chunk_moments: List[DriftMoments]
+    density: DensityAccumulator
+    top_cells: TopCellTracker
+
+    @classmethod
+    def empty(cls,
+              geometry: DensityGeometry,
+              subdivide: int = DEFAULT_SUBDIVIDE,
+              top_capacity: int = DEFAULT_TOP_CAPACITY) -> "StreamingSummary":
+        """Summary on a known geometry, e.g. for a worker given a later chunk range."""
+        return cls([],
+                   DensityAccumulator(geometry),
+                   TopCellTracker.for_geometry(geometry, subdivide, top_capacity))
+
+    @classmethod
+    def from_first_chunk(cls,
+                         planner: MissionPlanner,
+                         latitudes: np.ndarray,
+                         longitudes: np.ndarray,
+                         weights: Optional[np.ndarray] = None,
+                         subdivide: int = DEFAULT_SUBDIVIDE,
+                         top_capacity: int = DEFAULT_TOP_CAPACITY) -> "StreamingSummary":
+        """Summary whose grid geometry is placed from the first chunk's moments."""
+        moments = DriftMoments.from_positions(latitudes, longitudes, weights)
+        geometry = planner.density_geometry(moments.mean_lat, moments.mean_lon, moments.covariance())
+        summary = cls.empty(geometry, subdivide, top_capacity)
+        summary.chunk_moments.append(moments)
+        summary.density.add(latitudes, longitudes, weights)
+        summary.top_cells.add(latitudes, longitudes, weights)
+        return summary
+
+    @property
+    def geometry(self) -> DensityGeometry:
+        return self.density.geometry
+
+    @property
+    def moments(self) -> DriftMoments:
+        """Chunk moments merged left to right, as calculate_drift_parallel merges them."""
+        moments = DriftMoments(0, 0.0, 0.0, 0.0, 0.0)
+        for partial in self.chunk_moments:
+            moments = moments.merge(partial)
+        return moments
+
+    @property
+    def n_particles(self) -> int:
+        return sum(partial.n for partial in self.chunk_moments)
+
+    def add(self, latitudes: np.ndarray, longitudes: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        """Folds in the next chunk."""
+        self.chunk_moments.append(DriftMoments.from_positions(latitudes, longitudes, weights))
+        self.density.add(latitudes, longitudes, weights)
+        self.top_cells.add(latitudes, longitudes, weights)
+
+    def merge(self, other: "StreamingSummary") -> "StreamingSummary":
+        """Summary of both chunk ranges (self's chunks first)."""
+        return StreamingSummary(self.chunk_moments + other.chunk_moments,
+                                self.density.merge(other.density),
+                                self.top_cells.merge(other.top_cells))
+
+    def search_area_stats(self) -> Dict[str, Any]:
+        """get_search_area_stats fields plus the particle count."""
+        stats = self.moments.search_area_stats()
+        stats["particles"] = self.n_particles
+        return stats
+
+    def moments_tuple(self) -> Tuple[float, float, np.ndarray]:
+        """(mean_lat, mean_lon, cov) as MissionPlanner.distribution_moments returns them."""
+        moments = self.moments
+        return moments.mean_lat, moments.mean_lon, moments.covariance()
+
+
+def summarize_drift(engine: BayesianDriftEngine,
+                    planner: MissionPlanner,
+                    params: Dict[str, Any],
+                    seed: int,
+                    n_particles: int,
+                    chunk_size: int = DEFAULT_PARALLEL_CHUNK,
+                    chunks: Optional[Tuple[int, int]] = None,
+                    geometry: Optional[DensityGeometry] = None,
+                    subdivide: int = DEFAULT_SUBDIVIDE,
+                    top_capacity: int = DEFAULT_TOP_CAPACITY) -> StreamingSummary:
+    """
+    Streams chunks [first, stop) of a seeded drift run into a summary.
+
+    Args:
+        params: calculate_drift arguments (lkp, wind, current, hours, ...)
+        seed: Root seed of the run; the same for every chunk range
+        chunks: [first, stop) chunk range (default: the whole run)
+        geometry: Grid geometry of the run; None places it from the first
+            chunk of the range, which must then be chunk 0
+        Remaining arguments as in BayesianDriftEngine.iter_drift_chunks.
+
+    Raises:
+        ValueError: Empty chunk range without a geometry
+    """
+    summary = None if geometry is None else StreamingSummary.empty(geometry, subdivide, top_capacity)
+    for _, chunk in engine.iter_drift_chunks(**params, seed=seed, n_particles=n_particles,
+                                             chunk_size=chunk_size, chunks=chunks):
+        # Chunks are workspace views: fold each one before the next is drawn
+        if summary is None:
+            summary = StreamingSummary.from_first_chunk(planner, chunk.latitudes, chunk.longitudes,
+                                                        subdivide=subdivide, top_capacity=top_capacity)
+        else:
+            summary.add(chunk.latitudes, chunk.longitudes)
+    if summary is None:
+        raise ValueError("No chunks to summarize and no grid geometry to start from")
+    return summary
+
+
+def chunk_count(n_particles: int, chunk_size: int = DEFAULT_PARALLEL_CHUNK) -> int:
+    """Chunks in an n_particles run."""
+    return -(-n_particles // max(chunk_size, 1))
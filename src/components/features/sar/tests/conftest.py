@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The service modules import each other as top-level modules, as in main.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
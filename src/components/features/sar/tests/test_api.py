@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+# Inline pool and a small cloud: set before main builds its module-level services
+os.environ["SAR_POOL_WORKERS"] = "0"
+os.environ["SAR_ITERATIONS"] = "2000"
+
+from fastapi.testclient import TestClient
+
+import main
+from incident_store import IncidentStore
+
+WIND = {"speed": 20.0, "direction": 270.0}
+CURRENT = {"speed": 1.5, "direction": 45.0}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "incident_store", IncidentStore(str(tmp_path)))
+    return TestClient(main.app)
+
+
+def _drift(**overrides):
+    return {"lkp": [54.3, 3.15], "wind": WIND, "current": CURRENT, "hours": 6.0, "seed": 1, **overrides}
+
+
+@pytest.mark.parametrize("field", ["wind", "current"])
+@pytest.mark.parametrize("vector", [{}, {"speed": 20.0}, {"direction": 270.0}])
+def test_drift_rejects_incomplete_forcing(client, field, vector):
+    response = client.post("/simulate/drift", json=_drift(**{field: vector}))
+    assert response.status_code == 422
+
+
+def test_advance_rejects_incomplete_forcing(client):
+    assert client.post("/incidents", json=_drift(incident_id="ns-001")).status_code == 200
+    response = client.post("/incidents/ns-001/advance", json={"hours": 2.0, "wind": {"speed": 20.0},
+                                                              "current": CURRENT})
+    assert response.status_code == 422
+    advanced = client.post("/incidents/ns-001/advance", json={"hours": 2.0, "wind": WIND, "current": CURRENT})
+    assert advanced.status_code == 200
+    assert advanced.json()["incident"]["version"] == 1
+
+
+def test_unknown_incident_is_a_404(client):
+    advance = {"hours": 2.0, "wind": WIND, "current": CURRENT}
+    assert client.post("/incidents/missing/advance", json=advance).status_code == 404
+    assert client.get("/incidents/missing").status_code == 404
+    assert client.delete("/incidents/missing").status_code == 404
+    assert client.post("/incidents", json=_drift(incident_id="ns-001")).status_code == 200
+    response = client.post("/incidents/ns-001/rollback", json={"version": 5})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown incident or version"
+
+
+def test_other_key_errors_are_server_errors():
+    with pytest.raises(main.HTTPException) as raised:
+        with main.http_errors(not_found="Unknown incident"):
+            {}["speed"]
+    assert raised.value.status_code == 500
+
+
+def test_incident_locks_do_not_outlive_their_requests(client):
+    advance = {"hours": 2.0, "wind": WIND, "current": CURRENT}
+    for i in range(5):
+        assert client.post(f"/incidents/missing-{i}/advance", json=advance).status_code == 404
+    assert client.post("/incidents", json=_drift(incident_id="ns-001")).status_code == 200
+    assert len(main.incident_locks) == 0
+
+
+def test_incident_listing_history_and_delete(client):
+    for incident_id in ("ns-001", "ns-002"):
+        assert client.post("/incidents", json=_drift(incident_id=incident_id)).status_code == 200
+    assert client.post("/incidents", json=_drift(incident_id="ns-001")).status_code == 409
+    listed = client.get("/incidents").json()["incidents"]
+    assert sorted(incident["incident_id"] for incident in listed) == ["ns-001", "ns-002"]
+    assert [v["version"] for v in client.get("/incidents/ns-001").json()["versions"]] == [0]
+    assert client.delete("/incidents/ns-001").json() == {"deleted": "ns-001"}
+    assert [incident["incident_id"] for incident in client.get("/incidents").json()["incidents"]] == ["ns-002"]
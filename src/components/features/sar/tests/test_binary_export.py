@@ -0,0 +1,121 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+import binary_export
+from binary_export import decode, decode_heatmap, encode, encode_heatmap, read_header
+
+
+def _cloud(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    latitudes = 54.3 + 0.05 * rng.standard_normal(n)
+    longitudes = 3.15 + 0.08 * rng.standard_normal(n)
+    weights = rng.random(n)
+    return latitudes, longitudes, weights / weights.sum()
+
+
+def _grid(latitudes, longitudes, bins=32):
+    H, lat_edges, lon_edges = np.histogram2d(latitudes, longitudes, bins=bins)
+    return H / H.sum(), lat_edges, lon_edges
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_encode_decode_round_trip(compress):
+    arrays = [
+        ("a", np.arange(7, dtype='<u2')),
+        ("b", np.linspace(0, 1, 12, dtype='<f4').reshape(3, 4)),
+        ("c", np.arange(5, dtype='>f8')),  # Stored little-endian
+    ]
+    filters = {"a": ['delta', 'shuffle'], "b": ['shuffle']}
+    payload = encode(arrays, {"source": "test"}, compress=compress, filters=filters)
+
+    header, decoded = decode(payload)
+    assert header["source"] == "test"
+    assert read_header(payload) == header
+    for name, array in arrays:
+        np.testing.assert_array_equal(decoded[name], array)
+        assert decoded[name].dtype.byteorder in ('<', '=', '|')
+        # Typed-array views need every buffer 8-byte aligned
+        entry = next(e for e in header["arrays"] if e["name"] == name)
+        assert entry["offset"] % 8 == 0
+    assert payload[5] & binary_export.FLAG_ZLIB == (binary_export.FLAG_ZLIB if compress else 0)
+
+
+def test_uncompressed_arrays_are_views_of_the_payload():
+    payload = encode([("x", np.arange(16, dtype='<f4'))], {})
+    _, arrays = decode(payload)
+    assert not arrays["x"].flags.owndata
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_heatmap_round_trip_f4(compress):
+    latitudes, longitudes, weights = _cloud()
+    H, lat_edges, lon_edges = _grid(latitudes, longitudes)
+    payload = encode_heatmap(H, lat_edges, lon_edges, latitudes, longitudes, weights, compress=compress)
+    result = decode_heatmap(payload)
+
+    # Quantised density: within half a step of the peak
+    np.testing.assert_allclose(result["density"], H, atol=result["density_scale"] / 2 + 1e-15)
+    assert result["particles"] == latitudes.size
+    # Compression reorders the particles, so compare them as sorted (lat, lon, weight) rows
+    expected = np.column_stack([latitudes, longitudes, weights]).astype('<f4')
+    got = np.column_stack([result["latitudes"], result["longitudes"], result["weights"]])
+    np.testing.assert_array_equal(got[np.lexsort(got.T[::-1])], expected[np.lexsort(expected.T[::-1])])
+
+
+def test_heatmap_round_trip_u2_within_one_step():
+    latitudes, longitudes, _ = _cloud()
+    H, lat_edges, lon_edges = _grid(latitudes, longitudes)
+    result = decode_heatmap(encode_heatmap(H, lat_edges, lon_edges, latitudes, longitudes,
+                                           particle_encoding='u2', compress=True))
+    lat_step = (lat_edges[-1] - lat_edges[0]) / 65535
+    np.testing.assert_allclose(np.sort(result["latitudes"]), np.sort(latitudes), atol=lat_step)
+    assert "weights" not in result
+
+
+def test_heatmap_rejects_unknown_particle_encoding():
+    latitudes, longitudes, _ = _cloud(100)
+    H, lat_edges, lon_edges = _grid(latitudes, longitudes)
+    with pytest.raises(ValueError):
+        encode_heatmap(H, lat_edges, lon_edges, latitudes, longitudes, particle_encoding='f8')
+
+
+def _payload():
+    return encode([("x", np.arange(10, dtype='<u2'))], {"k": 1})
+
+
+def _with_header(payload, header):
+    body = json.dumps(header).encode()
+    body += b" " * (-(12 + len(body)) % 8)
+    start = 12 + struct.unpack_from("<I", payload, 8)[0]
+    return payload[:8] + struct.pack("<I", len(body)) + body + payload[start:]
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda p: b"SARX" + p[4:],  # Magic
+    lambda p: p[:4] + bytes([2]) + p[5:],  # Version
+    lambda p: p[:6],  # Shorter than the prefix
+    lambda p: p[:8] + struct.pack("<I", len(p)) + p[12:],  # Header length past the end
+    lambda p: p[:14] + b"\xff" + p[15:],  # Header is not JSON
+])
+def test_decode_rejects_corrupt_header(corrupt):
+    with pytest.raises(ValueError):
+        decode(corrupt(_payload()))
+
+
+def test_decode_rejects_arrays_past_the_buffer_section():
+    payload = _payload()
+    header = read_header(payload)
+    header["arrays"][0]["shape"] = [10_000]
+    with pytest.raises(ValueError):
+        decode(_with_header(payload, header))
+
+
+def test_decode_rejects_unknown_filter():
+    payload = encode([("x", np.arange(10, dtype='<u2'))], {}, compress=True, filters={"x": ['shuffle']})
+    header = read_header(payload)
+    header["arrays"][0]["filters"] = ['bitshuffle']
+    with pytest.raises(ValueError):
+        decode(_with_header(payload, header))
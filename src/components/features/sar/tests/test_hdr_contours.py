@@ -0,0 +1,149 @@
+import math
+
+import numpy as np
+import pytest
+
+from hdr_contours import containing_ring, hdr_density, hdr_regions, hdr_thresholds, smooth_density
+
+LEVELS = (0.95, 0.5, 0.9, 0.75)  # Deliberately unsorted
+
+
+def _gaussian(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 54.3 + 0.02 * rng.standard_normal(n), 3.15 + 0.03 * rng.standard_normal(n)
+
+
+def _bimodal(n, seed=0):
+    rng = np.random.default_rng(seed)
+    second = rng.random(n) < 0.3
+    latitudes = np.where(second, 54.42, 54.3) + 0.015 * rng.standard_normal(n)
+    longitudes = np.where(second, 3.35, 3.15) + 0.02 * rng.standard_normal(n)
+    return latitudes, longitudes
+
+
+def _skewed(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 54.3 + 0.03 * rng.gamma(1.5, size=n), 3.15 + 0.02 * rng.standard_normal(n)
+
+
+def _covered(region, latitudes, longitudes):
+    """Share of the points inside the region (even-odd over all its rings)."""
+    points = np.column_stack([latitudes, longitudes])
+    inside = np.zeros(points.shape[0], dtype=bool)
+    for polygon in region.polygons:
+        for ring in polygon:
+            inside ^= containing_ring([ring[:, ::-1]], points) == 0
+    return float(inside.mean())
+
+
+def test_thresholds_on_a_known_grid():
+    H = np.array([[0.5, 0.25], [0.125, 0.125]])
+    thresholds, masses = hdr_thresholds(H, (0.5, 0.7, 0.75, 0.9))
+    np.testing.assert_array_equal(thresholds, [0.5, 0.25, 0.25, 0.125])
+    np.testing.assert_array_equal(masses, [0.5, 0.75, 0.75, 1.0])
+    # Every cell tied with the threshold is inside the contour, so its mass counts
+    thresholds, masses = hdr_thresholds(np.full((2, 2), 0.25), (0.5,))
+    np.testing.assert_array_equal(thresholds, [0.25])
+    np.testing.assert_array_equal(masses, [1.0])
+
+
+def test_level_beyond_the_grid_reports_the_mass_it_has():
+    # 0.2 of the probability fell outside the grid
+    thresholds, masses = hdr_thresholds(np.array([[0.5, 0.25], [0.05, 0.0]]), (0.5, 0.95))
+    np.testing.assert_array_equal(thresholds, [0.5, 0.05])
+    assert masses[1] == pytest.approx(0.8)
+    thresholds, masses = hdr_thresholds(np.zeros((3, 3)), (0.5, 0.9))
+    np.testing.assert_array_equal(masses, [0.0, 0.0])
+
+
+@pytest.mark.parametrize("cloud", [_gaussian, _bimodal, _skewed])
+def test_mass_and_area_grow_with_the_level(cloud):
+    density = hdr_density(*cloud(100_000))
+    regions = hdr_regions(density, LEVELS)
+    assert [region.level for region in regions] == list(LEVELS)
+
+    H = smooth_density(density.H)
+    ordered = sorted(regions, key=lambda region: region.level)
+    for region in ordered:
+        assert region.mass >= min(region.level, H.sum()) - 1e-12
+        # The reported mass is what the cells above the threshold hold
+        assert region.mass == pytest.approx(H[H >= region.threshold].sum())
+        assert region.polygons
+    for lower, higher in zip(ordered, ordered[1:]):
+        assert higher.threshold <= lower.threshold
+        assert higher.mass >= lower.mass
+        assert higher.area_nm2 >= lower.area_nm2
+
+
+@pytest.mark.parametrize("cloud", [_gaussian, _bimodal])
+def test_lower_levels_nest_inside_higher_ones(cloud):
+    regions = hdr_regions(hdr_density(*cloud(100_000)), (0.5, 0.95))
+    inner, outer = regions
+    vertices = np.vstack([ring for polygon in inner.polygons for ring in polygon])[:, ::-1]
+    assert _covered(outer, vertices[:, 0], vertices[:, 1]) == 1.0
+
+
+def test_bimodal_cloud_keeps_both_modes():
+    regions = hdr_regions(hdr_density(*_bimodal(100_000)), (0.5, 0.9))
+    assert all(len(region.polygons) == 2 for region in regions)
+
+
+def test_regions_cover_an_independent_cloud():
+    regions = hdr_regions(hdr_density(*_gaussian(200_000, seed=1)), LEVELS)
+    latitudes, longitudes = _gaussian(200_000, seed=2)
+    for region in regions:
+        assert _covered(region, latitudes, longitudes) == pytest.approx(region.level, abs=0.02)
+
+
+def test_gaussian_areas_follow_the_levels():
+    # The p-HDR of a 2-D Gaussian is an ellipse of area proportional to -ln(1 - p)
+    regions = hdr_regions(hdr_density(*_gaussian(200_000)), (0.5, 0.9))
+    assert regions[1].area_nm2 / regions[0].area_nm2 == pytest.approx(math.log(10) / math.log(2), rel=0.1)
+
+
+@pytest.mark.parametrize("latitudes, longitudes, weights", [
+    (np.full(1000, 54.3), np.full(1000, 3.15), None),  # Every particle at the LKP
+    (np.array([54.3]), np.array([3.15]), None),
+    (np.array([54.28, 54.3, 54.32]), np.array([3.12, 3.15, 3.18]), np.array([0.0, 1.0, 0.0])),
+], ids=["identical", "single", "one-weighted"])
+def test_point_cloud_is_outlined_by_its_cell(latitudes, longitudes, weights):
+    density = hdr_density(latitudes, longitudes, weights)
+    cell_nm2 = density.cell_nm ** 2
+    for region in hdr_regions(density):
+        assert region.mass == pytest.approx(1.0)
+        assert len(region.polygons) == 1
+        assert 0 < region.area_nm2 <= cell_nm2
+        assert _covered(region, np.array([54.3]), np.array([3.15])) == 1.0
+        ring = region.polygons[0][0]
+        # Within the cell around the point
+        assert density.lon_edges[0] <= ring[:, 0].min() and ring[:, 0].max() <= density.lon_edges[-1]
+        assert density.lat_edges[0] <= ring[:, 1].min() and ring[:, 1].max() <= density.lat_edges[-1]
+
+
+def test_line_cloud_is_not_empty():
+    # No latitude spread: the grid is a single row of cells
+    longitudes = np.linspace(3.1, 3.2, 1000)
+    latitudes = np.full(longitudes.size, 54.3)
+    for region in hdr_regions(hdr_density(latitudes, longitudes)):
+        assert region.polygons and region.area_nm2 > 0
+        assert _covered(region, latitudes, longitudes) == pytest.approx(region.mass, abs=0.03)
+
+
+def test_geojson_rings_are_closed_lon_lat():
+    region = hdr_regions(hdr_density(*_gaussian(20_000)), (0.9,))[0]
+    geometry = region.to_dict()["geometry"]
+    assert geometry["type"] == "MultiPolygon"
+    assert len(geometry["coordinates"]) == len(region.polygons)
+    for polygon in geometry["coordinates"]:
+        for ring in polygon:
+            assert ring[0] == ring[-1] and len(ring) >= 4
+            lon, lat = ring[0]
+            assert 3.0 < lon < 3.3 and 54.2 < lat < 54.4
+
+
+def test_exteriors_are_counter_clockwise():
+    region = hdr_regions(hdr_density(*_gaussian(20_000)), (0.9,))[0]
+    for polygon in region.polygons:
+        exterior = polygon[0]
+        x, y = exterior[:, 0], exterior[:, 1]
+        assert np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y) > 0
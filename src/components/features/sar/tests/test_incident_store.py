@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from drift_engine import BayesianDriftEngine
+from incident_store import IncidentStore, UnknownIncidentError, restore_generator
+from particle_cloud import ParticleCloud
+
+LKP = (54.30, 3.15)
+WIND = {"speed": 35.0, "direction": 270.0}
+CURRENT = {"speed": 2.8, "direction": 45.0}
+
+
+@pytest.fixture
+def engine():
+    return BayesianDriftEngine(iterations=2000)
+
+
+@pytest.fixture(params=[True, False], ids=["compressed", "mapped"])
+def store(request, tmp_path):
+    return IncidentStore(str(tmp_path), compress=request.param)
+
+
+def _weighted_cloud(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = rng.random(n)
+    return ParticleCloud(54.3 + 0.01 * rng.standard_normal(n), 3.15 + 0.01 * rng.standard_normal(n),
+                         weights / weights.sum())
+
+
+def test_save_load_round_trip(store):
+    cloud = _weighted_cloud()
+    rng = np.random.default_rng(7)
+    snapshot = store.save("ns-001", cloud, rng, 4.0, "create", meta={"origin": {"hours": 4.0}})
+
+    assert (snapshot.version, snapshot.event, snapshot.hours) == (0, "create", 4.0)
+    assert snapshot.n_particles == 500 and snapshot.weighted
+    assert snapshot.compressed == store.compress
+    loaded, restored, _ = store.load("ns-001")
+    assert loaded.to_dict() == snapshot.to_dict()
+    assert loaded.meta == {"origin": {"hours": 4.0}}
+    np.testing.assert_array_equal(restored.latitudes, cloud.latitudes)
+    np.testing.assert_array_equal(restored.longitudes, cloud.longitudes)
+    np.testing.assert_array_equal(restored.weights, cloud.weights)
+
+
+def test_uniform_cloud_stores_no_weights(store):
+    cloud = ParticleCloud(np.linspace(54.0, 54.1, 50), np.linspace(3.0, 3.1, 50))
+    snapshot = store.save("ns-001", cloud, np.random.default_rng(0), 1.0, "create")
+    assert not snapshot.weighted
+    assert store.load("ns-001")[1].is_uniform
+
+
+def test_versions_increment_and_inherit_meta(store):
+    cloud = _weighted_cloud()
+    rng = np.random.default_rng(0)
+    store.save("ns-001", cloud, rng, 4.0, "create", meta={"origin": {"lkp": [54.3, 3.15]}})
+    second = store.save("ns-001", cloud, rng, 6.0, "advance")
+
+    assert second.version == 1
+    assert second.meta == {"origin": {"lkp": [54.3, 3.15]}}
+    assert store.versions("ns-001") == [0, 1]
+    assert [s.event for s in store.history("ns-001")] == ["create", "advance"]
+    assert store.incidents() == ["ns-001"]
+
+
+def test_loaded_positions_are_read_only_unless_writable(tmp_path):
+    store = IncidentStore(str(tmp_path), compress=False)
+    store.save("ns-001", _weighted_cloud(), np.random.default_rng(0), 1.0, "create")
+    _, cloud, _ = store.load("ns-001")
+    with pytest.raises(ValueError):
+        cloud.latitudes[0] = 0.0
+    _, cloud, _ = store.load("ns-001", writable=True)
+    cloud.latitudes[0] = 0.0
+
+
+def test_rollback_deletes_later_versions(store):
+    rng = np.random.default_rng(0)
+    for hours in (4.0, 6.0, 8.0):
+        store.save("ns-001", _weighted_cloud(seed=int(hours)), rng, hours, "advance")
+
+    restored = store.rollback("ns-001", 1)
+    assert restored.version == 1 and restored.hours == 6.0
+    assert store.versions("ns-001") == [0, 1]
+    np.testing.assert_array_equal(store.load("ns-001")[1].latitudes, _weighted_cloud(seed=6).latitudes)
+    # The next write takes the freed number
+    assert store.save("ns-001", _weighted_cloud(), rng, 7.0, "advance").version == 2
+
+
+def test_rollback_and_load_reject_unknown_versions(store):
+    store.save("ns-001", _weighted_cloud(), np.random.default_rng(0), 1.0, "create")
+    with pytest.raises(UnknownIncidentError):
+        store.rollback("ns-001", 5)
+    with pytest.raises(UnknownIncidentError):
+        store.load("ns-001", 5)
+    with pytest.raises(UnknownIncidentError):
+        store.load("unknown")
+
+
+def test_old_versions_are_pruned(tmp_path):
+    store = IncidentStore(str(tmp_path), max_versions=3)
+    rng = np.random.default_rng(0)
+    for hours in range(5):
+        store.save("ns-001", _weighted_cloud(50), rng, float(hours), "advance")
+    assert store.versions("ns-001") == [2, 3, 4]
+
+
+def test_invalid_incident_id_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.save("../escape", _weighted_cloud(), np.random.default_rng(0), 1.0, "create")
+
+
+def test_delete(store):
+    store.save("ns-001", _weighted_cloud(), np.random.default_rng(0), 1.0, "create")
+    assert store.delete("ns-001")
+    assert not store.exists("ns-001") and not store.delete("ns-001")
+
+
+def test_restore_generator_continues_the_stream():
+    rng = np.random.default_rng(42)
+    rng.standard_normal(1000)
+    restored = restore_generator(rng.bit_generator.state)
+    np.testing.assert_array_equal(restored.standard_normal(100), rng.standard_normal(100))
+
+
+def test_stored_incident_advances_like_an_uninterrupted_run(store, engine):
+    # Uninterrupted: one generator drives the drift from the LKP and the advance
+    rng = np.random.default_rng(3)
+    cloud = engine.calculate_drift(LKP, WIND, CURRENT, hours=4.0, rng=rng)
+    expected = engine.advance_drift(cloud, WIND, CURRENT, hours=2.0, rng=rng)
+
+    rng = np.random.default_rng(3)
+    store.save("ns-001", engine.calculate_drift(LKP, WIND, CURRENT, hours=4.0, rng=rng), rng, 4.0, "create")
+    _, stored, restored = store.load("ns-001")
+    advanced = engine.advance_drift(stored, WIND, CURRENT, hours=2.0, rng=restored)
+    np.testing.assert_array_equal(advanced.latitudes, expected.latitudes)
+    np.testing.assert_array_equal(advanced.longitudes, expected.longitudes)
+
+
+def test_rollback_replays_the_same_advance(store, engine):
+    rng = np.random.default_rng(5)
+    store.save("ns-001", engine.calculate_drift(LKP, WIND, CURRENT, hours=4.0, rng=rng), rng, 4.0, "create")
+
+    def advance():
+        snapshot, cloud, generator = store.load("ns-001")
+        cloud = engine.advance_drift(cloud, WIND, CURRENT, hours=2.0, rng=generator)
+        store.save("ns-001", cloud, generator, snapshot.hours + 2.0, "advance")
+        return cloud
+
+    first = advance()
+    first_state = store.snapshot("ns-001").rng_state
+    store.rollback("ns-001", 0)
+    second = advance()
+    np.testing.assert_array_equal(second.latitudes, first.latitudes)
+    np.testing.assert_array_equal(second.longitudes, first.longitudes)
+    assert store.snapshot("ns-001").rng_state == first_state
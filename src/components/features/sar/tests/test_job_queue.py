@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from job_queue import JobManager, JobRejectedError
+
+
+def _chunked(chunks, chunk_seconds=0.01, done=None):
+    """A runner of `chunks` chunks with a checkpoint after each; records the chunks it finished."""
+    done = [] if done is None else done
+
+    async def runner(job):
+        for k in range(chunks):
+            await asyncio.sleep(chunk_seconds)
+            done.append(k)
+            job.checkpoint((k + 1) / chunks, {"chunks": k + 1})
+        return {"chunks": chunks}
+
+    return runner
+
+
+async def _settle(*jobs):
+    await asyncio.gather(*(job.task for job in jobs if job.task is not None), return_exceptions=True)
+
+
+def test_job_runs_to_success():
+    manager = JobManager()
+
+    async def scenario():
+        job = manager.submit("client", "drift", _chunked(3))
+        await _settle(job)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == 'succeeded' and job.progress == 1.0
+    assert job.to_dict()["result"] == {"chunks": 3}
+    assert "partial" not in job.to_dict()
+
+
+def test_running_job_cancels_at_a_chunk_boundary():
+    manager = JobManager()
+    done = []
+
+    async def scenario():
+        job = manager.submit("client", "drift", _chunked(10, chunk_seconds=0.02, done=done))
+        while not done:
+            await asyncio.sleep(0.005)
+        manager.cancel(job.job_id)
+        # Still running until the chunk in progress reaches its checkpoint
+        status = job.status
+        await _settle(job)
+        return job, status
+
+    job, status_at_cancel = asyncio.run(scenario())
+    assert status_at_cancel == 'running' and job.cancel_requested
+    assert job.status == 'cancelled'
+    # The chunk in flight when cancel arrived finished; nothing after it started
+    assert 1 <= len(done) <= 3 and done == list(range(len(done)))
+    assert job.partial == {"chunks": len(done)}
+    assert job.progress == pytest.approx(len(done) / 10)
+
+
+def test_queued_job_is_cancelled_before_it_starts():
+    manager = JobManager(max_running=1)
+    started = []
+
+    async def runner(job):
+        started.append(job.job_id)
+        return await _chunked(2)(job)
+
+    async def scenario():
+        first = manager.submit("a", "drift", runner)
+        second = manager.submit("b", "drift", runner)
+        await asyncio.sleep(0)
+        manager.cancel(second.job_id)
+        await _settle(first, second)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.status == 'succeeded'
+    assert second.status == 'cancelled' and started == [first.job_id]
+
+
+def test_failed_runner_reports_its_error():
+    manager = JobManager()
+
+    async def runner(job):
+        raise ValueError("bad forcing")
+
+    async def scenario():
+        job = manager.submit("client", "drift", runner)
+        await _settle(job)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == 'failed' and job.error == "bad forcing"
+
+
+def test_admission_limits():
+    manager = JobManager(max_jobs=3, per_client=2)
+
+    async def scenario():
+        jobs = [manager.submit("a", "drift", _chunked(1)), manager.submit("a", "drift", _chunked(1))]
+        with pytest.raises(JobRejectedError) as per_client:
+            manager.submit("a", "drift", _chunked(1))
+        jobs.append(manager.submit("b", "drift", _chunked(1)))
+        with pytest.raises(JobRejectedError) as full:
+            manager.submit("c", "drift", _chunked(1))
+        await _settle(*jobs)
+        # Finished jobs no longer count against either limit
+        jobs.append(manager.submit("a", "drift", _chunked(1)))
+        await _settle(*jobs)
+        return per_client.value, full.value
+
+    per_client, full = asyncio.run(scenario())
+    assert per_client.status_code == 429 and full.status_code == 503
+    assert manager.rejected == 2
+
+
+def test_finished_jobs_expire_after_their_ttl():
+    manager = JobManager(ttl_seconds=600.0)
+
+    async def scenario():
+        jobs = [manager.submit(f"client-{k}", "drift", _chunked(1)) for k in range(3)]
+        await _settle(*jobs)
+        return jobs
+
+    old, recent, _ = asyncio.run(scenario())
+    old.finished_at -= 601.0
+    assert manager.get(old.job_id) is None
+    assert manager.get(recent.job_id) is recent
+    assert manager.expired == 1 and len(manager.list()) == 2
+
+
+def test_only_the_newest_finished_jobs_are_kept():
+    manager = JobManager(max_jobs=10, per_client=10, max_finished=2)
+
+    async def scenario():
+        jobs = []
+        for _ in range(4):
+            jobs.append(manager.submit("client", "drift", _chunked(1)))
+            await _settle(jobs[-1])
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert [job.job_id for job in manager.list()] == [job.job_id for job in jobs[2:]]
+    assert manager.expired == 2
+
+
+def test_cancelling_a_finished_job_forgets_it():
+    manager = JobManager()
+
+    async def scenario():
+        job = manager.submit("client", "drift", _chunked(1))
+        await _settle(job)
+        return job
+
+    job = asyncio.run(scenario())
+    assert manager.cancel(job.job_id) is job
+    assert manager.get(job.job_id) is None and manager.cancel(job.job_id) is None
@@ -0,0 +1,145 @@
+import math
+
+import numpy as np
+import pytest
+
+from mission_planner import MissionPlanner
+from negative_search import NegativeSearchUpdater, SearchEffort, SearchedCell, SearchTrack
+from particle_cloud import ParticleCloud
+
+
+def _cloud(n=20000, seed=0, weighted=False):
+    rng = np.random.default_rng(seed)
+    latitudes = 54.3 + 0.05 * rng.standard_normal(n)
+    longitudes = 3.15 + 0.08 * rng.standard_normal(n)
+    weights = rng.random(n) if weighted else None
+    return ParticleCloud(latitudes, longitudes, None if weights is None else weights / weights.sum())
+
+
+def _fixes(start, end, n):
+    return list(zip(np.linspace(start[0], end[0], n), np.linspace(start[1], end[1], n)))
+
+
+def _updater(grid_mode='nm'):
+    return NegativeSearchUpdater(MissionPlanner(grid_mode=grid_mode), rng=0)
+
+
+def _brute_force_near(cloud, track):
+    """Particles within half the sweep width of any segment, one segment at a time."""
+    near = np.zeros(cloud.n_particles, dtype=bool)
+    half_width = track.sweep_width_nm / 2.0
+    for (lat_a, lon_a), (lat_b, lon_b) in zip(track.points[:-1], track.points[1:]):
+        lon_nm = 60.0 * math.cos(math.radians((lat_a + lat_b) / 2.0))
+        px, py = (cloud.longitudes - lon_a) * lon_nm, (cloud.latitudes - lat_a) * 60.0
+        sx, sy = (lon_b - lon_a) * lon_nm, (lat_b - lat_a) * 60.0
+        t = np.clip((px * sx + py * sy) / (sx * sx + sy * sy), 0.0, 1.0)
+        near |= np.hypot(px - t * sx, py - t * sy) <= half_width
+    return np.flatnonzero(near)
+
+
+@pytest.mark.parametrize("start, end", [((54.3, 3.0), (54.3, 3.3)), ((54.2, 3.0), (54.4, 3.3))],
+                         ids=["parallel", "diagonal"])
+@pytest.mark.parametrize("fixes", [2, 3, 41, 400])
+def test_track_look_count_does_not_depend_on_its_fixes(fixes, start, end):
+    cloud = _cloud()
+    updater = _updater()
+    straight = SearchTrack([start, end], sweep_width_nm=1.0)
+    dense = SearchTrack(_fixes(start, end, fixes), sweep_width_nm=1.0)
+
+    expected, _ = updater.count_looks(cloud, SearchEffort('helicopter', tracks=[straight]))
+    indices, looks = updater.count_looks(cloud, SearchEffort('helicopter', tracks=[dense]))
+    assert expected.size > 0 and looks.max() == 1
+    if start[0] == end[0]:
+        np.testing.assert_array_equal(indices, expected)
+    else:
+        # Each segment is flattened at its own mid-latitude, which moves the swath edge slightly
+        assert np.setxor1d(indices, expected).size <= 0.002 * expected.size
+
+
+def test_track_doubling_back_is_one_look():
+    cloud = _cloud()
+    out_and_back = SearchTrack([(54.2, 3.0), (54.4, 3.3), (54.2, 3.0), (54.4, 3.3)], sweep_width_nm=1.0)
+    _, looks = _updater().count_looks(cloud, SearchEffort('helicopter', tracks=[out_and_back]))
+    assert looks.max() == 1
+
+
+def test_separate_tracks_and_cells_each_add_a_look():
+    cloud = _cloud()
+    track = SearchTrack(_fixes((54.2, 3.0), (54.4, 3.3), 41), sweep_width_nm=1.0)
+    cell = SearchedCell(54.0, 54.6, 2.7, 3.6)  # Holds the whole track
+    effort = SearchEffort('helicopter', cells=[cell], tracks=[track, track])
+
+    indices, looks = _updater().count_looks(cloud, effort)
+    on_track = np.isin(indices, _brute_force_near(cloud, track))
+    assert set(looks[on_track]) == {3}
+    assert set(looks[~on_track]) == {1}
+
+
+@pytest.mark.parametrize("sweep_width_nm", [0.05, 0.5, 2.0])
+def test_track_matches_distance_to_its_segments(sweep_width_nm):
+    cloud = _cloud(50000, seed=3)
+    # A wandering, self-crossing track; the narrow swath caps the candidate grid
+    rng = np.random.default_rng(1)
+    fixes = np.column_stack([54.3 + 0.1 * rng.standard_normal(60), 3.15 + 0.15 * rng.standard_normal(60)])
+    track = SearchTrack([tuple(fix) for fix in fixes], sweep_width_nm=sweep_width_nm)
+    indices, looks = _updater().count_looks(cloud, SearchEffort('uav', tracks=[track]))
+    np.testing.assert_array_equal(indices, _brute_force_near(cloud, track))
+    assert looks.max() == 1
+
+
+def test_single_fix_track_covers_nothing():
+    effort = SearchEffort('uav', tracks=[SearchTrack([(54.3, 3.15)], sweep_width_nm=1.0)])
+    indices, _ = _updater().count_looks(_cloud(), effort)
+    assert indices.size == 0
+
+
+def test_detection_probability_follows_the_coverage_factor():
+    updater = _updater()
+    assert updater.detection_probability('helicopter', 1.0) == pytest.approx(0.9)
+    assert updater.detection_probability('helicopter', 2.0) == pytest.approx(0.99)
+    assert updater.detection_probability('helicopter', 0.0) == 0.0
+
+
+def test_pos_is_pod_times_the_searched_mass():
+    cloud = _cloud()
+    cell = SearchedCell(54.25, 54.35, 3.05, 3.25)
+    inside = ((cloud.latitudes >= cell.lat_min) & (cloud.latitudes <= cell.lat_max)
+              & (cloud.longitudes >= cell.lon_min) & (cloud.longitudes <= cell.lon_max))
+    updater = NegativeSearchUpdater(MissionPlanner(grid_mode='nm'), resample_threshold=0.0)
+
+    result = updater.apply(cloud, SearchEffort('surface_vessel', cells=[cell]))
+    assert result.particles_searched == inside.sum()
+    assert result.pos == pytest.approx(0.85 * inside.mean())
+    weights = cloud.normalized_weights()
+    assert weights.sum() == pytest.approx(1.0)
+    # Searched particles keep (1 - POD) of the weight of the others
+    assert weights[inside][0] / weights[~inside][0] == pytest.approx(0.15)
+    assert not result.resampled
+
+
+def test_degenerate_weights_are_resampled():
+    cloud = _cloud()
+    # Most of the cloud searched thoroughly: ESS falls to about the unsearched share
+    searched = SearchedCell(53.0, 54.33, 2.0, 4.0)
+    result = _updater().apply(cloud, SearchEffort('helicopter', cells=[searched], coverage=2.0))
+    assert result.resampled and cloud.is_uniform
+    assert result.effective_sample_size == cloud.n_particles
+    assert np.mean(cloud.latitudes <= searched.lat_max) < 0.05
+
+
+@pytest.mark.parametrize("grid_mode", ['bins', 'nm', 'quadtree'])
+def test_critical_path_is_the_planners_on_the_same_grid(grid_mode):
+    cloud = _cloud(weighted=True)  # No tied cell masses
+    planner = MissionPlanner(grid_mode=grid_mode)
+    moments = planner.distribution_moments(cloud.latitudes, cloud.longitudes, cloud.weights)
+    updater = NegativeSearchUpdater(planner, resample_threshold=0.0)
+    effort = SearchEffort('helicopter', cells=[SearchedCell(54.25, 54.35, 3.05, 3.25)])
+
+    result = updater.apply(cloud, effort)
+    # Positions did not move, so the grid is the one the planner drew for the prior cloud
+    expected = planner.generate_critical_path(cloud.latitudes, cloud.longitudes, cloud.normalized_weights(),
+                                              moments=moments)
+    assert [(c.center_lat, c.center_lon) for c in result.critical_path] == pytest.approx(
+        [(c.center_lat, c.center_lon) for c in expected])
+    assert [c.probability_mass for c in result.critical_path] == pytest.approx(
+        [c.probability_mass for c in expected])
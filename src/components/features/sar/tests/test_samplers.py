@@ -0,0 +1,110 @@
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from drift_engine import BayesianDriftEngine
+from samplers import NormalSampler, norm_ppf, replicate_bounds, scrambled_halton, sobol_available
+
+WIND = {"speed": 35.0, "direction": 270.0}
+CURRENT = {"speed": 2.8, "direction": 45.0}
+METHODS = ['mc', 'antithetic', 'stratified', 'halton',
+           pytest.param('sobol', marks=pytest.mark.skipif(not sobol_available(), reason="needs scipy"))]
+
+
+def _strata(values, m):
+    """Equal-probability stratum of each standard-normal value among m."""
+    cdf = NormalDist().cdf
+    return np.floor(np.array([cdf(v) for v in values]) * m).astype(int)
+
+
+def test_norm_ppf_matches_the_normal_quantile():
+    u = np.concatenate([np.linspace(1e-10, 1e-3, 50), np.linspace(0.001, 0.999, 999), 1 - np.linspace(1e-10, 1e-3, 50)])
+    expected = [NormalDist().inv_cdf(p) for p in u]
+    np.testing.assert_allclose(norm_ppf(u), expected, rtol=1e-8, atol=1e-8)
+    assert np.isfinite(norm_ppf(np.array([0.0, 1.0]))).all()
+
+
+def test_replicate_blocks_cover_the_particles():
+    assert replicate_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert replicate_bounds(2, 8) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.parametrize("base", [2, 3, 5])
+def test_scrambled_halton_keeps_one_point_per_stratum(base):
+    m = base ** 4
+    u = scrambled_halton(m, base, np.random.default_rng(0))
+    assert ((u >= 0) & (u < 1)).all()
+    np.testing.assert_array_equal(np.sort(np.floor(u * m)), np.arange(m))
+
+
+def test_antithetic_blocks_have_zero_odd_moments():
+    z = NormalSampler('antithetic', np.random.default_rng(0), 1000, replicates=4).standard_normal()
+    for lo, hi in replicate_bounds(1000, 4):
+        assert z[lo:hi].mean() == pytest.approx(0.0, abs=1e-12)
+        assert (z[lo:hi] ** 3).mean() == pytest.approx(0.0, abs=1e-12)
+
+
+@pytest.mark.parametrize("method", ['stratified', 'halton'])
+def test_stratified_designs_fill_every_stratum_of_each_block(method):
+    n, replicates = 1000, 4
+    sampler = NormalSampler(method, np.random.default_rng(0), n, replicates=replicates)
+    draws = sampler.standard_normal(size=(3, n))
+    for dim, row in enumerate(draws):
+        for lo, hi in replicate_bounds(n, replicates):
+            if method == 'stratified':
+                np.testing.assert_array_equal(np.sort(_strata(row[lo:hi], hi - lo)), np.arange(hi - lo))
+            else:
+                # The first digit of each dimension cycles through its prime base
+                base = (2, 3, 5)[dim]
+                counts = np.bincount(_strata(row[lo:hi], base), minlength=base)
+                assert counts.max() - counts.min() <= 1
+    assert sampler.dimensions == 3
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_draws_are_standard_normal(method):
+    z = NormalSampler(method, np.random.default_rng(1), 20000).standard_normal()
+    assert z.mean() == pytest.approx(0.0, abs=0.03)
+    assert z.std() == pytest.approx(1.0, abs=0.03)
+
+
+@pytest.mark.parametrize("method", ['antithetic', 'stratified', 'halton'])
+def test_variance_reduction_of_the_mean(method):
+    def spread(name):
+        means = [NormalSampler(name, np.random.default_rng(seed), 1000).standard_normal().mean() for seed in range(40)]
+        return np.std(means)
+
+    assert spread(method) < 0.2 * spread('mc')
+
+
+def test_systematic_multinomial_is_within_one_of_the_expectation():
+    pvals = [0.5, 0.3, 0.2]
+    for seed in range(20):
+        counts = NormalSampler('stratified', np.random.default_rng(seed), 7).multinomial(1001, pvals)
+        assert counts.sum() == 1001
+        assert np.all(np.abs(counts - 1001 * np.array(pvals)) < 1)
+
+
+def test_invalid_requests_are_rejected():
+    with pytest.raises(ValueError):
+        NormalSampler('lattice', np.random.default_rng(0), 10)
+    with pytest.raises(ValueError):
+        NormalSampler('stratified', np.random.default_rng(0), 10).standard_normal(size=5)
+    sampler = NormalSampler('halton', np.random.default_rng(0), 10)
+    with pytest.raises(ValueError):
+        sampler.standard_normal(size=(17, 10))
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_engine_runs_are_reproducible_and_report_their_error(method):
+    engine = BayesianDriftEngine(iterations=4000)
+    kwargs = dict(lkp=(54.3, 3.15), wind=WIND, current=CURRENT, hours=4.0, lkp_uncertainty_nm=1.0,
+                  leeway={'slope': 0.035, 'offset': 0.03, 'slope_sd': 0.004, 'offset_sd': 0.01})
+    first = engine.calculate_drift(rng=7, sampler=method, **kwargs)
+    again = engine.calculate_drift(rng=7, sampler=method, **kwargs)
+    np.testing.assert_array_equal(first.latitudes, again.latitudes)
+
+    error = engine.sampling_error(first)
+    assert error["replicates"] == 8
+    assert 0 < error["mean_lat_se_nm"] < 1.0 and 0 < error["confidence_radius_95_se_nm"] < 1.0
@@ -0,0 +1,16 @@
+import pytest
+
+from scenario_sweep import parse_grid
+
+
+def test_lists_and_inclusive_ranges():
+    grid = parse_grid(["wind_speed=10,20,30", "hours = 0:1:0.25", "leeway_slope=0.03:0.03:0.01"])
+    assert grid["wind_speed"] == [10.0, 20.0, 30.0]
+    assert grid["hours"] == pytest.approx([0.0, 0.25, 0.5, 0.75, 1.0])
+    assert grid["leeway_slope"] == [0.03]
+
+
+@pytest.mark.parametrize("spec", ["hours=0:1:0", "hours=0:1:-0.5", "hours=1:0:0.5", "hours=0:1", "hours=0:1:0.5:2"])
+def test_rejects_ranges_without_values(spec):
+    with pytest.raises(ValueError, match="hours="):
+        parse_grid([spec])
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from single_flight import FlightTimeoutError, SingleFlight
+
+
+async def _gather(*coroutines):
+    return await asyncio.gather(*coroutines, return_exceptions=True)
+
+
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def scenario():
+        # Joiners' own arguments are ignored: equal keys mean interchangeable results
+        return await _gather(*(flight.run(("drift", 1), work, i) for i in range(5)))
+
+    assert asyncio.run(scenario()) == [0] * 5
+    assert calls == [0]
+    assert flight.started == {"drift": 1} and flight.coalesced == {"drift": 4}
+    assert flight.in_flight == 0
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("simulation failed")
+
+    async def scenario():
+        results = await _gather(*(flight.run(("drift", 1), fail) for _ in range(4)))
+        # The key is free again once the flight has failed
+        retried = await flight.run(("drift", 1), asyncio.sleep, 0, "ok")
+        return results, retried
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) and str(result) == "simulation failed" for result in results)
+    assert retried == "ok"
+    assert flight.errors == 1 and flight.started == {"drift": 2}
+
+
+def test_deadline_times_out_every_waiter_of_its_key_only():
+    flight = SingleFlight(timeout_seconds=5.0)
+
+    async def scenario():
+        stuck = [flight.run(("drift", 1), asyncio.sleep, 10, "late", timeout=0.02) for _ in range(3)]
+        quick = flight.run(("drift", 2), asyncio.sleep, 0.05, "done")
+        return await _gather(*stuck, quick)
+
+    *stuck, quick = asyncio.run(scenario())
+    assert all(isinstance(result, FlightTimeoutError) for result in stuck)
+    assert quick == "done"
+    assert flight.timeouts == 1 and flight.in_flight == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_flight():
+    flight = SingleFlight()
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.run("key", asyncio.sleep, 0.05, "done"))
+        second = asyncio.ensure_future(flight.run("key", asyncio.sleep, 0.05, "unused"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await _gather(first, second)
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, asyncio.CancelledError)
+    assert second == "done"
+
+
+def test_from_env_zero_disables_the_deadline(monkeypatch):
+    monkeypatch.setenv("SAR_COALESCE_TIMEOUT", "0")
+    assert SingleFlight.from_env().timeout_seconds is None
+    monkeypatch.setenv("SAR_COALESCE_TIMEOUT", "30")
+    assert SingleFlight.from_env().timeout_seconds == pytest.approx(30.0)
@@ -0,0 +1,173 @@
+import itertools
+from dataclasses import asdict
+
+import numpy as np
+import pytest
+
+from drift_engine import BayesianDriftEngine
+from mission_planner import MissionPlanner
+from streaming_stats import StreamingSummary, TopCellTracker, chunk_count, summarize_drift
+
+PARAMS = {"lkp": (54.30, 3.15), "wind": {"speed": 35.0, "direction": 270.0},
+          "current": {"speed": 2.8, "direction": 45.0}, "hours": 4.0}
+SEED = 11
+PARTICLES = 6000
+CHUNK = 1000
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return BayesianDriftEngine(iterations=PARTICLES)
+
+
+@pytest.fixture(scope="module")
+def planner():
+    return MissionPlanner(grid_mode='nm')
+
+
+def _summarize(engine, planner, ranges, geometry=None):
+    """Summaries of consecutive chunk ranges; the first range must start at chunk 0."""
+    parts = []
+    for chunks in ranges:
+        part = summarize_drift(engine, planner, PARAMS, SEED, PARTICLES, chunk_size=CHUNK, chunks=chunks,
+                               geometry=geometry)
+        geometry = part.geometry
+        parts.append(part)
+    return parts
+
+
+def _merge_left(parts):
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = merged.merge(part)
+    return merged
+
+
+def test_split_and_grouping_do_not_change_the_summary(engine, planner):
+    n_chunks = chunk_count(PARTICLES, CHUNK)
+    whole = summarize_drift(engine, planner, PARAMS, SEED, PARTICLES, chunk_size=CHUNK)
+    parts = _summarize(engine, planner, [(0, 1), (1, 3), (3, 4), (4, n_chunks)])
+
+    left = _merge_left(parts)
+    right = parts[0].merge(parts[1].merge(parts[2].merge(parts[3])))
+    for merged in (left, right):
+        # Moments are merged in chunk order whatever the grouping: bit-for-bit equal
+        assert merged.search_area_stats() == whole.search_area_stats()
+        # Unweighted counts are exact sums
+        np.testing.assert_array_equal(merged.density.padded, whole.density.padded)
+        assert merged.n_particles == PARTICLES
+
+
+def test_merge_order_only_reorders_floating_point_sums(engine, planner):
+    n_chunks = chunk_count(PARTICLES, CHUNK)
+    first, *rest = _summarize(engine, planner, [(0, 2), (2, 3), (3, 5), (5, n_chunks)])
+    reference = _merge_left([first] + rest).search_area_stats()
+    for order in itertools.permutations(rest):
+        merged = _merge_left([first, *order])
+        stats = merged.search_area_stats()
+        for name, value in reference.items():
+            assert stats[name] == pytest.approx(value, rel=1e-12, abs=1e-12), name
+        np.testing.assert_array_equal(merged.density.padded, _merge_left([first] + rest).density.padded)
+
+
+def test_moments_match_calculate_drift_parallel(engine, planner):
+    _, moments = engine.calculate_drift_parallel(**PARAMS, seed=SEED, n_particles=PARTICLES, chunk_size=CHUNK,
+                                                 workers=1, keep_particles=False)
+    summary = _merge_left(_summarize(engine, planner, [(0, 2), (2, chunk_count(PARTICLES, CHUNK))]))
+    assert summary.moments.search_area_stats() == moments.search_area_stats()
+
+
+def test_merge_rejects_a_different_grid(engine, planner):
+    summary = summarize_drift(engine, planner, PARAMS, SEED, PARTICLES, chunk_size=CHUNK, chunks=(0, 1))
+    other = summarize_drift(engine, planner, PARAMS, SEED + 1, PARTICLES, chunk_size=CHUNK, chunks=(0, 1))
+    with pytest.raises(ValueError):
+        summary.merge(other)
+
+
+def test_density_matches_probability_density(engine, planner):
+    summary = summarize_drift(engine, planner, PARAMS, SEED, PARTICLES, chunk_size=CHUNK)
+    cloud, _ = engine.calculate_drift_parallel(**PARAMS, seed=SEED, n_particles=PARTICLES, chunk_size=CHUNK,
+                                               workers=1)
+    padded = MissionPlanner.bin_padded(cloud.latitudes, cloud.longitudes, None, summary.geometry)
+    np.testing.assert_allclose(summary.density.density().H, padded[1:-1, 1:-1] / PARTICLES)
+
+
+def _tracker(capacity):
+    return TopCellTracker(0.0, 0.0, 1.0, 1.0, 60.0, capacity)
+
+
+def _stream(n=20000, seed=0):
+    """Skewed cell hits: a few heavy cells over a long light tail."""
+    rng = np.random.default_rng(seed)
+    rows = np.minimum(rng.zipf(1.6, n), 400) - 1
+    cols = rng.integers(0, 3, n)
+    return rows + 0.5, cols + 0.5
+
+
+def _true_mass(latitudes, longitudes):
+    cells, counts = np.unique(np.column_stack([np.floor(latitudes), np.floor(longitudes)]), axis=0,
+                              return_counts=True)
+    return {(int(r), int(c)): float(k) for (r, c), k in zip(cells, counts)}
+
+
+def _kept_mass(tracker):
+    return {(cell.center_lat - 0.5, cell.center_lon - 0.5): cell.probability_mass * tracker.total
+            for cell in tracker.top(tracker.keys.size)}
+
+
+@pytest.mark.parametrize("capacity", [4, 16, 64])
+@pytest.mark.parametrize("pieces", [1, 3, 7])
+def test_top_cell_error_bound_holds_for_any_split(capacity, pieces):
+    latitudes, longitudes = _stream()
+    truth = _true_mass(latitudes, longitudes)
+    rng = np.random.default_rng(capacity * pieces)
+    cuts = np.sort(rng.choice(np.arange(1, latitudes.size), pieces - 1, replace=False))
+    trackers = []
+    for lat, lon in zip(np.split(latitudes, cuts), np.split(longitudes, cuts)):
+        tracker = _tracker(capacity)
+        # Several adds per tracker, so folding is exercised as well as merging
+        for lat_part, lon_part in zip(np.array_split(lat, 3), np.array_split(lon, 3)):
+            tracker.add(lat_part, lon_part)
+        trackers.append(tracker)
+    rng.shuffle(trackers)
+    merged = trackers[0]
+    for tracker in trackers[1:]:
+        merged = merged.merge(tracker)
+
+    assert merged.total == latitudes.size
+    assert merged.keys.size <= capacity
+    assert merged.error <= merged.total / (capacity + 1) + 1e-9
+    assert merged.error_bound == pytest.approx(merged.error / merged.total)
+    kept = _kept_mass(merged)
+    for cell, mass in truth.items():
+        estimate = kept.get((float(cell[0]), float(cell[1])), 0.0)
+        # Never an over-count, and under by at most the error
+        assert mass - merged.error - 1e-9 <= estimate <= mass + 1e-9
+        if mass > merged.error:
+            assert estimate > 0
+
+
+def test_top_cell_tracker_is_exact_within_capacity():
+    latitudes, longitudes = _stream(2000)
+    tracker = _tracker(10_000)
+    tracker.add(latitudes, longitudes)
+    assert tracker.error == 0.0 and tracker.error_bound == 0.0
+    truth = _true_mass(latitudes, longitudes)
+    assert _kept_mass(tracker) == pytest.approx({(float(r), float(c)): m for (r, c), m in truth.items()})
+    heaviest = max(truth.values())
+    assert tracker.top(1)[0].probability_mass == pytest.approx(heaviest / latitudes.size)
+
+
+def test_top_cell_merge_rejects_a_different_lattice():
+    with pytest.raises(ValueError):
+        _tracker(4).merge(TopCellTracker(0.0, 0.0, 0.5, 1.0, 30.0, 4))
+
+
+def test_summary_from_first_chunk_uses_its_moments(planner):
+    rng = np.random.default_rng(0)
+    latitudes = 54.3 + 0.02 * rng.standard_normal(500)
+    longitudes = 3.15 + 0.03 * rng.standard_normal(500)
+    summary = StreamingSummary.from_first_chunk(planner, latitudes, longitudes)
+    mean_lat, mean_lon, cov = planner.distribution_moments(latitudes, longitudes)
+    assert asdict(summary.geometry) == pytest.approx(asdict(planner.density_geometry(mean_lat, mean_lon, cov)))
+    assert summary.n_particles == 500